@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Serving processes only: commands and tests leave the snapshot file alone
+from hackathon.cache_snapshot import cache_snapshot  # noqa: E402
+
+cache_snapshot.start()
@@ -1,6 +1,10 @@
+import importlib.util
 import os
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,8 +47,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'hackathon.middleware.RequestIdMiddleware',
+    'hackathon.middleware.MetricsMiddleware',
+    'hackathon.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'hackathon.middleware.CorsMiddleware',
+    'hackathon.admission.AdmissionMiddleware',
+    'hackathon.lobby_shards.LobbyShardMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -71,19 +80,259 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': os.getenv('DB_NAME'),
-        'USER': os.getenv('DB_USER'),
-        'PASSWORD': os.getenv('DB_PASSWORD'),
-        'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT'),
-        'OPTIONS': {
-            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-            'charset': 'utf8mb4',
+# DB_ENGINE=sqlite runs against a local SQLite file (benchmarks, offline dev).
+DB_ENGINE = os.getenv('DB_ENGINE', 'mysql').lower()
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / os.getenv('SQLITE_PATH', 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.getenv('DB_NAME'),
+            'USER': os.getenv('DB_USER'),
+            'PASSWORD': os.getenv('DB_PASSWORD'),
+            'HOST': os.getenv('DB_HOST'),
+            'PORT': os.getenv('DB_PORT'),
+            'OPTIONS': {
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+                'charset': 'utf8mb4',
+            },
+        }
+    }
+
+# Connection management. Connections are kept for DB_CONN_MAX_AGE seconds
+# (0 = reconnect every request, as before) and health-checked before reuse, so
+# the connect + `SET sql_mode` round trips happen once per worker thread rather
+# than once per request. DB_POOL=1 (MySQL, ASGI) switches to a SQLAlchemy
+# backed pool from the optional django-db-connection-pool package; Django's
+# built-in pool is PostgreSQL-only.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_POOL = os.getenv('DB_POOL', '0') == '1'
+
+DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+DATABASES['default']['CONN_HEALTH_CHECKS'] = DB_CONN_MAX_AGE > 0
+
+if DB_POOL and DB_ENGINE != 'sqlite':
+    if importlib.util.find_spec('dj_db_conn_pool') is None:
+        raise ImproperlyConfigured('DB_POOL=1 needs the django-db-connection-pool package')
+    DATABASES['default'].update({
+        'ENGINE': 'dj_db_conn_pool.backends.mysql',
+        # The pool owns connection lifetime; Django must hand them back each request
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'POOL_OPTIONS': {
+            'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', '10')),
+            'MAX_OVERFLOW': int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+            'RECYCLE': int(os.getenv('DB_POOL_RECYCLE', '3600')),
+            'PRE_PING': True,
         },
+    })
+
+# Read replicas. Writes and sticky reads go to 'default'; other hackathon reads
+# are spread across the replicas (hackathon/db_router.py). MySQL replicas share
+# the primary's credentials: DB_REPLICA_HOSTS=host1,host2[:port]. Locally,
+# SQLITE_REPLICA_PATHS=replica.sqlite3 plus `manage.py sync_replicas` works.
+if DB_ENGINE == 'sqlite':
+    _replica_dbs = [
+        {**DATABASES['default'], 'NAME': BASE_DIR / path.strip()}
+        for path in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if path.strip()
+    ]
+else:
+    _replica_dbs = []
+    for host in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+        if host.strip():
+            name, _, port = host.strip().partition(':')
+            _replica_dbs.append({**DATABASES['default'], 'HOST': name, 'PORT': port or DATABASES['default']['PORT']})
+
+for _i, _replica in enumerate(_replica_dbs, start=1):
+    DATABASES[f'replica{_i}'] = {**_replica, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_REPLICAS = [f'replica{_i}' for _i in range(1, len(_replica_dbs) + 1)]
+DATABASE_ROUTERS = ['hackathon.db_router.HackathonDbRouter']
+
+# Seconds a client keeps reading from the primary after one of its writes
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+
+# Per-process cache. Django's default of 300 entries is smaller than the
+# provider result cache alone, and culling it evicted whole word pools.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sortonym',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000'))},
+    }
+}
+
+# Entries every worker must agree on (e.g. a player's latest score) go to the
+# 'shared' alias when SHARED_CACHE_URL points at Redis. Without it, those
+# entries stay in the per-process cache with short timeouts.
+SHARED_CACHE_URL = os.getenv('SHARED_CACHE_URL', '')
+if SHARED_CACHE_URL:
+    if importlib.util.find_spec('redis') is None:
+        raise ImproperlyConfigured('SHARED_CACHE_URL needs the redis package')
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': SHARED_CACHE_URL,
+        'KEY_PREFIX': 'sortonym',
     }
+
+
+# In-memory lobby engine (hackathon/lobby_engine.py). Off by default: every
+# request for a lobby must reach the same process (a single worker, or
+# lobby-sharded routing), since that process owns the live state.
+LOBBY_ENGINE = os.getenv('LOBBY_ENGINE', '0') == '1'
+LOBBY_ENGINE_FLUSH_MS = int(os.getenv('LOBBY_ENGINE_FLUSH_MS', '200'))
+LOBBY_ENGINE_SNAPSHOT_SECONDS = float(os.getenv('LOBBY_ENGINE_SNAPSHOT_SECONDS', '2'))
+LOBBY_ENGINE_IDLE_SECONDS = int(os.getenv('LOBBY_ENGINE_IDLE_SECONDS', '600'))
+
+# Lobby sharding across nodes (hackathon/lobby_shards.py). Each node is one
+# server process, named by its base URL; off unless LOBBY_NODE_SELF and a node
+# list are set. LOBBY_NODES_FILE (one URL per line) is re-read on change.
+LOBBY_NODE_SELF = os.getenv('LOBBY_NODE_SELF', '')
+LOBBY_NODES = [n for n in os.getenv('LOBBY_NODES', '').split(',') if n.strip()]
+LOBBY_NODES_FILE = os.getenv('LOBBY_NODES_FILE', '')
+LOBBY_SHARD_MODE = os.getenv('LOBBY_SHARD_MODE', 'forward')  # or 'redirect'
+LOBBY_RING_VNODES = int(os.getenv('LOBBY_RING_VNODES', '64'))
+LOBBY_NODE_RETRY_SECONDS = float(os.getenv('LOBBY_NODE_RETRY_SECONDS', '10'))
+# A node is only marked down after this many consecutive failed forwards and
+# a failed health probe; forwarded hops are signed with LOBBY_FORWARD_SECRET
+# (SECRET_KEY if empty), which every node must share.
+LOBBY_NODE_FAILURES = int(os.getenv('LOBBY_NODE_FAILURES', '3'))
+LOBBY_NODE_PROBE_TIMEOUT = float(os.getenv('LOBBY_NODE_PROBE_TIMEOUT', '1'))
+LOBBY_FORWARD_SECRET = os.getenv('LOBBY_FORWARD_SECRET', '')
+LOBBY_FORWARD_TIMEOUT = float(os.getenv('LOBBY_FORWARD_TIMEOUT', '5'))
+
+
+# Lexicon provider (Datamuse-compatible). Point this at `manage.py lexicon_stub`
+# for offline / deterministic performance runs.
+LEXICON_PROVIDER_URL = os.getenv('LEXICON_PROVIDER_URL', 'https://api.datamuse.com')
+
+# Read-only lexicon file memory-mapped by every worker (hackathon/lexicon.py);
+# build it with `manage.py build_lexicon`. Missing file = use wordfreq directly.
+LEXICON_BIN_PATH = os.getenv('LEXICON_BIN_PATH', str(BASE_DIR / 'var' / 'lexicon.bin'))
+
+# Circuit breaker and adaptive timeout bounds for provider calls (hackathon/provider.py)
+LEXICON_BREAKER_THRESHOLD = int(os.getenv('LEXICON_BREAKER_THRESHOLD', '5'))
+LEXICON_BREAKER_RESET_SECONDS = float(os.getenv('LEXICON_BREAKER_RESET_SECONDS', '15'))
+LEXICON_TIMEOUT_MIN = float(os.getenv('LEXICON_TIMEOUT_MIN', '0.2'))
+LEXICON_TIMEOUT_MAX = float(os.getenv('LEXICON_TIMEOUT_MAX', '1.0'))
+
+# Shared, bounded thread pools (hackathon/executors.py). Submissions beyond
+# workers + queue are shed with PoolSaturated.
+EXECUTOR_POOLS = {
+    'provider': {
+        'workers': int(os.getenv('PROVIDER_POOL_WORKERS', '32')),
+        'queue': int(os.getenv('PROVIDER_POOL_QUEUE', '256')),
+    },
+    'background': {
+        'workers': int(os.getenv('BACKGROUND_POOL_WORKERS', '4')),
+        'queue': int(os.getenv('BACKGROUND_POOL_QUEUE', '64')),
+    },
+}
+
+# Poll hints and load shedding (hackathon/admission.py). Pressure 1.0 is an
+# average poll latency of ADMISSION_LATENCY_MS or every request thread of the
+# process busy; ADMISSION_WORKERS matches gunicorn's threads. POLL_BASE_MS is the hint for a
+# running game; hints scale up with pressure, capped at POLL_MAX_MS.
+ADMISSION_SHEDDING = os.getenv('ADMISSION_SHEDDING', '1') == '1'
+ADMISSION_LATENCY_MS = int(os.getenv('ADMISSION_LATENCY_MS', '500'))
+ADMISSION_WORKERS = int(os.getenv('ADMISSION_WORKERS', os.getenv('GUNICORN_THREADS', '1')))
+POLL_BASE_MS = int(os.getenv('POLL_BASE_MS', '1000'))
+POLL_MAX_MS = int(os.getenv('POLL_MAX_MS', '10000'))
+
+# Server-side anchor history per player (hackathon/recent_words.py): how many
+# recent anchors /api/game/start avoids, and how long an idle history is kept.
+RECENT_WORDS_SIZE = int(os.getenv('RECENT_WORDS_SIZE', '50'))
+RECENT_WORDS_SECONDS = int(os.getenv('RECENT_WORDS_SECONDS', '86400'))
+
+# How long a player's latest score stays cached for /api/game/score
+# (hackathon/last_results.py): in the shared cache, and in a per-process cache
+# where another worker's submit can't invalidate it.
+LAST_RESULT_CACHE_SECONDS = int(os.getenv('LAST_RESULT_CACHE_SECONDS', '300'))
+LAST_RESULT_LOCAL_CACHE_SECONDS = int(os.getenv('LAST_RESULT_LOCAL_CACHE_SECONDS', '5'))
+
+# Warm cache entries (word pools) are saved here every
+# CACHE_SNAPSHOT_INTERVAL seconds and on worker exit, and restored on boot
+# (hackathon/cache_snapshot.py). Empty path disables snapshots.
+CACHE_SNAPSHOT_PATH = os.getenv('CACHE_SNAPSHOT_PATH', str(BASE_DIR / 'var' / 'cache_snapshot.json'))
+if sys.argv[1:2] == ['test']:
+    # Test data must never reach the pools of a later real run
+    CACHE_SNAPSHOT_PATH = ''
+CACHE_SNAPSHOT_INTERVAL = int(os.getenv('CACHE_SNAPSHOT_INTERVAL', '300'))
+CACHE_SNAPSHOT_MAX_AGE = int(os.getenv('CACHE_SNAPSHOT_MAX_AGE', '86400'))
+LEADERBOARD_CACHE_SECONDS = int(os.getenv('LEADERBOARD_CACHE_SECONDS', '15'))
+
+# Signed round tokens (hackathon/round_tokens.py): how long a started round can
+# be submitted, how far below the server-measured time a client's reported time
+# may go (network and rendering), and whether word ids hide their category
+# (`w0`, the default) instead of `syn_<word>` / `ant_<word>`.
+ROUND_TOKEN_MAX_AGE = int(os.getenv('ROUND_TOKEN_MAX_AGE', '900'))
+ROUND_TOKEN_CLOCK_GRACE = float(os.getenv('ROUND_TOKEN_CLOCK_GRACE', '3'))
+ROUND_TOKEN_OPAQUE_IDS = os.getenv('ROUND_TOKEN_OPAQUE_IDS', '1') == '1'
+
+# /metrics is only served to these client addresses (REMOTE_ADDR, not
+# X-Forwarded-For) or to requests with `Authorization: Bearer <METRICS_TOKEN>`.
+# Behind a proxy, set a token: every request then comes from the proxy address.
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+# Logging
+# Records are rate limited per call site, stamped with the request id and
+# written as JSON by a background thread (see hackathon/logging_utils.py).
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'hackathon.logging_utils.RequestIdFilter'},
+        'rate_limit': {
+            '()': 'hackathon.logging_utils.RateLimitFilter',
+            'rate': float(os.getenv('LOG_RATE_PER_SITE', '5')),
+            'burst': int(os.getenv('LOG_BURST_PER_SITE', '20')),
+            'sample_rate': float(os.getenv('LOG_SAMPLE_RATE', '1.0')),
+        },
+    },
+    'formatters': {
+        'json': {'()': 'hackathon.logging_utils.JsonFormatter'},
+    },
+    'handlers': {
+        'queue': {
+            '()': 'hackathon.logging_utils.QueueListenerHandler',
+            'maxsize': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+            'formatter': 'json',
+            'filters': ['request_id', 'rate_limit'],
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'hackathon': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'django': {
+            'handlers': ['queue'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
 
 
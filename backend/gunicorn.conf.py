@@ -0,0 +1,27 @@
+"""
+Gunicorn settings: ``gunicorn -c gunicorn.conf.py backend.wsgi``
+
+The app is preloaded in the master, so Django setup and the memory-mapped
+lexicon (hackathon/lexicon.py) are done once before fork and every worker
+shares them copy-on-write / through the page cache.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+
+def post_fork(server, worker):
+    # Threads and DB sockets from the master must not be shared with workers
+    from django.db import connections
+
+    from hackathon.logging_utils import restart_listeners
+
+    connections.close_all()
+    restart_listeners()
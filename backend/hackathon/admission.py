@@ -0,0 +1,149 @@
+"""
+Poll-interval hints and load shedding for lobby polling.
+
+Pressure is a per-process number where 1.0 means "at the limit". It is the
+larger of:
+- an exponentially weighted average of poll latency over
+  ``ADMISSION_LATENCY_MS``. Only the polls themselves are timed: they are
+  short database reads, so their latency tracks database load, and slow
+  requests such as game starts or certificates cannot push it up;
+- the share of this process's other request threads that are busy
+  (``ADMISSION_WORKERS``, gunicorn's threads per worker). A sync worker
+  serves one request at a time, so there this term is always 0 and latency
+  alone drives pressure.
+
+``next_poll_ms`` turns lobby state, recent activity and pressure into the
+interval clients should wait before the next poll. Lobby and results
+responses carry it.
+
+``AdmissionMiddleware`` counts every request in flight. Above a pressure of 1.0 it
+rejects a growing share, up to 90%, of low-priority polls: lobby status and
+results reads. They get a 429 with ``Retry-After`` and a ``next_poll_ms``
+hint. Actions and submissions are never shed.
+"""
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from . import metrics
+
+# Weight of the newest request in the latency average
+LATENCY_ALPHA = 0.1
+# Some polls always get through, so the latency average can recover
+MAX_SHED_FRACTION = 0.9
+
+POLL_PATHS = ('/api/lobby/status', '/api/get/results/')
+
+ADMISSION_PRESSURE = metrics.registry.gauge(
+    'sortonym_admission_pressure',
+    'Load pressure of this process; above 1.0 low-priority polls are shed.',
+)
+ADMISSION_SHED = metrics.registry.counter(
+    'sortonym_admission_shed_total',
+    'Low-priority polls rejected with 429.',
+)
+
+
+class AdmissionController:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._latency_ms = 0.0
+
+    @property
+    def latency_threshold_ms(self) -> float:
+        return float(getattr(settings, 'ADMISSION_LATENCY_MS', 500))
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(getattr(settings, 'ADMISSION_WORKERS', 1)))
+
+    def started(self):
+        with self._lock:
+            self._inflight += 1
+
+    def finished(self, seconds: Optional[float] = None):
+        """End a request; ``seconds`` feeds the latency average when given."""
+        with self._lock:
+            self._inflight -= 1
+            if seconds is not None:
+                self._latency_ms += LATENCY_ALPHA * (seconds * 1000 - self._latency_ms)
+
+    def pressure(self) -> float:
+        # Called from within a request, which holds one of the threads itself
+        others = max(self._inflight - 1, 0)
+        busy = others / (self.capacity - 1) if self.capacity > 1 else 0.0
+        pressure = max(self._latency_ms / self.latency_threshold_ms, busy)
+        ADMISSION_PRESSURE.set(round(pressure, 3))
+        return pressure
+
+    @staticmethod
+    def is_poll(request: HttpRequest) -> bool:
+        return request.method == 'GET' and request.path_info.startswith(POLL_PATHS)
+
+    def should_shed(self, request: HttpRequest) -> bool:
+        if not self.is_poll(request):
+            return False
+        if not getattr(settings, 'ADMISSION_SHEDDING', True):
+            return False
+        # Shed nothing at 1.0, rising to MAX_SHED_FRACTION at 2.0
+        return random.random() < min(self.pressure() - 1.0, MAX_SHED_FRACTION)
+
+    def next_poll_ms(self, status: str, finished: bool = False, updated_at: Optional[datetime] = None) -> int:
+        """How long a client should wait before polling this lobby again."""
+        base = int(getattr(settings, 'POLL_BASE_MS', 1000))
+        if status == 'EXPIRED' or finished:
+            interval = base * 5
+        elif status == 'STARTED':
+            interval = base
+        else:
+            interval = base * 0.8
+            # A waiting lobby nobody has touched for a while can be polled slowly
+            idle = (timezone.now() - updated_at).total_seconds() if updated_at else 0
+            if idle > 60:
+                interval = base * 3
+            elif idle > 15:
+                interval = base * 1.5
+        interval *= max(1.0, self.pressure())
+        return int(min(interval, int(getattr(settings, 'POLL_MAX_MS', 10000))))
+
+
+# Global instance
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Counts requests, times polls and sheds them under pressure (see module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        admission.started()
+        if admission.should_shed(request):
+            admission.finished()
+            ADMISSION_SHED.inc()
+            retry_ms = admission.next_poll_ms('STARTED')
+            response = HttpResponse(
+                json.dumps({'error': 'Server busy, retry shortly', 'next_poll_ms': retry_ms}),
+                status=429, content_type='application/json',
+            )
+            response['Retry-After'] = str(math.ceil(retry_ms / 1000))
+            # Returned above CommonMiddleware, which would otherwise set this
+            response['Content-Length'] = str(len(response.content))
+            return response
+
+        timed = admission.is_poll(request)
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            admission.finished(time.perf_counter() - start if timed else None)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class HackathonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hackathon'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import lexicon, word_cache  # noqa: F401 (register snapshot sections)
+        from .metrics import record_connection_created
+
+        connection_created.connect(record_connection_created, dispatch_uid='hackathon_connection_metrics')
+        # With gunicorn's preload_app this runs once in the master, before fork
+        lexicon.load_mapped()
@@ -0,0 +1,145 @@
+"""
+Shared helpers for the ``bench_micro`` and ``load_test`` management commands.
+
+Both commands produce the same report shape so results can be saved with
+``--json`` and compared later with ``--compare``::
+
+    {"name": {"count": ..., "errors": ..., "rps": ..., "mean_ms": ...,
+              "p50_ms": ..., "p95_ms": ..., "p99_ms": ..., "max_ms": ...}}
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+from unittest import mock
+
+# Canned provider responses so word selection can be exercised offline. For
+# recorded responses, injected latency and failures over real HTTP use the
+# ``lexicon_stub`` command and LEXICON_PROVIDER_URL instead.
+STUB_LEXICON = {
+    'rel_syn': ['glad', 'cheerful', 'content', 'jolly', 'merry', 'upbeat', 'bright', 'sunny'],
+    'rel_ant': ['sad', 'gloomy', 'unhappy', 'miserable', 'glum', 'down', 'blue', 'morose'],
+}
+
+
+class _StubResponse:
+    def __init__(self, payload):
+        self._payload = payload
+        self.status_code = 200
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def stub_provider_get(url: str, params=None, timeout=None, latency: float = 0.0):
+    if latency:
+        time.sleep(latency)
+    relation = 'rel_syn' if 'rel_syn' in (params or {}) else 'rel_ant'
+    return _StubResponse([{'word': w, 'score': 100 - i} for i, w in enumerate(STUB_LEXICON[relation])])
+
+
+@contextmanager
+def stubbed_provider(latency: float = 0.0):
+    """Route every lexicon provider call to the canned in-process stub."""
+    def fake(url, params=None, timeout=None, **kwargs):
+        return stub_provider_get(url, params=params, timeout=timeout, latency=latency)
+
+    with mock.patch('hackathon.provider._http_get', fake):
+        yield
+
+
+class LatencyRecorder:
+    """Thread-safe collector of per-operation latencies (in seconds)."""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def record(self, name: str, seconds: float, ok: bool = True):
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    @contextmanager
+    def time(self, name: str):
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(name, time.perf_counter() - start, ok)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    def summary(self) -> dict:
+        wall = (self.finished_at or time.perf_counter()) - self.started_at
+        with self._lock:
+            items = {k: list(v) for k, v in self._samples.items()}
+            errors = dict(self._errors)
+        return {name: summarize(samples, errors.get(name, 0), wall) for name, samples in sorted(items.items())}
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    idx = max(0, min(len(sorted_samples) - 1, math.ceil(pct / 100.0 * len(sorted_samples)) - 1))
+    return sorted_samples[idx]
+
+
+def summarize(samples: List[float], errors: int = 0, wall_seconds: float = None) -> dict:
+    ordered = sorted(samples)
+    count = len(ordered)
+    total = sum(ordered)
+    wall = wall_seconds if wall_seconds else total
+    return {
+        'count': count,
+        'errors': errors,
+        'rps': round(count / wall, 2) if wall else 0.0,
+        'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def format_report(report: dict, baseline: dict = None) -> str:
+    header = f"{'operation':<32} {'count':>7} {'err':>5} {'rps':>9} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    lines = [header, '-' * len(header)]
+    for name, row in report.items():
+        line = (
+            f"{name:<32} {row['count']:>7} {row['errors']:>5} {row['rps']:>9.1f} "
+            f"{row['mean_ms']:>9.3f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f}"
+        )
+        if baseline:
+            base = baseline.get(name)
+            if base and base.get('p95_ms'):
+                delta = (row['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100
+                line += f" {delta:>+11.1f}%"
+            else:
+                line += f" {'n/a':>12}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(path: str, report: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
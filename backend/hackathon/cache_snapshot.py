@@ -0,0 +1,197 @@
+"""
+Snapshot warm cache entries to a local file and restore them on boot.
+
+Cache owners register a *section*: the keys to save, how long restored values
+stay valid and a function that refreshes them from the source of truth::
+
+    cache_snapshot.register('word_pools', keys=..., timeout=86400, revalidate=...)
+
+``start()`` restores the file and hooks ``request_started``. Only the serving
+entry points call it (``backend/wsgi.py``, ``backend/asgi.py``), once in the
+gunicorn master with ``preload_app``, so workers start with warm pools and
+never pay the first populate on a request. Management commands and the test
+runner never read or write the file. Entries are written with ``cache.add``:
+with a shared cache backend, values other workers already refreshed win over
+the file.
+
+Revalidation and periodic snapshots run on the ``background`` executor. They
+are started from the first request a process serves rather than from
+``ready()``, because threads do not survive gunicorn's fork.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import executors, metrics
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+
+SNAPSHOT_ENTRIES = metrics.registry.counter(
+    'sortonym_cache_snapshot_entries_total',
+    'Cache entries written to or restored from the snapshot file.',
+    labels=('section', 'operation'),
+)
+SNAPSHOT_DURATION = metrics.registry.histogram(
+    'sortonym_cache_snapshot_seconds',
+    'Time spent saving or restoring the cache snapshot.',
+    labels=('operation',),
+)
+
+
+class Section:
+    def __init__(self, name: str, keys: Callable[[], Iterable[str]], timeout: int,
+                 revalidate: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.keys = keys
+        self.timeout = timeout
+        self.revalidate = revalidate
+
+
+class CacheSnapshot:
+    def __init__(self):
+        self._sections: Dict[str, Section] = {}
+        self._lock = threading.Lock()
+        self._last_saved = time.time()
+        self._started_pid = None
+        self._restored = set()
+
+    @property
+    def path(self) -> str:
+        return str(getattr(settings, 'CACHE_SNAPSHOT_PATH', '') or '')
+
+    @property
+    def interval(self) -> float:
+        return float(getattr(settings, 'CACHE_SNAPSHOT_INTERVAL', 300))
+
+    @property
+    def max_age(self) -> float:
+        return float(getattr(settings, 'CACHE_SNAPSHOT_MAX_AGE', 86400))
+
+    def register(self, name: str, keys: Callable[[], Iterable[str]], timeout: int,
+                 revalidate: Optional[Callable[[], None]] = None):
+        self._sections[name] = Section(name, keys, timeout, revalidate)
+
+    def save(self) -> int:
+        """Write every registered key currently in the cache; returns the entry count."""
+        path = self.path
+        if not path:
+            return 0
+        start = time.perf_counter()
+        sections = {}
+        for section in list(self._sections.values()):
+            values = cache.get_many(list(section.keys()))
+            if values:
+                sections[section.name] = values
+                SNAPSHOT_ENTRIES.inc(len(values), section=section.name, operation='save')
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'saved_at': time.time(), 'sections': sections}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self._last_saved = time.time()
+        SNAPSHOT_DURATION.observe(time.perf_counter() - start, operation='save')
+        return sum(len(values) for values in sections.values())
+
+    def restore(self) -> int:
+        """Load the snapshot into the cache; returns how many entries were added."""
+        path = self.path
+        if not path or not os.path.exists(path):
+            return 0
+        start = time.perf_counter()
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning('Ignoring unreadable cache snapshot %s: %s', path, e)
+            return 0
+        if snapshot.get('version') != VERSION:
+            return 0
+
+        age = time.time() - float(snapshot.get('saved_at', 0))
+        if age > self.max_age:
+            logger.info('Cache snapshot %s is %.0fs old; not restoring', path, age)
+            return 0
+
+        restored = 0
+        for name, values in snapshot.get('sections', {}).items():
+            section = self._sections.get(name)
+            if section is None:
+                continue
+            remaining = int(section.timeout - age)
+            if remaining <= 0:
+                continue
+            for key, value in values.items():
+                if cache.add(key, value, remaining):
+                    restored += 1
+                    self._restored.add(name)
+                    SNAPSHOT_ENTRIES.inc(section=name, operation='restore')
+        SNAPSHOT_DURATION.observe(time.perf_counter() - start, operation='restore')
+        logger.info('Restored %d cache entries from %s (%.0fs old)', restored, path, age)
+        return restored
+
+    def revalidate(self):
+        """Refresh the sections that were restored from the file."""
+        for name in sorted(self._restored):
+            section = self._sections[name]
+            if section.revalidate is None:
+                continue
+            try:
+                section.revalidate()
+            except Exception as e:
+                logger.error('Revalidating %s cache failed: %s', section.name, e)
+
+    def _save_quietly(self):
+        try:
+            self.save()
+        except OSError as e:
+            logger.error('Could not write cache snapshot: %s', e)
+
+    def _submit(self, fn):
+        try:
+            executors.get_executor('background').submit(fn)
+        except executors.PoolSaturated:
+            pass
+
+    def start(self):
+        """Restore the snapshot and save it while serving; call from the WSGI/ASGI module only."""
+        from django.core.signals import request_started
+
+        self.restore()
+        request_started.connect(self.on_request_started, dispatch_uid='hackathon_cache_snapshot')
+
+    def on_request_started(self, sender=None, **kwargs):
+        """``request_started`` receiver: first request revalidates, later ones save periodically."""
+        if not self.path:
+            return
+        pid = os.getpid()
+        if self._started_pid != pid:
+            with self._lock:
+                if self._started_pid == pid:
+                    return
+                self._started_pid = pid
+                self._last_saved = time.time()
+            # Graceful worker shutdown (deploys, max_requests) leaves a fresh snapshot
+            atexit.register(self._save_quietly)
+            if self._restored:
+                self._submit(self.revalidate)
+            return
+        if time.time() - self._last_saved >= self.interval:
+            with self._lock:
+                if time.time() - self._last_saved < self.interval:
+                    return
+                self._last_saved = time.time()
+            self._submit(self._save_quietly)
+
+
+# Global instance
+cache_snapshot = CacheSnapshot()
@@ -0,0 +1,35 @@
+import io
+
+from django.utils import timezone
+
+
+def render_certificate_pdf(player_name: str, score: str, level: str) -> bytes:
+    """Render the achievement certificate. reportlab is imported on first use only."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    
+    # Simple Certificate Design
+    p.setFont("Helvetica-Bold", 30)
+    p.drawCentredString(300, 700, "CERTIFICATE OF ACHIEVEMENT")
+    
+    p.setFont("Helvetica", 18)
+    p.drawCentredString(300, 650, "This is to certify that")
+    
+    p.setFont("Helvetica-Bold", 24)
+    p.drawCentredString(300, 600, player_name.upper())
+    
+    p.setFont("Helvetica", 18)
+    p.drawCentredString(300, 550, f"has successfully completed the Sortonym Challenge")
+    p.drawCentredString(300, 520, f"Difficulty: {level.capitalize()}")
+    p.drawCentredString(300, 490, f"Final Score: {score}")
+    
+    p.setFont("Helvetica-Oblique", 14)
+    p.drawCentredString(300, 400, f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}")
+    
+    p.showPage()
+    p.save()
+    
+    return buffer.getvalue()
@@ -1,3 +1,43 @@
+"""
+Primary/replica routing for the hackathon app.
+
+Writes always go to ``default`` (the primary). Reads go to one of the aliases
+in ``settings.DATABASE_REPLICAS`` unless the read must see the primary:
+
+* the model is a core (auth) model,
+* the read happens inside a transaction on the primary, or
+* the current request has written, or a recent request from the same client
+  did (see ``ReplicaPinningMiddleware``). This gives read-your-writes
+  consistency while replicas catch up.
+
+With no replicas configured every query goes to ``default``.
+"""
+import itertools
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import metrics
+
+DB_READS = metrics.registry.counter(
+    'sortonym_db_reads_routed_total',
+    'Read queries routed by HackathonDbRouter.',
+    labels=('target', 'reason'),
+)
+
+# Per-request routing state: {'pinned': bool, 'wrote': bool}; None outside requests
+routing_state = ContextVar('db_routing_state', default=None)
+
+
+def pin_to_primary():
+    """Send the rest of this request's reads to the primary."""
+    state = routing_state.get()
+    if state is not None:
+        state['pinned'] = True
+
+
 class HackathonDbRouter:
     CORE_MODEL_NAMES = {
         'appuser',
@@ -6,51 +46,69 @@ class HackathonDbRouter:
         'otpchallenge',
     }
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cycle = None
+        self._replicas = None
+
+    def _is_hackathon(self, model):
+        return getattr(model._meta, 'app_label', None) == 'hackathon'
+
+    def _is_core(self, model):
+        return getattr(model._meta, 'model_name', '').lower() in self.CORE_MODEL_NAMES
+
+    def _next_replica(self):
+        replicas = list(getattr(settings, 'DATABASE_REPLICAS', []))
+        if not replicas:
+            return None
+        with self._lock:
+            if replicas != self._replicas:
+                self._replicas = replicas
+                self._cycle = itertools.cycle(replicas)
+            return next(self._cycle)
+
     def db_for_read(self, model, **hints):
-        if getattr(model._meta, 'app_label', None) != 'hackathon':
+        if not self._is_hackathon(model):
             return None
+        if self._is_core(model):
+            return DEFAULT_DB_ALIAS
 
-        model_name = getattr(model._meta, 'model_name', '').lower()
-        if model_name in self.CORE_MODEL_NAMES:
-            return 'default'
-        return 'student'
+        state = routing_state.get()
+        if state is not None and (state['pinned'] or state['wrote']):
+            reason = 'sticky'
+        elif connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            reason = 'transaction'
+        else:
+            replica = self._next_replica()
+            if replica is not None:
+                DB_READS.inc(target='replica', reason='read')
+                return replica
+            reason = 'no_replica'
+
+        DB_READS.inc(target='primary', reason=reason)
+        return DEFAULT_DB_ALIAS
 
     def db_for_write(self, model, **hints):
-        if getattr(model._meta, 'app_label', None) != 'hackathon':
+        if not self._is_hackathon(model):
             return None
-
-        model_name = getattr(model._meta, 'model_name', '').lower()
-        if model_name in self.CORE_MODEL_NAMES:
-            return 'default'
-        return 'student'
+        state = routing_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
 
     def allow_relation(self, obj1, obj2, **hints):
-        if getattr(obj1._meta, 'app_label', None) != 'hackathon' or getattr(obj2._meta, 'app_label', None) != 'hackathon':
+        if not self._is_hackathon(obj1) or not self._is_hackathon(obj2):
             return None
 
-        name1 = getattr(obj1._meta, 'model_name', '').lower()
-        name2 = getattr(obj2._meta, 'model_name', '').lower()
-
-        is_core_1 = name1 in self.CORE_MODEL_NAMES
-        is_core_2 = name2 in self.CORE_MODEL_NAMES
-
-        if is_core_1 != is_core_2:
+        if self._is_core(obj1) != self._is_core(obj2):
             return False
 
         return None
 
     def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        if db in getattr(settings, 'DATABASE_REPLICAS', []):
+            return False
         if app_label != 'hackathon':
             return None
-
-        model = hints.get('model')
-        if model is not None:
-            target_db = self.db_for_write(model)
-            return target_db == db
-
-        if model_name is None:
-            return None
-
-        if str(model_name).lower() in self.CORE_MODEL_NAMES:
-            return db == 'default'
-        return db == 'student'
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,139 @@
+"""
+Process-wide registry of bounded, named thread pools.
+
+Instead of spinning up a ``ThreadPoolExecutor`` per request, code asks for a
+shared pool by name (``get_executor('provider')``). Each pool has a fixed number
+of workers and a cap on queued work; once the cap is reached ``submit`` raises
+``PoolSaturated`` so the caller can shed load (fall back, skip, return early)
+instead of piling up threads or unbounded queues.
+
+Pools are configured with ``settings.EXECUTOR_POOLS``::
+
+    EXECUTOR_POOLS = {'provider': {'workers': 32, 'queue': 256}}
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOLS = {
+    # Outbound lexicon provider HTTP calls (one task per request)
+    'provider': {'workers': 32, 'queue': 256},
+    # Cache warm-ups, probes and other off-request work
+    'background': {'workers': 4, 'queue': 64},
+}
+
+POOL_ACTIVE = metrics.registry.gauge(
+    'sortonym_executor_active_tasks',
+    'Tasks currently running in a pool.',
+    labels=('pool',),
+)
+POOL_QUEUED = metrics.registry.gauge(
+    'sortonym_executor_queued_tasks',
+    'Tasks waiting for a worker in a pool.',
+    labels=('pool',),
+)
+POOL_REJECTED = metrics.registry.counter(
+    'sortonym_executor_rejected_total',
+    'Submissions shed because the pool queue was full.',
+    labels=('pool',),
+)
+POOL_QUEUE_WAIT = metrics.registry.histogram(
+    'sortonym_executor_queue_wait_seconds',
+    'Time tasks spent queued before a worker picked them up.',
+    labels=('pool',),
+)
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when a pool's queue limit is reached."""
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = workers + queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{name}-pool')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+
+    def _update_gauges(self):
+        POOL_ACTIVE.set(self._active, pool=self.name)
+        POOL_QUEUED.set(self._pending - self._active, pool=self.name)
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                POOL_REJECTED.inc(pool=self.name)
+                raise PoolSaturated(f'{self.name} pool saturated ({self._pending} pending)')
+            self._pending += 1
+            self._update_gauges()
+
+        queued_at = time.perf_counter()
+        # Carries the request id (and other context vars) into the worker thread
+        context = contextvars.copy_context()
+
+        def run():
+            POOL_QUEUE_WAIT.observe(time.perf_counter() - queued_at, pool=self.name)
+            with self._lock:
+                self._active += 1
+                self._update_gauges()
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+                    self._update_gauges()
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+                self._update_gauges()
+            raise
+
+    @property
+    def saturation(self) -> float:
+        """Pending work as a fraction of the pool's capacity (0.0 - 1.0)."""
+        return self._pending / float(self.max_pending)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            config = {**DEFAULT_POOLS, **getattr(settings, 'EXECUTOR_POOLS', {})}
+            if name not in config:
+                raise KeyError(f'Unknown executor pool: {name}')
+            pool = _pools[name] = BoundedExecutor(name, config[name]['workers'], config[name]['queue'])
+            logger.info('Started %s pool (%d workers)', name, pool.workers)
+        return pool
+
+
+def shutdown_all(wait: bool = True):
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
@@ -0,0 +1,96 @@
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.core.cache import caches
+
+from . import metrics
+from .models import GameResult, PlayerLastResult
+from .upsert import bulk_upsert
+
+logger = logging.getLogger(__name__)
+
+LAST_RESULT_LOOKUPS = metrics.registry.counter(
+    'sortonym_last_result_lookups_total',
+    'Latest-score lookups by the layer that answered them.',
+    labels=('source',),
+)
+
+FIELDS = ('score', 'total_correct', 'time_taken', 'created_at')
+
+
+class LastResultStore:
+    """
+    Each player's latest result, written through on submit.
+
+    Reads go cache -> ``PlayerLastResult`` -> ``GameResult``. The last one only
+    happens for players whose results predate this table, and it backfills
+    the row so it happens once per player.
+
+    A submit only refreshes the cache of the worker that handled it. Entries
+    therefore use the 'shared' cache when one is configured, and otherwise a
+    short ``LAST_RESULT_LOCAL_CACHE_SECONDS`` timeout that bounds how long
+    other workers can serve the previous score.
+    """
+
+    CACHE_PREFIX = 'last_result:'
+
+    @property
+    def shared(self) -> bool:
+        return 'shared' in settings.CACHES
+
+    @property
+    def cache(self):
+        return caches['shared' if self.shared else 'default']
+
+    @property
+    def timeout(self) -> int:
+        if self.shared:
+            return int(getattr(settings, 'LAST_RESULT_CACHE_SECONDS', 300))
+        return int(getattr(settings, 'LAST_RESULT_LOCAL_CACHE_SECONDS', 5))
+
+    def _key(self, email: str) -> str:
+        return f'{self.CACHE_PREFIX}{email.lower()}'
+
+    def record(self, email: str, result: GameResult):
+        data = {field: getattr(result, field) for field in FIELDS}
+        try:
+            bulk_upsert(
+                PlayerLastResult, [PlayerLastResult(player_email=email, **data)],
+                unique_fields=['player_email'],
+                update_fields=list(FIELDS),
+            )
+        except DatabaseError:
+            # The GameResult row is saved; reads fall back to it
+            logger.exception('Could not store last result for %s', email)
+            self.cache.delete(self._key(email))
+            return
+        self.cache.set(self._key(email), data, self.timeout)
+
+    def get(self, email: str) -> Optional[dict]:
+        key = self._key(email)
+        data = self.cache.get(key)
+        if data is not None:
+            LAST_RESULT_LOOKUPS.inc(source='cache')
+            return data
+
+        row = PlayerLastResult.objects.filter(player_email=email).first()
+        if row is not None:
+            LAST_RESULT_LOOKUPS.inc(source='table')
+            data = {field: getattr(row, field) for field in FIELDS}
+        else:
+            result = GameResult.objects.filter(player_email=email).order_by('-created_at').first()
+            if result is None:
+                LAST_RESULT_LOOKUPS.inc(source='none')
+                return None
+            LAST_RESULT_LOOKUPS.inc(source='history')
+            self.record(email, result)
+            return {field: getattr(result, field) for field in FIELDS}
+
+        self.cache.set(key, data, self.timeout)
+        return data
+
+
+# Global instance
+last_results = LastResultStore()
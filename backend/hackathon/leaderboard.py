@@ -0,0 +1,87 @@
+import logging
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import GameResult, PlayerScoreSummary
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'leaderboard:'
+PERIODS = ('all', 'today')
+LIMIT = 20
+
+
+def _timeout() -> int:
+    return int(getattr(settings, 'LEADERBOARD_CACHE_SECONDS', 15))
+
+
+def _key(period: str) -> str:
+    return f'{CACHE_PREFIX}{period}'
+
+
+def _normalize(period: Optional[str]) -> str:
+    return 'today' if period == 'today' else 'all'
+
+
+def compute(period: str) -> List[dict]:
+    # Fetching a larger limit (100) to ensure we can find 20 unique players
+    query = GameResult.objects.all()
+    if period == 'today':
+        query = query.filter(created_at__date=timezone.now().date())
+
+    data = []
+    seen_emails = set()
+    for res in query.order_by('-score')[:100]:
+        if res.player_email in seen_emails:
+            continue
+        seen_emails.add(res.player_email)
+        data.append({
+            'player_email': res.player_email,
+            'player_name': res.player_name or res.player_email.split('@')[0],
+            'score': res.score,
+            'total_correct': res.total_correct,
+            'time_taken': res.time_taken,
+            'date': res.created_at.strftime('%Y-%m-%d %H:%M')
+        })
+        if len(data) >= LIMIT:
+            break
+
+    if period != 'today':
+        data = _merge_archived_bests(data)
+    return data
+
+
+def _merge_archived_bests(data, limit=LIMIT):
+    """Fold best scores from archived results (PlayerScoreSummary) into the hot leaderboard."""
+    best = {entry['player_email']: entry for entry in data}
+    for summary in PlayerScoreSummary.objects.order_by('-best_score')[:limit]:
+        current = best.get(summary.player_email)
+        if current is not None and current['score'] >= summary.best_score:
+            continue
+        best[summary.player_email] = {
+            'player_email': summary.player_email,
+            'player_name': summary.player_name or summary.player_email.split('@')[0],
+            'score': summary.best_score,
+            'total_correct': summary.best_total_correct,
+            'time_taken': summary.best_time_taken,
+            'date': summary.best_at.strftime('%Y-%m-%d %H:%M') if summary.best_at else ''
+        }
+    return sorted(best.values(), key=lambda entry: entry['score'], reverse=True)[:limit]
+
+
+def get(period: Optional[str]) -> List[dict]:
+    """Top scores for ``period`` ('today' or anything else for all time), cached briefly."""
+    period = _normalize(period)
+    data = cache.get(_key(period))
+    if data is None:
+        data = compute(period)
+        cache.set(_key(period), data, _timeout())
+    return data
+
+
+def invalidate():
+    """Called after a result is saved so the player sees their new score."""
+    cache.delete_many([_key(period) for period in PERIODS])
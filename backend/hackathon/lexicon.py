@@ -0,0 +1,204 @@
+"""
+Word-frequency lists and known word pairs for candidate selection.
+
+Lookups are served from a read-only memory-mapped binary file (built with
+``manage.py build_lexicon``) when one exists at ``settings.LEXICON_BIN_PATH``.
+Every gunicorn worker maps the same file, so the data lives once in the page
+cache rather than once per worker, and nothing is parsed at load time.
+
+Without the file, lists come from ``wordfreq``. It costs ~100ms to import and
+its tables more on first use, so it is imported on the first lookup.
+
+File layout (native-endian unsigned 32-bit ints, 4-byte aligned sections)::
+
+    header   magic, version, byte order, n_strings, n_ranked, n_entries,
+             n_refs and the offset of each section below
+    offsets  u32[n_strings + 1]   start of each string in the blob
+    blob     utf-8 bytes          every distinct word stored once (interned)
+    ranks    u32[n_ranked]        string ids in frequency order
+    entries  u32[n_entries * 5]   (word, syn_start, syn_count, ant_start, ant_count),
+                                  sorted by word bytes for binary search
+    refs     u32[n_refs]          string ids referenced by entries
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SLEX'
+VERSION = 1
+HEADER = struct.Struct('=4s10I')
+HEADER_SIZE = 48
+ENTRY_FIELDS = 5
+# Deepest frequency rank any difficulty draws from
+RANKED_WORDS = 25000
+
+_lock = threading.Lock()
+_top_lists = {}
+_mapped = None
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+class MappedLexicon:
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, byteorder, self.n_strings, self.n_ranked, self.n_entries, n_refs,
+         off_offsets, off_blob, off_ranks, off_entries) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} lexicon file')
+        if byteorder != (1 if sys.byteorder == 'little' else 2):
+            raise ValueError(f'{path} was built on a machine with different byte order')
+
+        view = memoryview(self._mm)
+        self._offsets = view[off_offsets:off_offsets + 4 * (self.n_strings + 1)].cast('I')
+        self._blob = view[off_blob:off_ranks]
+        self._ranks = view[off_ranks:off_ranks + 4 * self.n_ranked].cast('I')
+        self._entries = view[off_entries:off_entries + 4 * ENTRY_FIELDS * self.n_entries].cast('I')
+        off_refs = off_entries + 4 * ENTRY_FIELDS * self.n_entries
+        self._refs = view[off_refs:off_refs + 4 * n_refs].cast('I')
+
+    def _bytes(self, string_id: int):
+        return self._blob[self._offsets[string_id]:self._offsets[string_id + 1]]
+
+    def string(self, string_id: int) -> str:
+        return str(self._bytes(string_id), 'utf-8')
+
+    def ranked(self, start: int, end: int) -> List[str]:
+        end = min(end, self.n_ranked)
+        return [self.string(self._ranks[i]) for i in range(max(0, start), end)]
+
+    def _refs_at(self, start: int, count: int) -> List[str]:
+        return [self.string(self._refs[i]) for i in range(start, start + count)]
+
+    def lookup(self, word: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Binary search the entries; returns ``(synonyms, antonyms)`` or ``None``."""
+        key = word.lower().encode('utf-8')
+        lo, hi = 0, self.n_entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            base = mid * ENTRY_FIELDS
+            current = self._bytes(self._entries[base]).tobytes()
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                e = self._entries
+                return self._refs_at(e[base + 1], e[base + 2]), self._refs_at(e[base + 3], e[base + 4])
+        return None
+
+
+def build(path: str, ranked: List[str], entries: Dict[str, Tuple[List[str], List[str]]]) -> dict:
+    """Write a lexicon file atomically; workers that mapped the old one keep it."""
+    ids: Dict[str, int] = {}
+    blob = bytearray()
+    offsets = array('I', [0])
+
+    def intern(word: str) -> int:
+        string_id = ids.get(word)
+        if string_id is None:
+            string_id = ids[word] = len(ids)
+            blob.extend(word.encode('utf-8'))
+            offsets.append(len(blob))
+        return string_id
+
+    ranks = array('I', (intern(w) for w in ranked))
+    table = array('I')
+    refs = array('I')
+    for word in sorted(entries, key=lambda w: w.lower().encode('utf-8')):
+        syns, ants = entries[word]
+        table.append(intern(word.lower()))
+        table.extend([len(refs), len(syns)])
+        refs.extend(intern(s) for s in syns)
+        table.extend([len(refs), len(ants)])
+        refs.extend(intern(a) for a in ants)
+
+    off_offsets = HEADER_SIZE
+    off_blob = off_offsets + 4 * len(offsets)
+    off_ranks = _align(off_blob + len(blob))
+    off_entries = off_ranks + 4 * len(ranks)
+    header = HEADER.pack(MAGIC, VERSION, 1 if sys.byteorder == 'little' else 2, len(ids), len(ranks),
+                         len(entries), len(refs), off_offsets, off_blob, off_ranks, off_entries)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(offsets.tobytes())
+        f.write(bytes(blob).ljust(off_ranks - off_blob, b'\0'))
+        f.write(ranks.tobytes())
+        f.write(table.tobytes())
+        f.write(refs.tobytes())
+    os.replace(tmp_path, path)
+    return {'strings': len(ids), 'ranked': len(ranks), 'entries': len(entries), 'bytes': os.path.getsize(path)}
+
+
+def bin_path() -> str:
+    return str(getattr(settings, 'LEXICON_BIN_PATH', '') or '')
+
+
+def load_mapped(path: str = None) -> bool:
+    """Map the lexicon file if present. Called from AppConfig.ready (the master, with preload)."""
+    global _mapped
+    path = path or bin_path()
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        _mapped = MappedLexicon(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.error('Could not map lexicon %s: %s', path, e)
+        return False
+    logger.info('Mapped lexicon %s (%d ranked words, %d entries)', path, _mapped.n_ranked, _mapped.n_entries)
+    return True
+
+
+def top_n_list(n: int, lang: str = 'en') -> List[str]:
+    """The ``n`` most frequent words from wordfreq (shared list; do not mutate)."""
+    key = (lang, n)
+    words = _top_lists.get(key)
+    if words is None:
+        with _lock:
+            words = _top_lists.get(key)
+            if words is None:
+                import wordfreq
+
+                words = _top_lists[key] = wordfreq.top_n_list(lang, n)
+    return words
+
+
+def words_in_range(start: int, end: int) -> List[str]:
+    """Words ranked ``start``..``end`` by frequency (English)."""
+    if _mapped is not None and _mapped.n_ranked >= end:
+        return _mapped.ranked(start, end)
+    # One shared list for every slice, not one list per distinct ``end``
+    return top_n_list(max(end, RANKED_WORDS))[start:end]
+
+
+def is_loaded() -> bool:
+    """True once word lists can be served without importing or reading wordfreq."""
+    return _mapped is not None or ('en', RANKED_WORDS) in _top_lists
+
+
+def warm():
+    """Load the wordfreq list now rather than on the first game start."""
+    if not is_loaded():
+        top_n_list(RANKED_WORDS)
+
+
+def lookup_pairs(word: str) -> Optional[Tuple[List[str], List[str]]]:
+    """Known ``(synonyms, antonyms)`` for a word from the mapped lexicon, if any."""
+    if _mapped is None:
+        return None
+    return _mapped.lookup(word)
+
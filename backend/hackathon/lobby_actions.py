@@ -0,0 +1,140 @@
+"""
+Lobby actions as plain state transitions.
+
+Each action takes a lobby-like object (a ``Lobby`` row or the engine's
+``LiveLobby``: ``status``, ``host_email``, ``settings``, ``players_data``,
+``results_data``) plus keyword arguments. It changes the object in memory and
+returns the names of the fields it changed. Invalid actions raise
+``LobbyActionError`` before changing anything.
+
+Arguments are JSON-serializable and actions are deterministic, so the lobby
+engine can log ``(action, kwargs)`` and replay the log after a crash.
+"""
+import logging
+from typing import List, Optional
+
+from .lobby_updates import LobbyActionError
+
+logger = logging.getLogger(__name__)
+
+
+def join(lobby, player_id: str, name: str, picture: Optional[str] = None) -> List[str]:
+    if lobby.status == 'EXPIRED':
+        raise LobbyActionError('Lobby has expired', status=410)
+
+    # Check Name Duplication (Case insensitive)
+    for p in lobby.players_data:
+        # If names match but IDs differ, it's a duplicate
+        if p['name'].lower() == name.lower() and p['id'] != player_id:
+            raise LobbyActionError(f'Name "{name}" is already taken')
+
+    # Add player if not exists
+    existing_player = next((p for p in lobby.players_data if p['id'] == player_id), None)
+    if not existing_player:
+        lobby.players_data.append({
+            'id': player_id,
+            'name': name,
+            'team': None, # Default to None (Unassigned) - User MUST select team
+            'isHost': False,
+            'picture': picture
+        })
+        return ['players_data']
+    if existing_player['name'] != name:
+        existing_player['name'] = name
+        return ['players_data']
+    return []
+
+
+def join_team(lobby, player_id: str, team: str) -> List[str]:
+    if not team:
+        raise LobbyActionError('Team name is required')
+    for p in lobby.players_data:
+        if p['id'] == player_id:
+            p['team'] = team
+            return ['players_data']
+    raise LobbyActionError('Player not in lobby', status=403)
+
+
+def leave_team(lobby, player_id: str) -> List[str]:
+    for p in lobby.players_data:
+        if p['id'] == player_id:
+            p['team'] = None # Reset to unassigned
+            return ['players_data']
+    return []
+
+
+def set_difficulty(lobby, player_id: str, difficulty: Optional[str]) -> List[str]:
+    if lobby.host_email != player_id:
+        raise LobbyActionError('Only host can change difficulty', status=403)
+    lobby.settings['difficulty'] = difficulty
+    return ['settings']
+
+
+def start_game(lobby, player_id: str) -> List[str]:
+    if lobby.host_email != player_id:
+        raise LobbyActionError('Only host can start game', status=403)
+
+    # Dynamic Team Validation
+    assigned_teams = set(p.get('team') for p in lobby.players_data if p.get('team'))
+    unassigned_count = sum(1 for p in lobby.players_data if not p.get('team'))
+
+    if len(assigned_teams) < 2:
+        raise LobbyActionError('At least two teams are required to start the game')
+
+    if unassigned_count > 0:
+        raise LobbyActionError(f'All {unassigned_count} players must select a team')
+
+    lobby.status = 'STARTED'
+    lobby.results_data = [] # Critical for synchronization
+    return ['status', 'results_data']
+
+
+def result_entry(lobby, result: dict, fallback_team: str = 'A') -> dict:
+    """``result`` tagged with the submitting player's team."""
+    # Identify player's team from players_data using unique uid
+    player_data = next((p for p in lobby.players_data if p['id'] == result['player_id']), None)
+
+    # If player not found in lobby players_data, they shouldn't be submitting to this lobby
+    if not player_data:
+        logger.warning('Submission from UID %s not found in lobby %s', result['player_id'], lobby.code)
+    team = player_data.get('team', 'A') if player_data else fallback_team
+    return {**result, 'team': team}
+
+
+def submit_result(lobby, result: dict, fallback_team: str = 'A') -> List[str]:
+    lobby.results_data.append(result_entry(lobby, result, fallback_team))
+    return ['results_data']
+
+
+def all_players_finished(lobby) -> bool:
+    """True once every player assigned to a team has submitted all 5 rounds."""
+    # 1. Identify all players who have been assigned to ANY team
+    active_pids = [p.get('id') for p in lobby.players_data if p.get('team') is not None]
+    
+    # 2. Calculate completion map from actual submissions
+    comp_map = {}
+    for r in lobby.results_data:
+        pid = r.get('player_id') or r.get('player_email')
+        if pid:
+            comp_map[pid] = comp_map.get(pid, 0) + 1
+            
+    # 3. Global synchronization: Everyone assigned to a team must finish 5 rounds
+    return len(active_pids) > 0 and all(comp_map.get(pid, 0) >= 5 for pid in active_pids)
+
+
+ACTIONS = {
+    'join': join,
+    'join_team': join_team,
+    'leave_team': leave_team,
+    'set_difficulty': set_difficulty,
+    'start_game': start_game,
+    'submit_result': submit_result,
+}
+
+
+def apply(lobby, action: str, **kwargs) -> List[str]:
+    handler = ACTIONS.get(action)
+    if handler is None:
+        # Unknown actions leave the lobby as is (the update endpoint echoes it back)
+        return []
+    return handler(lobby, **kwargs)
@@ -0,0 +1,93 @@
+"""
+Collision-free lobby code allocation.
+
+Codes are 6 characters from A-Z0-9 (36^6 ~= 2.18 billion codes). Each code is
+derived from a counter by a keyed permutation of that space, so consecutive
+counters give unrelated codes and no two counters share a code. Counters come
+from the ``CodeSequence`` row in blocks of ``BLOCK_SIZE``. A process hits the
+DB once per block, never per lobby, and never needs "generate and retry".
+
+Codes are the only credential for joining a lobby, so the permutation must not
+be recoverable from codes a player has seen. It is a Feistel network over the
+two 3-character halves of a code (36^3 values each), with HMAC-SHA256 keyed by
+``SECRET_KEY`` as the round function. Without the key, observed codes say
+nothing about other counters' codes.
+
+The counter wraps after the whole space is used. By then the lifecycle job
+(``manage_lobbies``) has long since archived the lobbies holding those codes.
+"""
+import hashlib
+import hmac
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import CodeSequence
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+CODE_LENGTH = 6
+SPACE = len(ALPHABET) ** CODE_LENGTH
+HALF = len(ALPHABET) ** (CODE_LENGTH // 2)
+SEQUENCE_NAME = 'lobby_code'
+BLOCK_SIZE = 100
+FEISTEL_ROUNDS = 6
+
+
+def _derive_key(secret: str) -> bytes:
+    return hashlib.sha256(f'lobby-code:{secret}'.encode('utf-8')).digest()
+
+
+def _round(key: bytes, round_number: int, half: int) -> int:
+    digest = hmac.new(key, f'{round_number}:{half}'.encode('ascii'), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], 'big') % HALF
+
+
+def permute(key: bytes, index: int) -> int:
+    """Keyed bijection of ``range(SPACE)``."""
+    left, right = divmod(index, HALF)
+    for round_number in range(FEISTEL_ROUNDS):
+        left, right = right, (left + _round(key, round_number, right)) % HALF
+    return left * HALF + right
+
+
+def encode(index: int) -> str:
+    chars = []
+    for _ in range(CODE_LENGTH):
+        index, rem = divmod(index, len(ALPHABET))
+        chars.append(ALPHABET[rem])
+    return ''.join(reversed(chars))
+
+
+class LobbyCodeAllocator:
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._key = None
+
+    def _reserve_block(self):
+        with transaction.atomic():
+            seq, _ = CodeSequence.objects.select_for_update().get_or_create(name=SEQUENCE_NAME)
+            start = seq.next_value
+            seq.next_value = start + self.block_size
+            seq.save(update_fields=['next_value'])
+        self._next, self._end = start, start + self.block_size
+
+    def code_for(self, counter: int) -> str:
+        if self._key is None:
+            self._key = _derive_key(settings.SECRET_KEY or '')
+        return encode(permute(self._key, counter % SPACE))
+
+    def allocate(self) -> str:
+        with self._lock:
+            if self._next >= self._end:
+                self._reserve_block()
+            counter = self._next
+            self._next += 1
+        return self.code_for(counter)
+
+
+# Global instance
+lobby_codes = LobbyCodeAllocator()
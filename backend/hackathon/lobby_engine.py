@@ -0,0 +1,322 @@
+"""
+Optional in-memory lobby engine (``settings.LOBBY_ENGINE``).
+
+Live lobbies are held in this process as ``LiveLobby`` objects. Actions from
+``lobby_actions`` are applied one at a time under a per-lobby lock, without
+touching the database, and the rendered status response is cached until the
+next action. Status polls and actions are served from memory.
+
+Persistence is asynchronous. A background thread, every
+``LOBBY_ENGINE_FLUSH_MS``:
+- appends new actions to ``LobbyAction`` as ``(lobby_code, seq, action, kwargs)``;
+- every ``LOBBY_ENGINE_SNAPSHOT_SECONDS``, writes the full state to the
+  ``Lobby`` row with ``version = seq``, compare-and-swap on the last version
+  it wrote, and deletes the log rows the snapshot covers.
+
+Loading a lobby reads its ``Lobby`` row and replays logged actions with
+``seq > version``. After a crash, a lobby comes back as of its last flushed
+action.
+
+The engine must be the only writer for a lobby. Every request for a lobby
+code has to reach the same process (one worker, or lobby-sharded routing).
+If the snapshot CAS finds the row changed by someone else (e.g.
+``manage_lobbies``), the live copy is dropped and reloaded on next use.
+"""
+import atexit
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, router, transaction
+from django.utils import timezone
+
+from . import lobby_actions, metrics
+from .models import Lobby, LobbyAction
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+STATE_FIELDS = ('status', 'settings', 'players_data', 'results_data')
+
+ENGINE_ACTIONS = metrics.registry.counter(
+    'sortonym_lobby_engine_actions_total',
+    'Actions applied by the in-memory lobby engine, by result.',
+    labels=('action', 'result'),
+)
+ENGINE_LIVE = metrics.registry.gauge(
+    'sortonym_lobby_engine_live_lobbies',
+    'Lobbies currently held in memory by this process.',
+)
+ENGINE_PERSIST = metrics.registry.counter(
+    'sortonym_lobby_engine_persist_total',
+    'Log appends, snapshots, replays and snapshot conflicts.',
+    labels=('operation',),
+)
+ENGINE_FLUSH_DURATION = metrics.registry.histogram(
+    'sortonym_lobby_engine_flush_seconds',
+    'Time spent per background flush.',
+)
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, 'LOBBY_ENGINE', False))
+
+
+class LiveLobby:
+    def __init__(self, row: Lobby):
+        self.id = row.id
+        self.code = row.code
+        self.host_email = row.host_email
+        self.host_name = row.host_name
+        self.status = row.status
+        self.settings = row.settings
+        self.players_data = row.players_data
+        self.results_data = row.results_data
+        self.seq = row.version            # last applied action
+        self.persisted_seq = row.version  # version of the Lobby row we last wrote or read
+        self.pending: List[Tuple[int, str, dict]] = []
+        self.lock = threading.Lock()
+        self.response = None
+        self.updated_at = row.updated_at  # last change, for poll hints
+        self.evicted = False
+        self.last_used = time.monotonic()
+        self.last_snapshot = time.monotonic()
+
+
+class LobbyEngine:
+    def __init__(self):
+        self._lobbies: Dict[str, LiveLobby] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight('lobby_engine_load')
+        self._flusher_pid = None
+
+    @property
+    def flush_interval(self) -> float:
+        return int(getattr(settings, 'LOBBY_ENGINE_FLUSH_MS', 200)) / 1000.0
+
+    @property
+    def snapshot_interval(self) -> float:
+        return float(getattr(settings, 'LOBBY_ENGINE_SNAPSHOT_SECONDS', 2))
+
+    @property
+    def idle_seconds(self) -> float:
+        return float(getattr(settings, 'LOBBY_ENGINE_IDLE_SECONDS', 600))
+
+    def enabled(self) -> bool:
+        return enabled()
+
+    def _db(self) -> str:
+        return router.db_for_write(Lobby)
+
+    def _load(self, code: str) -> LiveLobby:
+        live = self._lobbies.get(code)
+        if live is not None:
+            return live
+        db = self._db()
+        live = LiveLobby(Lobby.objects.using(db).get(code=code))
+        for entry in LobbyAction.objects.using(db).filter(lobby_code=code, seq__gt=live.seq).order_by('seq'):
+            lobby_actions.apply(live, entry.action, **entry.payload)
+            live.seq = entry.seq
+            ENGINE_PERSIST.inc(operation='replay')
+        with self._lock:
+            self._lobbies[code] = live
+            if live.seq > live.persisted_seq:
+                # Replayed actions are in the log but not in the row yet
+                self._dirty.add(code)
+            ENGINE_LIVE.set(len(self._lobbies))
+        return live
+
+    def _get(self, code: str) -> LiveLobby:
+        live = self._lobbies.get(code)
+        if live is None:
+            live = self._loads.do(code, self._load, code)
+        return live
+
+    def _render(self, live: LiveLobby, render: Callable) -> dict:
+        if live.response is None:
+            # Copied so later actions can't change a response that's being serialized
+            live.response = copy.deepcopy(render(live))
+        return live.response
+
+    def apply(self, code: str, action: str, render: Callable, **kwargs) -> dict:
+        """Apply one action and return the rendered lobby. Raises ``Lobby.DoesNotExist``/``LobbyActionError``."""
+        self._ensure_flusher()
+        while True:
+            live = self._get(code)
+            with live.lock:
+                if live.evicted:
+                    continue
+                try:
+                    changed = lobby_actions.apply(live, action, **kwargs)
+                except Exception:
+                    ENGINE_ACTIONS.inc(action=action, result='rejected')
+                    raise
+                live.last_used = time.monotonic()
+                if changed:
+                    live.seq += 1
+                    live.pending.append((live.seq, action, kwargs))
+                    live.response = None
+                    live.updated_at = timezone.now()
+                    with self._lock:
+                        self._dirty.add(code)
+                ENGINE_ACTIONS.inc(action=action, result='applied' if changed else 'noop')
+                return self._render(live, render)
+
+    def status(self, code: str, render: Callable) -> dict:
+        while True:
+            live = self._get(code)
+            with live.lock:
+                if live.evicted:
+                    continue
+                live.last_used = time.monotonic()
+                return self._render(live, render)
+
+    def updated_at(self, code: str):
+        """When a live lobby last changed, or None if it isn't held here."""
+        live = self._lobbies.get(code)
+        return live.updated_at if live is not None else None
+
+    def _evict(self, live: LiveLobby):
+        """Caller holds ``live.lock``."""
+        live.evicted = True
+        with self._lock:
+            if self._lobbies.get(live.code) is live:
+                del self._lobbies[live.code]
+            ENGINE_LIVE.set(len(self._lobbies))
+
+    def _flush_lobby(self, live: LiveLobby, force_snapshot: bool) -> bool:
+        """Persist one lobby; returns True if it still has unpersisted state."""
+        db = self._db()
+        with live.lock:
+            if live.evicted:
+                return False
+            pending, live.pending = live.pending, []
+            snapshot = None
+            due = force_snapshot or time.monotonic() - live.last_snapshot >= self.snapshot_interval
+            if due and live.seq > live.persisted_seq:
+                snapshot = (live.seq, {name: copy.deepcopy(getattr(live, name)) for name in STATE_FIELDS})
+
+        if pending:
+            try:
+                LobbyAction.objects.using(db).bulk_create([
+                    LobbyAction(lobby_code=live.code, seq=seq, action=action, payload=kwargs)
+                    for seq, action, kwargs in pending
+                ])
+                ENGINE_PERSIST.inc(len(pending), operation='log')
+            except IntegrityError:
+                # Another process logged these seqs: it owns the lobby now
+                with live.lock:
+                    ENGINE_PERSIST.inc(operation='log_conflict')
+                    logger.warning('Lobby %s was written by another node; dropping the local copy', live.code)
+                    self._evict(live)
+                return False
+            except Exception:
+                with live.lock:
+                    live.pending[:0] = pending
+                raise
+
+        if snapshot is not None:
+            seq, state = snapshot
+            with transaction.atomic(using=db):
+                updated = Lobby.objects.using(db).filter(pk=live.id, version=live.persisted_seq).update(
+                    **state, version=seq, updated_at=timezone.now()
+                )
+                if updated:
+                    LobbyAction.objects.using(db).filter(lobby_code=live.code, seq__lte=seq).delete()
+            with live.lock:
+                if updated:
+                    live.persisted_seq = seq
+                    live.last_snapshot = time.monotonic()
+                    ENGINE_PERSIST.inc(operation='snapshot')
+                else:
+                    ENGINE_PERSIST.inc(operation='snapshot_conflict')
+                    logger.warning('Lobby %s changed outside the engine; reloading it', live.code)
+                    self._evict(live)
+                    return False
+
+        with live.lock:
+            return bool(live.pending) or live.seq > live.persisted_seq
+
+    def flush(self, force_snapshot: bool = False):
+        start = time.perf_counter()
+        with self._lock:
+            codes, self._dirty = self._dirty, set()
+        still_dirty = set()
+        for code in codes:
+            live = self._lobbies.get(code)
+            if live is None:
+                continue
+            try:
+                if self._flush_lobby(live, force_snapshot):
+                    still_dirty.add(code)
+            except Exception as e:
+                logger.error('Persisting lobby %s failed: %s', code, e)
+                still_dirty.add(code)
+        if still_dirty:
+            with self._lock:
+                self._dirty |= still_dirty
+        self._evict_idle()
+        ENGINE_FLUSH_DURATION.observe(time.perf_counter() - start)
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        for live in list(self._lobbies.values()):
+            if live.last_used >= cutoff:
+                continue
+            with live.lock:
+                if not live.pending and live.seq == live.persisted_seq and live.last_used < cutoff:
+                    self._evict(live)
+
+    def release(self, predicate: Callable[[str], bool]) -> int:
+        """Snapshot and drop live lobbies whose code matches (ownership moved elsewhere)."""
+        released = 0
+        for live in list(self._lobbies.values()):
+            if not predicate(live.code):
+                continue
+            try:
+                self._flush_lobby(live, force_snapshot=True)
+            except Exception as e:
+                logger.error('Persisting lobby %s before hand-off failed: %s', live.code, e)
+            with live.lock:
+                if not live.evicted:
+                    self._evict(live)
+                    released += 1
+        return released
+
+    def flush_all(self):
+        """Write everything, snapshots included (worker shutdown, tests, commands)."""
+        try:
+            self.flush(force_snapshot=True)
+        except Exception as e:
+            logger.error('Final lobby engine flush failed: %s', e)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error('Lobby engine flush failed: %s', e)
+            finally:
+                close_old_connections()
+
+    def _ensure_flusher(self):
+        # Per process: a thread started before a fork does not exist in the child
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            threading.Thread(target=self._run, name='lobby-engine-flush', daemon=True).start()
+            atexit.register(self.flush_all)
+
+
+# Global instance
+lobby_engine = LobbyEngine()
@@ -0,0 +1,335 @@
+"""
+Lobby ownership across nodes by consistent hashing of the lobby code.
+
+Each node is one server process with its own lobby engine state, named by
+its base URL. ``LOBBY_NODES`` lists all nodes and ``LOBBY_NODE_SELF`` names
+this one. ``LOBBY_NODES_FILE`` (one URL per line, re-read when it changes) can
+replace the static list, so nodes can join or leave at runtime.
+
+Every node is placed on a hash ring ``LOBBY_RING_VNODES`` times. A lobby
+belongs to the first node clockwise from the hash of its code. Adding or
+removing a node therefore only moves about ``1/N`` of the lobbies.
+
+``LobbyShardMiddleware`` serves requests for lobbies this node owns. Other
+requests are either forwarded to the owner (default) or answered with a 307
+redirect to it (``LOBBY_SHARD_MODE=redirect``).
+
+A forwarded request carries ``X-Sortonym-Forwarded-By``: the sending node,
+a timestamp and an HMAC over both plus the method and path, keyed by
+``LOBBY_FORWARD_SECRET`` (default ``SECRET_KEY``). The receiver serves it
+locally, rather than bounce it between nodes whose rings briefly disagree,
+only if the signature checks out, the sender is a configured node and the
+timestamp is within ``FORWARD_MAX_SKEW`` seconds. Otherwise a client could
+make any node load any lobby and give it two in-memory writers.
+
+A failed forward answers 503. The owner is marked down for
+``LOBBY_NODE_RETRY_SECONDS``, and its lobbies fall to the next node on the
+ring, only after ``LOBBY_NODE_FAILURES`` consecutive failures and a failed
+health probe of its ``/`` endpoint. Moving a lobby away from a live owner
+would leave it with two writers. Whenever ownership changes, this node
+snapshots and drops the live lobbies it no longer owns
+(``lobby_engine.release``), so the new owner loads them from the database.
+"""
+import bisect
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+FORWARDED_HEADER = 'X-Sortonym-Forwarded-By'
+# Seconds a signed hop stays valid, allowing for clock skew between nodes
+FORWARD_MAX_SKEW = 30
+# Request headers passed through when forwarding
+FORWARD_HEADERS = ('Authorization', 'Cookie', 'Content-Type', 'X-Request-ID', 'Origin', 'X-Sortonym-DB-Pin')
+
+SHARD_REQUESTS = metrics.registry.counter(
+    'sortonym_lobby_shard_requests_total',
+    'Lobby requests by how they were routed: local, forwarded, redirected or forward_failed.',
+    labels=('result',),
+)
+RING_NODES = metrics.registry.gauge(
+    'sortonym_lobby_ring_nodes',
+    'Nodes currently on the lobby hash ring (excluding ones marked down).',
+)
+RING_CHANGES = metrics.registry.counter(
+    'sortonym_lobby_ring_changes_total',
+    'Times lobby ownership was recomputed because nodes joined or left.',
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str], vnodes: int = 64):
+        self.nodes = sorted(set(nodes))
+        points = sorted((_hash(f'{node}#{i}'), node) for node in self.nodes for i in range(vnodes))
+        self._keys = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, code: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(code.upper())) % len(self._keys)
+        return self._owners[index]
+
+
+def _normalize(url: str) -> str:
+    return url.strip().rstrip('/')
+
+
+class LobbyShards:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ring = None
+        self._ring_nodes = None
+        self._down: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._file_mtime = None
+        self._file_nodes: List[str] = []
+        self._checked_at = 0.0
+
+    @property
+    def self_node(self) -> str:
+        return _normalize(getattr(settings, 'LOBBY_NODE_SELF', '') or '')
+
+    @property
+    def enabled(self) -> bool:
+        # A node removed from the list stays enabled: it forwards everything
+        # and hands its live lobbies off
+        return bool(self.self_node) and bool(self.configured_nodes())
+
+    def configured_nodes(self) -> List[str]:
+        path = getattr(settings, 'LOBBY_NODES_FILE', '') or ''
+        if path:
+            self._reload_file(path)
+            return self._file_nodes
+        return [_normalize(n) for n in getattr(settings, 'LOBBY_NODES', []) if n.strip()]
+
+    def _reload_file(self, path: str):
+        now = time.monotonic()
+        if now - self._checked_at < 1.0:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime == self._file_mtime:
+                return
+            with open(path, encoding='utf-8') as f:
+                self._file_nodes = [_normalize(line) for line in f if line.strip() and not line.startswith('#')]
+            self._file_mtime = mtime
+        except OSError as e:
+            logger.warning('Could not read lobby node list %s: %s', path, e)
+
+    def mark_down(self, node: str):
+        retry = float(getattr(settings, 'LOBBY_NODE_RETRY_SECONDS', 10))
+        with self._lock:
+            self._down[node] = time.monotonic() + retry
+            self._failures.pop(node, None)
+        logger.warning('Lobby node %s marked down for %.0fs', node, retry)
+
+    def record_success(self, node: str):
+        if node in self._failures:
+            with self._lock:
+                self._failures.pop(node, None)
+
+    def record_failure(self, node: str) -> bool:
+        """Count a failed forward; returns True if the node is now marked down."""
+        threshold = int(getattr(settings, 'LOBBY_NODE_FAILURES', 3))
+        with self._lock:
+            failures = self._failures[node] = self._failures.get(node, 0) + 1
+        if failures < threshold:
+            return False
+        if self._probe(node):
+            # Alive, just slow or failing some requests: it keeps its lobbies
+            logger.warning('Lobby node %s failed %d forwards but answers its health check', node, failures)
+            with self._lock:
+                self._failures[node] = 0
+            return False
+        self.mark_down(node)
+        return True
+
+    def _probe(self, node: str) -> bool:
+        import requests
+
+        try:
+            response = requests.get(f'{node}/', timeout=float(getattr(settings, 'LOBBY_NODE_PROBE_TIMEOUT', 1.0)))
+        except requests.RequestException:
+            return False
+        return response.status_code == 200
+
+    def _live_nodes(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            for node, until in list(self._down.items()):
+                if until <= now:
+                    del self._down[node]
+            down = set(self._down)
+        return [n for n in self.configured_nodes() if n not in down]
+
+    def ring(self) -> HashRing:
+        nodes = tuple(sorted(self._live_nodes()))
+        ring = self._ring
+        if ring is not None and nodes == self._ring_nodes:
+            return ring
+        with self._lock:
+            if self._ring is not None and nodes == self._ring_nodes:
+                return self._ring
+            changed = self._ring is not None
+            self._ring = ring = HashRing(nodes, int(getattr(settings, 'LOBBY_RING_VNODES', 64)))
+            self._ring_nodes = nodes
+            RING_NODES.set(len(nodes))
+        if changed:
+            RING_CHANGES.inc()
+            logger.info('Lobby ring now has %d nodes: %s', len(nodes), ', '.join(nodes))
+            self._release_unowned()
+        return ring
+
+    def _release_unowned(self):
+        from .lobby_engine import lobby_engine
+
+        released = lobby_engine.release(lambda code: not self.owns(code))
+        if released:
+            logger.info('Handed off %d lobbies after ring change', released)
+
+    def owner(self, code: str) -> Optional[str]:
+        return self.ring().owner(code)
+
+    def owns(self, code: str) -> bool:
+        owner = self.owner(code)
+        return owner is None or owner == self.self_node
+
+
+# Global instance
+lobby_shards = LobbyShards()
+
+
+def lobby_code_for(request: HttpRequest) -> Optional[str]:
+    """The lobby a request acts on, or None for requests that aren't lobby-bound."""
+    path = request.path_info
+    if path == '/api/lobby/status':
+        return request.GET.get('code', '').upper().strip() or None
+    if path.startswith('/api/get/results/'):
+        return path.rsplit('/', 1)[-1].upper().strip() or None
+    if request.method == 'POST' and path in ('/api/lobby/join', '/api/lobby/update', '/api/game/submit'):
+        try:
+            payload = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        code = payload.get('gameCode') if path == '/api/game/submit' else payload.get('code')
+        return (code or '').upper().strip() or None
+    return None
+
+
+def _forward_key() -> bytes:
+    return (getattr(settings, 'LOBBY_FORWARD_SECRET', '') or settings.SECRET_KEY).encode('utf-8')
+
+
+def _hop_signature(node: str, timestamp: str, method: str, path: str) -> str:
+    msg = f'{node}|{timestamp}|{method}|{path}'.encode('utf-8')
+    return hmac.new(_forward_key(), msg, hashlib.sha256).hexdigest()
+
+
+def sign_hop(method: str, path: str) -> str:
+    """Value of ``FORWARDED_HEADER`` for a request this node forwards."""
+    node, timestamp = lobby_shards.self_node, str(int(time.time()))
+    return f'{node}|{timestamp}|{_hop_signature(node, timestamp, method, path)}'
+
+
+def is_trusted_hop(request: HttpRequest) -> bool:
+    """Whether the request was forwarded by a configured node (see module docstring)."""
+    value = request.headers.get(FORWARDED_HEADER, '')
+    try:
+        node, timestamp, signature = value.rsplit('|', 2)
+        age = abs(time.time() - int(timestamp))
+    except ValueError:
+        return False
+    if age > FORWARD_MAX_SKEW or node not in lobby_shards.configured_nodes():
+        return False
+    expected = _hop_signature(node, timestamp, request.method, request.path_info)
+    return hmac.compare_digest(signature, expected)
+
+
+def _forward(request: HttpRequest, owner: str) -> HttpResponse:
+    # requests is imported on the first forward, not at worker boot
+    import requests
+
+    headers = {name: request.headers[name] for name in FORWARD_HEADERS if name in request.headers}
+    headers[FORWARDED_HEADER] = sign_hop(request.method, request.path_info)
+    with metrics.track_outbound('lobby_node'):
+        upstream = requests.request(
+            request.method,
+            f'{owner}{request.path_info}',
+            params=request.GET,
+            data=request.body if request.method == 'POST' else None,
+            headers=headers,
+            timeout=float(getattr(settings, 'LOBBY_FORWARD_TIMEOUT', 5.0)),
+            allow_redirects=False,
+        )
+    response = HttpResponse(
+        upstream.content,
+        status=upstream.status_code,
+        content_type=upstream.headers.get('Content-Type', 'application/json'),
+    )
+    # e.g. the replica pinning cookie set by the owner
+    for header in upstream.raw.headers.getlist('Set-Cookie'):
+        response.cookies.load(header)
+    if 'X-Sortonym-DB-Pin' in upstream.headers:
+        response['X-Sortonym-DB-Pin'] = upstream.headers['X-Sortonym-DB-Pin']
+    # Returned above CommonMiddleware, which would otherwise set this
+    response['Content-Length'] = str(len(response.content))
+    response['X-Sortonym-Lobby-Node'] = owner
+    return response
+
+
+class LobbyShardMiddleware:
+    """Route lobby requests to the node that owns the lobby (see module docstring)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method == 'OPTIONS' or not lobby_shards.enabled:
+            return self.get_response(request)
+        code = lobby_code_for(request)
+        if code is None or lobby_shards.owns(code) or is_trusted_hop(request):
+            # Already forwarded once: serve it here rather than bounce between nodes
+            # whose rings briefly disagree
+            if code is not None:
+                SHARD_REQUESTS.inc(result='local')
+            return self.get_response(request)
+
+        owner = lobby_shards.owner(code)
+        if getattr(settings, 'LOBBY_SHARD_MODE', 'forward') == 'redirect':
+            SHARD_REQUESTS.inc(result='redirected')
+            return HttpResponseRedirect(f'{owner}{request.get_full_path()}', status=307)
+
+        try:
+            response = _forward(request, owner)
+        except Exception as e:
+            SHARD_REQUESTS.inc(result='forward_failed')
+            logger.warning('Forwarding lobby %s to %s failed: %s', code, owner, e)
+            if lobby_shards.record_failure(owner) and lobby_shards.owns(code):
+                # The ring moved the lobby here
+                return self.get_response(request)
+            return HttpResponse(
+                json.dumps({'error': 'Lobby server unavailable, please retry'}),
+                status=503, content_type='application/json',
+            )
+        lobby_shards.record_success(owner)
+        SHARD_REQUESTS.inc(result='forwarded')
+        return response
@@ -0,0 +1,212 @@
+"""
+Lock-free writes to ``Lobby`` rows.
+
+Two paths, neither takes ``select_for_update``:
+
+* ``mutate(code, action, fn)`` is compare-and-swap on ``Lobby.version``. It
+  reads the row, lets ``fn`` change it in memory and writes back only if the
+  version is unchanged. On a conflict it re-reads and retries a bounded number
+  of times. Use it for actions that validate against the whole lobby (join,
+  start game).
+* ``set_player_team``, ``set_setting`` and ``append_result`` change one JSON
+  path in the database (``JSON_SET`` / ``JSON_ARRAY_APPEND`` on MySQL,
+  ``json_set`` / ``json_insert`` on SQLite). Concurrent team changes and result
+  submissions then never conflict with each other. They still bump the version,
+  so a CAS writer holding an older copy retries rather than overwriting them.
+
+Both set ``updated_at`` explicitly, because ``QuerySet.update`` skips ``auto_now``.
+"""
+import json
+import logging
+import random
+import time
+from typing import Callable, Iterable, Optional
+
+from django.db import connections, router
+from django.db.models import F, Func, JSONField, Value
+from django.utils import timezone
+
+from . import metrics
+from .db_router import pin_to_primary
+from .models import Lobby
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 0.005
+
+LOBBY_WRITES = metrics.registry.counter(
+    'sortonym_lobby_writes_total',
+    'Lobby writes by action, path (cas/json) and result.',
+    labels=('action', 'path', 'result'),
+)
+LOBBY_WRITE_ATTEMPTS = metrics.registry.histogram(
+    'sortonym_lobby_write_attempts',
+    'Compare-and-swap attempts needed per lobby write.',
+    labels=('action',),
+    buckets=(1, 2, 3, 4, 5),
+)
+
+
+class LobbyActionError(Exception):
+    """A validation failure inside ``mutate``; carries the HTTP status to return."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class LobbyConflict(Exception):
+    """Raised when ``mutate`` gave up after ``MAX_ATTEMPTS`` version conflicts."""
+
+
+class JSONSet(Func):
+    """``JSON_SET(column, path, value)``: replace the value at one path."""
+    function = 'JSON_SET'
+    output_field = JSONField()
+
+    def __init__(self, expression, path: str, value, **extra):
+        super().__init__(expression, Value(path), Value(value), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='json_set', **extra_context)
+
+
+class JSONAppend(Func):
+    """Append a JSON document to the top-level array in a column."""
+    output_field = JSONField()
+
+    def __init__(self, expression, document, **extra):
+        super().__init__(expression, Value(json.dumps(document)), **extra)
+
+    def _compile(self, compiler, template: str):
+        column, document = self.get_source_expressions()
+        column_sql, column_params = compiler.compile(column)
+        document_sql, document_params = compiler.compile(document)
+        return template.format(column=column_sql, document=document_sql), (*column_params, *document_params)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self._compile(compiler, "JSON_ARRAY_APPEND({column}, '$', CAST({document} AS JSON))")
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self._compile(compiler, "json_insert({column}, '$[#]', json({document}))")
+
+
+def supports_json_paths() -> bool:
+    alias = router.db_for_write(Lobby)
+    return connections[alias].vendor in ('mysql', 'sqlite')
+
+
+def _load(code: str) -> Lobby:
+    # The version must come from the primary, or a lagging replica makes every attempt conflict
+    pin_to_primary()
+    return Lobby.objects.get(code=code)
+
+
+def mutate(code: str, action: str, fn: Callable[[Lobby], Optional[Iterable[str]]]) -> Lobby:
+    """
+    Apply ``fn`` to the lobby with optimistic concurrency.
+
+    ``fn`` changes the instance in memory and returns the names of the fields it
+    changed (nothing to write when empty or ``None``). It may raise
+    ``LobbyActionError``. It can run several times, so it must not have side effects.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        lobby = _load(code)
+        fields = list(fn(lobby) or ())
+        if not fields:
+            LOBBY_WRITES.inc(action=action, path='cas', result='noop')
+            return lobby
+
+        now = timezone.now()
+        updated = Lobby.objects.filter(pk=lobby.pk, version=lobby.version).update(
+            **{name: getattr(lobby, name) for name in fields},
+            version=F('version') + 1,
+            updated_at=now,
+        )
+        if updated:
+            lobby.version += 1
+            lobby.updated_at = now
+            LOBBY_WRITES.inc(action=action, path='cas', result='ok')
+            LOBBY_WRITE_ATTEMPTS.observe(attempt, action=action)
+            return lobby
+
+        LOBBY_WRITES.inc(action=action, path='cas', result='conflict')
+        time.sleep(random.uniform(0, BACKOFF_SECONDS * attempt))
+
+    LOBBY_WRITES.inc(action=action, path='cas', result='exhausted')
+    logger.warning('Gave up %s on lobby %s after %d conflicts', action, code, MAX_ATTEMPTS)
+    raise LobbyConflict(f'Lobby {code} is busy, please retry')
+
+
+def _json_update(lobby: Lobby, action: str, guard: dict, **columns) -> bool:
+    now = timezone.now()
+    updated = Lobby.objects.filter(pk=lobby.pk, **guard).update(
+        **columns, version=F('version') + 1, updated_at=now
+    )
+    LOBBY_WRITES.inc(action=action, path='json', result='ok' if updated else 'conflict')
+    if updated:
+        lobby.version += 1
+        lobby.updated_at = now
+    return bool(updated)
+
+
+def set_player_team(lobby: Lobby, player_id: str, team: Optional[str], action: str) -> Optional[Lobby]:
+    """
+    Set one player's team in place and return the updated lobby, or None if the
+    player is not in it. ``lobby`` is the caller's copy, used to find the
+    player's index. Players are only ever appended, so the index is stable. The
+    update is still guarded on the id at that index.
+    """
+    index = next((i for i, p in enumerate(lobby.players_data) if p.get('id') == player_id), None)
+    if index is None:
+        return None
+
+    if not supports_json_paths():
+        def apply(current):
+            for p in current.players_data:
+                if p.get('id') == player_id:
+                    p['team'] = team
+                    return ['players_data']
+            raise LobbyActionError('Player not in lobby', status=403)
+        return mutate(lobby.code, action, apply)
+
+    if not _json_update(lobby, action, {f'players_data__{index}__id': player_id},
+                        players_data=JSONSet(F('players_data'), f'$[{index}].team', team)):
+        return None
+    lobby.players_data[index]['team'] = team
+    return lobby
+
+
+def set_setting(lobby: Lobby, key: str, value, action: str) -> Lobby:
+    """Set one key of ``Lobby.settings`` in place and return the updated lobby."""
+    if not supports_json_paths():
+        def apply(current):
+            current.settings[key] = value
+            return ['settings']
+        return mutate(lobby.code, action, apply)
+
+    _json_update(lobby, action, {}, settings=JSONSet(F('settings'), f'$.{key}', value))
+    lobby.settings[key] = value
+    return lobby
+
+
+def append_result(code: str, result: dict) -> bool:
+    """Append one entry to ``Lobby.results_data`` in place. False if the lobby is gone."""
+    if not supports_json_paths():
+        def apply(current):
+            current.results_data = list(current.results_data) + [result]
+            return ['results_data']
+        try:
+            mutate(code, 'submit_result', apply)
+        except Lobby.DoesNotExist:
+            return False
+        return True
+
+    now = timezone.now()
+    updated = Lobby.objects.filter(code=code).update(
+        results_data=JSONAppend(F('results_data'), result), version=F('version') + 1, updated_at=now
+    )
+    LOBBY_WRITES.inc(action='submit_result', path='json', result='ok' if updated else 'missing')
+    return bool(updated)
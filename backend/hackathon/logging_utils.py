@@ -0,0 +1,144 @@
+"""
+Structured, non-blocking logging helpers wired up from ``settings.LOGGING``.
+
+Records are filtered (rate limit / sampling) and stamped with the current
+request id on the calling thread, then handed to a bounded queue. A single
+background listener thread does the JSON formatting and the actual write, so a
+slow stdout never stalls a request. When the queue is full records are dropped
+rather than blocking.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        if request_id == '-':
+            # django.request records carry the request, which RequestIdMiddleware tags
+            request_id = getattr(getattr(record, 'request', None), 'request_id', '-')
+        record.request_id = request_id
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per call-site token bucket plus probabilistic sampling.
+
+    ``rate`` records per second are allowed for each (file, line) with bursts up
+    to ``burst``. Records below WARNING are additionally sampled at
+    ``sample_rate``. Suppressed records are counted and reported on the next
+    record that gets through from the same call site.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 20, sample_rate: float = 1.0):
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.sample_rate = float(sample_rate)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.sample_rate < 1.0:
+            if random.random() >= self.sample_rate:
+                return False
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(site, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1.0:
+                self._buckets[site] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[site] = (tokens - 1.0, now, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'suppressed'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueListenerHandler(logging.handlers.QueueHandler):
+    """QueueHandler that owns its listener thread and a stream target."""
+
+    def __init__(self, maxsize: int = 10000, stream=None):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, not the request thread.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and exc_info now so the record is safe to hand across
+        # threads; leave the JSON encoding to the target handler.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def restart_listener(self):
+        """Start a fresh listener thread; threads do not survive ``fork()``."""
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+
+def restart_listeners():
+    """Call in each forked worker (gunicorn ``post_fork``) when the app was preloaded."""
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    seen = set()
+    for logger in loggers:
+        for handler in logger.handlers:
+            if isinstance(handler, QueueListenerHandler) and id(handler) not in seen:
+                seen.add(id(handler))
+                handler.restart_listener()
@@ -0,0 +1,120 @@
+import csv
+import os
+import shutil
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hackathon.models import GameResult, GameResultArchive, PlayerScoreSummary
+
+CSV_FIELDS = ['player_email', 'player_name', 'round_id', 'score', 'total_correct', 'time_taken', 'created_at']
+
+
+class Command(BaseCommand):
+    help = 'Move GameResult rows older than N days into the archive and fold them into PlayerScoreSummary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep this many days of results in GameResult')
+        parser.add_argument('--format', choices=['table', 'csv'], default='table',
+                            help='Archive into GameResultArchive or monthly CSV files')
+        parser.add_argument('--output', default='archive', help='Directory for --format csv')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        # The daily-challenge check looks at today's rows, so they must stay hot
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        old = GameResult.objects.filter(created_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'Would archive {old.count()} results older than {cutoff:%Y-%m-%d %H:%M}')
+            return
+
+        if options['format'] == 'csv':
+            os.makedirs(options['output'], exist_ok=True)
+
+        total = 0
+        while True:
+            staged = []
+            with transaction.atomic():
+                chunk = list(old.order_by('id')[:options['chunk_size']].select_for_update())
+                if not chunk:
+                    break
+                if options['format'] == 'csv':
+                    staged = self._write_csv(chunk, options['output'])
+                else:
+                    GameResultArchive.objects.bulk_create([
+                        GameResultArchive(**{f: getattr(r, f) for f in CSV_FIELDS}) for r in chunk
+                    ])
+                self._summarize(chunk)
+                GameResult.objects.filter(id__in=[r.id for r in chunk]).delete()
+            # Only once the rows are gone from GameResult, so a rollback cannot
+            # leave them in both places and a rerun cannot write them twice
+            for tmp_path, path in staged:
+                os.replace(tmp_path, path)
+            total += len(chunk)
+            self.stdout.write(f'  archived {total}...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} results; {GameResult.objects.count()} remain in the hot table'
+        ))
+
+    def _write_csv(self, rows, directory):
+        """Write each month's file plus ``rows`` to a temp copy; returns ``(tmp_path, path)`` pairs."""
+        by_month = {}
+        for r in rows:
+            by_month.setdefault(r.created_at.strftime('%Y-%m'), []).append(r)
+        staged = []
+        for month, month_rows in by_month.items():
+            path = os.path.join(directory, f'game_results_{month}.csv')
+            tmp_path = f'{path}.tmp'
+            new_file = not os.path.exists(path)
+            if not new_file:
+                shutil.copyfile(path, tmp_path)
+            with open(tmp_path, 'w' if new_file else 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(CSV_FIELDS)
+                for r in month_rows:
+                    writer.writerow([r.player_email, r.player_name or '', r.round_id, r.score,
+                                     r.total_correct, r.time_taken, r.created_at.isoformat()])
+            staged.append((tmp_path, path))
+        return staged
+
+    def _summarize(self, rows):
+        by_player = {}
+        for r in rows:
+            by_player.setdefault(r.player_email, []).append(r)
+
+        existing = {s.player_email: s for s in PlayerScoreSummary.objects.filter(player_email__in=by_player)}
+        to_create, to_update = [], []
+        for email, results in by_player.items():
+            summary = existing.get(email)
+            if summary is None:
+                summary = PlayerScoreSummary(player_email=email)
+                to_create.append(summary)
+            else:
+                to_update.append(summary)
+
+            best = max(results, key=lambda r: r.score)
+            summary.games_played += len(results)
+            summary.total_score += sum(r.score for r in results)
+            if summary.best_at is None or best.score > summary.best_score:
+                summary.best_score = best.score
+                summary.best_total_correct = best.total_correct
+                summary.best_time_taken = best.time_taken
+                summary.best_at = best.created_at
+            latest = max(results, key=lambda r: r.created_at)
+            if summary.last_played_at is None or latest.created_at > summary.last_played_at:
+                summary.last_played_at = latest.created_at
+                summary.player_name = latest.player_name or summary.player_name
+
+        PlayerScoreSummary.objects.bulk_create(to_create)
+        PlayerScoreSummary.objects.bulk_update(to_update, [
+            'player_name', 'games_played', 'total_score', 'best_score', 'best_total_correct',
+            'best_time_taken', 'best_at', 'last_played_at',
+        ])
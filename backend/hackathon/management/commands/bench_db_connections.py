@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from hackathon import metrics
+from hackathon.benchmarking import format_report, load_report, save_report, summarize
+from hackathon.models import Lobby
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request connect (CONN_MAX_AGE=0) against persistent connections for a lobby status read'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help='Simulated requests per mode')
+        parser.add_argument('--max-age', type=int, default=60, help='CONN_MAX_AGE for the persistent run')
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+        parser.add_argument('--compare', dest='compare_path', help='Compare against a previously saved JSON report')
+
+    def _run(self, max_age: int, health_checks: bool, iterations: int) -> dict:
+        conn = connections[DEFAULT_DB_ALIAS]
+        conn.close()
+        conn.settings_dict['CONN_MAX_AGE'] = max_age
+        conn.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+        opened_before = metrics.DB_CONNECTIONS_OPENED.value(alias=DEFAULT_DB_ALIAS)
+
+        code = Lobby.objects.values_list('code', flat=True).first() or 'NOLOBBY'
+        conn.close()
+
+        samples = []
+        wall = time.perf_counter()
+        for _ in range(iterations):
+            # Same signals the WSGI handler sends, so Django's own
+            # close_old_connections decides whether to reconnect.
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            Lobby.objects.filter(code=code).first()
+            request_finished.send(sender=self.__class__)
+            samples.append(time.perf_counter() - start)
+        report = summarize(samples, wall_seconds=time.perf_counter() - wall)
+        report['connections_opened'] = metrics.DB_CONNECTIONS_OPENED.value(alias=DEFAULT_DB_ALIAS) - opened_before
+        return report
+
+    def handle(self, *args, **options):
+        conn = connections[DEFAULT_DB_ALIAS]
+        original = (conn.settings_dict['CONN_MAX_AGE'], conn.settings_dict['CONN_HEALTH_CHECKS'])
+        iterations = options['iterations']
+        try:
+            report = {
+                'connect_per_request': self._run(0, False, iterations),
+                f"persistent[max_age={options['max_age']}]": self._run(options['max_age'], True, iterations),
+            }
+        finally:
+            conn.close()
+            conn.settings_dict['CONN_MAX_AGE'], conn.settings_dict['CONN_HEALTH_CHECKS'] = original
+
+        baseline = load_report(options['compare_path']) if options['compare_path'] else None
+        self.stdout.write(format_report(report, baseline))
+        for name, row in report.items():
+            self.stdout.write(f"{name}: {row['connections_opened']:.0f} connections opened")
+
+        if options['json_path']:
+            save_report(options['json_path'], report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
@@ -0,0 +1,97 @@
+import random
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from hackathon.benchmarking import (
+    format_report,
+    load_report,
+    save_report,
+    stubbed_provider,
+    summarize,
+)
+from hackathon.views import LEVEL_CONFIG, _get_lobby_response, _score_round, get_words_from_wordfreq
+
+
+def _fake_lobby(players: int, teams: int, rounds: int) -> SimpleNamespace:
+    players_data = [
+        {'id': f'player{i}@example.com', 'name': f'Player {i}', 'team': str(i % teams + 1), 'isHost': i == 0}
+        for i in range(players)
+    ]
+    results_data = [
+        {
+            'player': p['name'],
+            'player_email': p['id'],
+            'player_id': p['id'],
+            'team': p['team'],
+            'score': 7.5,
+            'total_correct': 6,
+            'time_taken': 20.0,
+            'timestamp': '2026-01-01T00:00:00+00:00',
+        }
+        for p in players_data
+        for _ in range(rounds)
+    ]
+    return SimpleNamespace(
+        code='BENCH1',
+        host_email=players_data[0]['id'],
+        host_name=players_data[0]['name'],
+        status='STARTED',
+        settings={'team_name': 'Bench', 'difficulty': 'MEDIUM'},
+        players_data=players_data,
+        results_data=results_data,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Run in-process micro-benchmarks for lobby formatting, scoring and word selection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Iterations per CPU-bound case')
+        parser.add_argument('--word-iterations', type=int, default=50, help='Iterations for word selection')
+        parser.add_argument('--provider-latency-ms', type=float, default=0.0, help='Latency injected into the stubbed provider')
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+        parser.add_argument('--compare', dest='compare_path', help='Compare against a previously saved JSON report')
+
+    def _bench(self, func, iterations: int) -> dict:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return summarize(samples)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        report = {}
+
+        for players, teams in ((10, 2), (50, 5), (200, 22)):
+            lobby = _fake_lobby(players, teams, rounds=5)
+            report[f'lobby_response[{players}p]'] = self._bench(lambda: _get_lobby_response(lobby), iterations)
+
+        rng = random.Random(42)
+        for level, config in LEVEL_CONFIG.items():
+            syns = {f'syn{i}' for i in range(12)}
+            ants = {f'ant{i}' for i in range(12)}
+            picked_syns = [f'syn_{w}' for w in rng.sample(sorted(syns), config['pairs'])]
+            picked_ants = [f'ant_{w}' for w in rng.sample(sorted(ants), config['pairs'])]
+            report[f'score_round[{level}]'] = self._bench(
+                lambda: _score_round(syns, ants, picked_syns, picked_ants, 12.5, config),
+                iterations,
+            )
+
+        latency = options['provider_latency_ms'] / 1000.0
+        with stubbed_provider(latency=latency):
+            for level in LEVEL_CONFIG:
+                report[f'word_selection[{level}]'] = self._bench(
+                    lambda: get_words_from_wordfreq(level),
+                    options['word_iterations'],
+                )
+
+        baseline = load_report(options['compare_path']) if options['compare_path'] else None
+        self.stdout.write(format_report(report, baseline))
+
+        if options['json_path']:
+            save_report(options['json_path'], report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hackathon.benchmarking import format_report, load_report, save_report, summarize
+
+# Runs in a fresh interpreter: time the WSGI boot, then the first hit of each
+# endpoint (which pays for URLconf/view imports and lazy per-feature imports).
+WORKER_SNIPPET = r'''
+import io, json, resource, sys, time
+from wsgiref.util import setup_testing_defaults
+
+start = time.perf_counter()
+from backend.wsgi import application
+timings = {'boot': time.perf_counter() - start}
+
+requests = json.loads(sys.argv[1])
+stub = None
+if sys.argv[2] == '1':
+    from hackathon.benchmarking import stubbed_provider
+    stub = stubbed_provider()
+    stub.__enter__()
+
+for name, method, path, body in requests:
+    data = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path.split('?')[0],
+        'QUERY_STRING': path.partition('?')[2],
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+    }
+    setup_testing_defaults(environ)
+    status = []
+    start = time.perf_counter()
+    response = application(environ, lambda s, h, exc_info=None: status.append(s))
+    b''.join(response)
+    response.close()
+    timings[name] = time.perf_counter() - start
+    timings[name + ':status'] = status[0]
+
+timings['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+print(json.dumps(timings))
+'''
+
+DEFAULT_REQUESTS = [
+    ('first:health', 'GET', '/api/health', None),
+    ('first:game_start', 'POST', '/api/game/start', {'level': 'easy'}),
+    ('first:lobby_status', 'GET', '/api/lobby/status?code=NOLOBBY', None),
+    ('first:certificate', 'GET', '/api/certificate?name=Bench&score=10&level=easy', None),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure worker boot time and first-request latency in fresh processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes to start')
+        parser.add_argument('--live-provider', action='store_true', help='Do not stub the lexicon provider')
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+        parser.add_argument('--compare', dest='compare_path', help='Compare against a previously saved JSON report')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings')}
+        samples = {}
+        rss = []
+        for _ in range(options['runs']):
+            proc = subprocess.run(
+                [sys.executable, '-c', WORKER_SNIPPET, json.dumps(DEFAULT_REQUESTS), '0' if options['live_provider'] else '1'],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                raise CommandError(f'Worker failed:\n{proc.stderr[-2000:]}')
+            timings = json.loads(proc.stdout.strip().splitlines()[-1])
+            rss.append(timings.pop('max_rss_mb'))
+            for name, value in timings.items():
+                if name.endswith(':status'):
+                    if not value.startswith(('2', '4')):
+                        self.stdout.write(self.style.WARNING(f"{name[:-7]} returned {value}"))
+                    continue
+                samples.setdefault(name, []).append(value)
+
+        report = {name: summarize(values) for name, values in samples.items()}
+        baseline = load_report(options['compare_path']) if options['compare_path'] else None
+        self.stdout.write(format_report(report, baseline))
+        self.stdout.write(f'Peak RSS per worker: {max(rss):.1f} MB')
+
+        if options['json_path']:
+            save_report(options['json_path'], report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
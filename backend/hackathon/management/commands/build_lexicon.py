@@ -0,0 +1,48 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from hackathon import lexicon
+from hackathon.models import SortonymWord, WordLookup
+
+
+def _split(value: str) -> list:
+    return [w.strip() for w in (value or '').split(',') if w.strip()]
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped lexicon file shared by all workers (frequency list + known word pairs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Output path (default: settings.LEXICON_BIN_PATH)')
+        parser.add_argument('--ranked', type=int, default=lexicon.RANKED_WORDS, help='How many frequency-ranked words to include')
+
+    def handle(self, *args, **options):
+        path = options['output'] or lexicon.bin_path()
+        if not path:
+            raise CommandError('Set LEXICON_BIN_PATH or pass --output')
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        import wordfreq
+
+        ranked = wordfreq.top_n_list('en', options['ranked'])
+
+        entries = {}
+        for word in SortonymWord.objects.all().iterator():
+            syns, ants = _split(word.synonyms), _split(word.antonyms)
+            if syns and ants:
+                entries[word.word.lower()] = (syns, ants)
+        # Playable provider answers cached in the word store. Unplayable ones are
+        # left out: the file has no expiry, and a word ruled out here would never
+        # be fetched again after its WordLookup row expired
+        for row in WordLookup.objects.filter(playable=True, expires_at__gt=timezone.now()).iterator():
+            entries.setdefault(row.word.lower(), (_split(row.synonyms), _split(row.antonyms)))
+
+        stats = lexicon.build(path, ranked, entries)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {path}: {stats['ranked']} ranked words, {stats['entries']} entries, "
+            f"{stats['strings']} distinct strings, {stats['bytes'] / 1024:.0f} KiB"
+        ))
+        self.stdout.write('Running workers keep the old mapping until they restart (e.g. gunicorn HUP).')
@@ -1,11 +1,17 @@
 import csv
+import hashlib
+import json
+import os
 import re
+import time
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.db.models import Q
 
 from hackathon.auth import PBKDF2_ITERATIONS, hash_password
 from hackathon.models import AppUser, AppUserMember
+from hackathon.process_pool import process_pool
 
 
 _TEAM_NO_RE = re.compile(r'^\s*Team\s*(\d+)\s*$', flags=re.IGNORECASE)
@@ -22,6 +28,11 @@ def _format_password(team_no: int) -> str:
     return f'Team@{team_no:03d}'
 
 
+def _hash_team_password(team_no: int) -> tuple[int, tuple[str, str, int]]:
+    """Process-pool worker: hash one team's default password."""
+    return team_no, hash_password(_format_password(team_no), iterations=PBKDF2_ITERATIONS)
+
+
 def _normalize_phone(raw: str) -> str:
     phone = re.sub(r'\D+', '', (raw or '').strip())
     if not phone:
@@ -29,6 +40,9 @@ def _normalize_phone(raw: str) -> str:
     return phone
 
 
+EXPECTED_HEADER = {'Team No.', 'Member ID', 'Name', 'Email', 'Phone'}
+
+
 class Command(BaseCommand):
     help = 'Import team accounts and members from hackathon_users.csv'
 
@@ -49,18 +63,40 @@ class Command(BaseCommand):
             action='store_true',
             help='Only create new teams/members found in CSV; do not update passwords or delete existing members',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used for password hashing (default: CPU count)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Teams written per transaction',
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Validate and write chunk by chunk without loading the whole CSV; rows must be grouped by Team No.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file for --stream (default: <csv>.checkpoint); an interrupted import resumes from it',
+        )
 
     def handle(self, *args, **options):
         csv_path = options['csv_path']
-        dry_run = options['dry_run']
-        append_only = options['append_only']
 
         try:
             with open(csv_path, newline='', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
-                expected = {'Team No.', 'Member ID', 'Name', 'Email', 'Phone'}
-                if set(reader.fieldnames or []) != expected:
-                    raise CommandError(f'CSV header must be exactly {sorted(expected)}. Got: {reader.fieldnames}')
+                if set(reader.fieldnames or []) != EXPECTED_HEADER:
+                    raise CommandError(f'CSV header must be exactly {sorted(EXPECTED_HEADER)}. Got: {reader.fieldnames}')
+
+                if options['stream']:
+                    self._handle_stream(reader, options)
+                    return
 
                 rows = [row for row in reader]
         except FileNotFoundError as exc:
@@ -70,36 +106,15 @@ class Command(BaseCommand):
         seen_member_ids: set[str] = set()
 
         for idx, row in enumerate(rows, start=2):
-            if not (row.get('Team No.') or '').strip() and not (row.get('Phone') or '').strip():
-                continue
-
-            team_no_raw = (row.get('Team No.') or '').strip()
-            member_id = (row.get('Member ID') or '').strip()
-            name = (row.get('Name') or '').strip()
-            email = (row.get('Email') or '').strip() or None
-            phone_raw = row.get('Phone')
-
-            if not team_no_raw and not name and not email and not (phone_raw or '').strip():
+            parsed = _parse_row(idx, row)
+            if parsed is None:
                 continue
+            team_no, member = parsed
+            if member['member_id'] in seen_member_ids:
+                raise CommandError(f"Row {idx}: duplicate Member ID {member['member_id']!r}")
+            seen_member_ids.add(member['member_id'])
 
-            if not team_no_raw:
-                raise CommandError(f'Row {idx}: missing Team No.')
-            if not member_id:
-                raise CommandError(f'Row {idx}: missing Member ID')
-            if member_id in seen_member_ids:
-                raise CommandError(f'Row {idx}: duplicate Member ID {member_id!r}')
-            if not name:
-                raise CommandError(f'Row {idx}: missing Name')
-
-            try:
-                team_no = _parse_team_no(team_no_raw)
-                phone = _normalize_phone(phone_raw)
-            except ValueError as exc:
-                raise CommandError(f'Row {idx}: {exc}') from exc
-
-            seen_member_ids.add(member_id)
-
-            teams.setdefault(team_no, []).append({'member_id': member_id, 'name': name, 'email': email, 'phone': phone})
+            teams.setdefault(team_no, []).append(member)
 
         if not teams:
             raise CommandError('No valid team rows found in CSV.')
@@ -108,89 +123,338 @@ class Command(BaseCommand):
         self.stdout.write(f'Total members found: {sum(len(m) for m in teams.values())}')
 
         for team_no, members in sorted(teams.items()):
-            if len(members) < 1:
-                raise CommandError(f'Team {team_no} has no members')
-            if len(members) > 5:
-                raise CommandError(f'Team {team_no} has {len(members)} members (> 5).')
+            _validate_team(team_no, members)
 
-            phones: dict[str, str] = {}
-            for m in members:
-                if m['phone'] in phones and phones[m['phone']] != m['member_id']:
-                    raise CommandError(
-                        f"Team {team_no} has duplicate phone {m['phone']!r} for Member IDs {phones[m['phone']]!r} and {m['member_id']!r}."
-                    )
-                phones[m['phone']] = m['member_id']
-
-        if append_only:
-            for team_no, members in teams.items():
-                existing_user = AppUser.objects.filter(team_no=team_no).first()
-                if existing_user is None:
-                    continue
+        # 1. Prefetch everything the import touches in a handful of queries
+        users, members_by_id = _prefetch(teams)
+        if options['append_only']:
+            _check_append_only(teams, users, members_by_id)
 
-                existing_member_ids = set(
-                    AppUserMember.objects.filter(user=existing_user).values_list('member_id', flat=True)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry-run enabled: no DB changes.'))
+            return
+
+        with process_pool(options['workers']) as pool:
+            # 2. Hash passwords up front across processes; PBKDF2 is pure CPU
+            hashes = self._hash_passwords(teams, users, options, pool)
+
+            # 3. Write in chunks, each in its own short transaction
+            incoming_member_ids = {m['member_id'] for members in teams.values() for m in members}
+            team_nos = sorted(teams)
+            chunk_size = options['chunk_size']
+            start = time.perf_counter()
+            for offset in range(0, len(team_nos), chunk_size):
+                chunk = team_nos[offset:offset + chunk_size]
+                with transaction.atomic():
+                    _write_chunk(chunk, teams, users, members_by_id, incoming_member_ids, hashes, options['append_only'])
+                done = offset + len(chunk)
+                rate = done / max(time.perf_counter() - start, 1e-9)
+                self.stdout.write(f'  teams written: {done}/{len(team_nos)} ({rate:.0f}/s)')
+
+        self.stdout.write(self.style.SUCCESS('Import completed.'))
+
+    def _hash_passwords(self, teams, users, options, pool) -> dict[int, tuple[str, str, int]]:
+        team_nos = sorted(t for t in teams if t not in users or not options['append_only'])
+        if not team_nos:
+            return {}
+        workers = options['workers']
+        if not options['stream']:
+            self.stdout.write(f'Hashing {len(team_nos)} passwords on {workers} processes...')
+        start = time.perf_counter()
+        hashes = {}
+        chunksize = max(1, len(team_nos) // (workers * 4))
+        for done, (team_no, hashed) in enumerate(pool.map(_hash_team_password, team_nos, chunksize=chunksize), start=1):
+            hashes[team_no] = hashed
+            if not options['stream'] and (done % 250 == 0 or done == len(team_nos)):
+                self.stdout.write(f'  hashed {done}/{len(team_nos)} ({time.perf_counter() - start:.1f}s)')
+        return hashes
+
+    def _handle_stream(self, reader, options):
+        """
+        Import chunk by chunk as the CSV is read.
+
+        Only the teams of the current chunk are held in memory, plus the set of
+        team numbers already written (to catch a team that shows up again
+        later, which grouped input must not do). Each chunk is validated and
+        written in its own transaction, then the last committed row is saved to
+        the checkpoint file so a rerun picks up after it.
+        """
+        checkpoint_path = options['checkpoint'] or f"{options['csv_path']}.checkpoint"
+        resume_after, resume_digest = (0, None) if options['dry_run'] else _load_checkpoint(checkpoint_path)
+        if resume_after:
+            self.stdout.write(f'Resuming after row {resume_after} ({checkpoint_path})')
+
+        buffered: dict[int, list[dict]] = {}
+        written_teams: set[int] = set()
+        current_team = None
+        totals = {'teams': 0, 'members': 0}
+        start = time.perf_counter()
+
+        with process_pool(options['workers']) as pool:
+            def flush(last_row, digest):
+                if not buffered:
+                    return
+                self._import_stream_chunk(buffered, written_teams, options, pool)
+                totals['teams'] += len(buffered)
+                totals['members'] += sum(len(m) for m in buffered.values())
+                buffered.clear()
+                if not options['dry_run']:
+                    _save_checkpoint(checkpoint_path, options['csv_path'], last_row, digest)
+                rate = totals['teams'] / max(time.perf_counter() - start, 1e-9)
+                self.stdout.write(
+                    f"  teams {'validated' if options['dry_run'] else 'written'}: {totals['teams']} "
+                    f"({totals['members']} members, up to row {last_row}, {rate:.0f} teams/s)"
                 )
-                incoming_member_ids = {m['member_id'] for m in members}
-                new_member_ids = incoming_member_ids - existing_member_ids
-                total_after = len(existing_member_ids) + len(new_member_ids)
-                if total_after > 5:
-                    raise CommandError(
-                        f'Team {team_no} would have {total_after} members (> 5) after append-only import.'
-                    )
-
-        if dry_run:
+
+            # Digest of the rows consumed so far; a resumed run checks that the
+            # already-imported part of the file is unchanged (later rows may be fixed)
+            rows_digest = hashlib.sha256()
+            last_idx = resume_after
+            for idx, row in enumerate(reader, start=2):
+                if idx == resume_after + 1:
+                    _verify_prefix(checkpoint_path, rows_digest.hexdigest(), resume_digest)
+                prefix_digest = rows_digest.hexdigest()
+                rows_digest.update('\x1f'.join(row.get(k) or '' for k in sorted(EXPECTED_HEADER)).encode('utf-8') + b'\n')
+                last_idx = idx
+                parsed = _parse_row(idx, row)
+                if parsed is None:
+                    continue
+                team_no, member = parsed
+                if idx <= resume_after:
+                    written_teams.add(team_no)
+                    continue
+
+                if team_no != current_team:
+                    if team_no in written_teams or team_no in buffered:
+                        raise CommandError(
+                            f'Row {idx}: Team {team_no} appears again after other teams; '
+                            '--stream needs rows grouped by Team No.'
+                        )
+                    if len(buffered) >= options['chunk_size']:
+                        flush(idx - 1, prefix_digest)
+                    current_team = team_no
+
+                members = buffered.setdefault(team_no, [])
+                if any(m['member_id'] == member['member_id'] for m in members):
+                    raise CommandError(f"Row {idx}: duplicate Member ID {member['member_id']!r}")
+                members.append(member)
+                if len(members) > 5:
+                    raise CommandError(f'Row {idx}: Team {team_no} has more than 5 members.')
+
+            if last_idx == resume_after:
+                _verify_prefix(checkpoint_path, rows_digest.hexdigest(), resume_digest)
+            flush(last_idx, rows_digest.hexdigest())
+
+        if not totals['teams'] and not resume_after:
+            raise CommandError('No valid team rows found in CSV.')
+
+        if options['dry_run']:
             self.stdout.write(self.style.WARNING('Dry-run enabled: no DB changes.'))
             return
 
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(f"Import completed ({totals['teams']} teams, {totals['members']} members)."))
+
+    def _import_stream_chunk(self, teams, written_teams, options, pool):
+        for team_no, members in teams.items():
+            _validate_team(team_no, members)
+
+        seen: dict[str, int] = {}
+        for team_no, members in teams.items():
+            for m in members:
+                if m['member_id'] in seen:
+                    raise CommandError(f"Duplicate Member ID {m['member_id']!r} in Teams {seen[m['member_id']]} and {team_no}")
+                seen[m['member_id']] = team_no
+
+        users, members_by_id = _prefetch(teams)
+        if options['append_only']:
+            _check_append_only(teams, users, members_by_id)
+
+        # A member already written under another team earlier in this run is a
+        # duplicate in the file, not a move between teams.
+        team_no_by_user_id = {u.id: team_no for team_no, u in users.items()}
+        earlier_user_ids = set(
+            AppUser.objects.filter(
+                id__in={m.user_id for m in members_by_id.values()} - set(team_no_by_user_id),
+                team_no__in=written_teams,
+            ).values_list('id', flat=True)
+        )
+        for member_id, team_no in seen.items():
+            existing = members_by_id.get(member_id)
+            if existing is not None and existing.user_id in earlier_user_ids:
+                raise CommandError(f'Duplicate Member ID {member_id!r}: already imported for an earlier team, repeated in Team {team_no}')
+
+        if options['dry_run']:
+            written_teams.update(teams)
+            return
+
+        hashes = self._hash_passwords(teams, users, options, pool)
         with transaction.atomic():
-            for team_no, members in teams.items():
-                unique_by_member_id: dict[str, dict] = {}
-                for m in members:
-                    unique_by_member_id[m['member_id']] = m
-                members = list(unique_by_member_id.values())
-
-                password = _format_password(team_no)
-                salt_b64, password_hash_b64, iterations = hash_password(password, iterations=PBKDF2_ITERATIONS)
-
-                user, created = AppUser.objects.get_or_create(
-                    team_no=team_no,
-                    defaults={
-                        'username': f'Team {team_no}',
-                        'email': None,
-                        'phone': None,
-                        'password_salt_b64': salt_b64,
-                        'password_hash_b64': password_hash_b64,
-                        'password_iterations': iterations,
-                        'is_active': True,
-                    },
+            _write_chunk(sorted(teams), teams, users, members_by_id, set(seen), hashes, options['append_only'])
+        written_teams.update(teams)
+
+
+def _parse_row(idx: int, row: dict):
+    """Return ``(team_no, member)`` for a data row, or ``None`` for a blank one."""
+    if not (row.get('Team No.') or '').strip() and not (row.get('Phone') or '').strip():
+        return None
+
+    team_no_raw = (row.get('Team No.') or '').strip()
+    member_id = (row.get('Member ID') or '').strip()
+    name = (row.get('Name') or '').strip()
+    email = (row.get('Email') or '').strip() or None
+    phone_raw = row.get('Phone')
+
+    if not team_no_raw and not name and not email and not (phone_raw or '').strip():
+        return None
+
+    if not team_no_raw:
+        raise CommandError(f'Row {idx}: missing Team No.')
+    if not member_id:
+        raise CommandError(f'Row {idx}: missing Member ID')
+    if not name:
+        raise CommandError(f'Row {idx}: missing Name')
+
+    try:
+        team_no = _parse_team_no(team_no_raw)
+        phone = _normalize_phone(phone_raw)
+    except ValueError as exc:
+        raise CommandError(f'Row {idx}: {exc}') from exc
+
+    return team_no, {'member_id': member_id, 'name': name, 'email': email, 'phone': phone}
+
+
+def _validate_team(team_no: int, members: list[dict]):
+    if len(members) < 1:
+        raise CommandError(f'Team {team_no} has no members')
+    if len(members) > 5:
+        raise CommandError(f'Team {team_no} has {len(members)} members (> 5).')
+
+    phones: dict[str, str] = {}
+    for m in members:
+        if m['phone'] in phones and phones[m['phone']] != m['member_id']:
+            raise CommandError(
+                f"Team {team_no} has duplicate phone {m['phone']!r} for Member IDs {phones[m['phone']]!r} and {m['member_id']!r}."
+            )
+        phones[m['phone']] = m['member_id']
+
+
+def _prefetch(teams: dict[int, list[dict]]):
+    """Existing users by team_no and members by member_id, in two queries."""
+    users = {u.team_no: u for u in AppUser.objects.filter(team_no__in=teams)}
+    incoming_member_ids = {m['member_id'] for members in teams.values() for m in members}
+    members_by_id = {
+        m.member_id: m
+        for m in AppUserMember.objects.filter(
+            Q(member_id__in=incoming_member_ids) | Q(user_id__in=[u.id for u in users.values()])
+        )
+    }
+    return users, members_by_id
+
+
+def _check_append_only(teams, users, members_by_id):
+    team_no_by_user_id = {u.id: team_no for team_no, u in users.items()}
+    member_ids_by_user: dict[int, set[str]] = {}
+    for m in members_by_id.values():
+        member_ids_by_user.setdefault(m.user_id, set()).add(m.member_id)
+
+    for team_no, members in teams.items():
+        for m in members:
+            existing = members_by_id.get(m['member_id'])
+            if existing is not None and team_no_by_user_id.get(existing.user_id) != team_no:
+                raise CommandError(
+                    f"Member ID {m['member_id']!r} already exists under another team; cannot append into Team {team_no}."
                 )
 
-                if not append_only and not created:
-                    AppUser.objects.filter(id=user.id).update(
-                        username=f'Team {team_no}',
-                        password_salt_b64=salt_b64,
-                        password_hash_b64=password_hash_b64,
-                        password_iterations=iterations,
-                        is_active=True,
-                    )
-
-                if not append_only:
-                    AppUserMember.objects.filter(user=user).exclude(member_id__in=[m['member_id'] for m in members]).delete()
-
-                for m in members:
-                    if append_only:
-                        member, created_member = AppUserMember.objects.get_or_create(
-                            member_id=m['member_id'],
-                            defaults={'user': user, 'phone': m['phone'], 'name': m['name'], 'email': m['email']},
-                        )
-                        if not created_member and member.user_id != user.id:
-                            raise CommandError(
-                                f"Member ID {m['member_id']!r} already exists under Team {member.user.team_no}; cannot append into Team {team_no}."
-                            )
-                    else:
-                        AppUserMember.objects.update_or_create(
-                            member_id=m['member_id'],
-                            defaults={'user': user, 'phone': m['phone'], 'name': m['name'], 'email': m['email']},
-                        )
+        existing_user = users.get(team_no)
+        if existing_user is None:
+            continue
+
+        existing_member_ids = member_ids_by_user.get(existing_user.id, set())
+        new_member_ids = {m['member_id'] for m in members} - existing_member_ids
+        total_after = len(existing_member_ids) + len(new_member_ids)
+        if total_after > 5:
+            raise CommandError(
+                f'Team {team_no} would have {total_after} members (> 5) after append-only import.'
+            )
+
+
+def _write_chunk(chunk, teams, users, members_by_id, incoming_member_ids, hashes, append_only):
+    new_users = []
+    changed_users = []
+    for team_no in chunk:
+        user = users.get(team_no)
+        if user is None:
+            salt_b64, password_hash_b64, iterations = hashes[team_no]
+            new_users.append(AppUser(
+                team_no=team_no,
+                username=f'Team {team_no}',
+                email=None,
+                phone=None,
+                password_salt_b64=salt_b64,
+                password_hash_b64=password_hash_b64,
+                password_iterations=iterations,
+                is_active=True,
+            ))
+        elif not append_only:
+            user.username = f'Team {team_no}'
+            user.password_salt_b64, user.password_hash_b64, user.password_iterations = hashes[team_no]
+            user.is_active = True
+            changed_users.append(user)
+
+    if new_users:
+        AppUser.objects.bulk_create(new_users)
+        # MySQL doesn't return primary keys from bulk inserts; re-read them
+        for user in AppUser.objects.filter(team_no__in=[u.team_no for u in new_users]):
+            users[user.team_no] = user
+    if changed_users:
+        AppUser.objects.bulk_update(
+            changed_users,
+            ['username', 'password_salt_b64', 'password_hash_b64', 'password_iterations', 'is_active'],
+        )
 
-        self.stdout.write(self.style.SUCCESS('Import completed.'))
+    chunk_user_ids = [users[team_no].id for team_no in chunk]
+    if not append_only:
+        # Members dropped from the CSV; ones moved to another team are updated below
+        stale = AppUserMember.objects.filter(user_id__in=chunk_user_ids).exclude(member_id__in=incoming_member_ids)
+        stale.delete()
+
+    new_members = []
+    changed_members = []
+    for team_no in chunk:
+        user = users[team_no]
+        for m in teams[team_no]:
+            member = members_by_id.get(m['member_id'])
+            if member is None:
+                member = AppUserMember(member_id=m['member_id'], user=user, phone=m['phone'], name=m['name'], email=m['email'])
+                new_members.append(member)
+                members_by_id[m['member_id']] = member
+            elif not append_only:
+                member.user = user
+                member.phone, member.name, member.email = m['phone'], m['name'], m['email']
+                changed_members.append(member)
+
+    AppUserMember.objects.bulk_create(new_members)
+    AppUserMember.objects.bulk_update(changed_members, ['user', 'phone', 'name', 'email'])
+
+
+def _load_checkpoint(path: str) -> tuple[int, str | None]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0, None
+    return int(checkpoint['last_row']), checkpoint['rows_sha256']
+
+
+def _verify_prefix(path: str, digest: str, expected: str | None):
+    if expected is not None and digest != expected:
+        raise CommandError(f'Rows already imported per {path} have changed since; delete the checkpoint to start over')
+
+
+def _save_checkpoint(path: str, csv_path: str, last_row: int, digest: str):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'csv': os.path.abspath(csv_path), 'last_row': last_row, 'rows_sha256': digest}, f)
+    os.replace(tmp_path, path)
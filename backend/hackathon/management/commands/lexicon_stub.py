@@ -0,0 +1,195 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_RECORDING = Path(__file__).resolve().parents[2] / 'data' / 'lexicon_recording.json'
+RELATIONS = ('rel_syn', 'rel_ant')
+
+
+class LexiconStub:
+    """
+    Replays recorded provider responses with injected latency and failures.
+
+    Unrecorded words are answered from the recorded vocabulary: a deterministic
+    ``playable_rate`` share of them get a full synonym/antonym list and the rest
+    an empty one, mimicking how many real candidates are unusable.
+    """
+
+    def __init__(self, recording: dict, *, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0,
+                 timeout_rate=0.0, timeout_ms=5000.0, playable_rate=0.5, seed=None,
+                 upstream=None, record_path=None):
+        self.recording = {rel: dict(recording.get(rel, {})) for rel in RELATIONS}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_ms = timeout_ms
+        self.playable_rate = playable_rate
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.record_path = record_path
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._vocabulary = {
+            rel: sorted({e['word'] for entries in self.recording[rel].values() for e in entries})
+            for rel in RELATIONS
+        }
+        self.stats = {'requests': 0, 'replayed': 0, 'synthesized': 0, 'recorded': 0, 'failed': 0, 'timed_out': 0}
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _bump(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _delay(self):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._roll() * self.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _synthesize(self, relation: str, word: str) -> list:
+        digest = hashlib.sha256(word.lower().encode('utf-8')).digest()
+        if digest[0] / 255.0 >= self.playable_rate or not self._vocabulary[relation]:
+            return []
+        rng = random.Random(digest)
+        vocab = self._vocabulary[relation]
+        picked = rng.sample(vocab, min(10, len(vocab)))
+        return [{'word': w, 'score': 3000 - i * 150} for i, w in enumerate(picked)]
+
+    def _fetch_upstream(self, relation: str, word: str) -> list:
+        query = urllib.parse.urlencode({relation: word})
+        with urllib.request.urlopen(f'{self.upstream}/words?{query}', timeout=10) as resp:
+            entries = json.loads(resp.read().decode('utf-8'))
+        with self._lock:
+            self.recording[relation][word] = entries
+            self.stats['recorded'] += 1
+        return entries
+
+    def lookup(self, relation: str, word: str):
+        """Return ``(status, payload)`` for one request, applying the fault model."""
+        self._bump('requests')
+        self._delay()
+
+        roll = self._roll()
+        if roll < self.timeout_rate:
+            self._bump('timed_out')
+            time.sleep(self.timeout_ms / 1000.0)
+            return 504, {'error': 'injected timeout'}
+        if roll < self.timeout_rate + self.failure_rate:
+            self._bump('failed')
+            return 503, {'error': 'injected failure'}
+
+        key = word.lower()
+        entries = self.recording[relation].get(key)
+        if entries is not None:
+            self._bump('replayed')
+            return 200, entries
+        if self.upstream:
+            return 200, self._fetch_upstream(relation, key)
+        self._bump('synthesized')
+        return 200, self._synthesize(relation, key)
+
+    def save(self):
+        if not self.record_path:
+            return
+        with self._lock:
+            data = {rel: dict(sorted(self.recording[rel].items())) for rel in RELATIONS}
+        with open(self.record_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+
+
+def _make_handler(stub: LexiconStub, quiet: bool):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urllib.parse.urlparse(self.path)
+            params = urllib.parse.parse_qs(parsed.query)
+            if parsed.path == '/_stats':
+                return self._send(200, stub.stats)
+            if parsed.path != '/words':
+                return self._send(404, {'error': 'not found'})
+
+            relation = next((rel for rel in RELATIONS if rel in params), None)
+            if relation is None:
+                return self._send(400, {'error': 'expected rel_syn or rel_ant'})
+            status, payload = stub.lookup(relation, params[relation][0])
+            self._send(status, payload)
+
+        def _send(self, status: int, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = 'Run a local Datamuse-compatible stub that replays recorded responses with injected latency/failures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--recording', default=str(DEFAULT_RECORDING), help='Recorded responses JSON file')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Fixed latency added to every response')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform random latency added on top')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests answered with 503')
+        parser.add_argument('--timeout-rate', type=float, default=0.0, help='Share of requests that hang for --timeout-ms')
+        parser.add_argument('--timeout-ms', type=float, default=5000.0)
+        parser.add_argument('--playable-rate', type=float, default=0.5, help='Share of unrecorded words that get a usable answer')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for latency/failure injection')
+        parser.add_argument('--record', metavar='UPSTREAM', help='Proxy unrecorded words to UPSTREAM and add them to the recording')
+        parser.add_argument('--quiet', action='store_true', help='Do not log each request')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['recording'], encoding='utf-8') as f:
+                recording = json.load(f)
+        except FileNotFoundError:
+            if not options['record']:
+                raise CommandError(f"Recording not found: {options['recording']}")
+            recording = {}
+
+        stub = LexiconStub(
+            recording,
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            failure_rate=options['failure_rate'],
+            timeout_rate=options['timeout_rate'],
+            timeout_ms=options['timeout_ms'],
+            playable_rate=options['playable_rate'],
+            seed=options['seed'],
+            upstream=options['record'],
+            record_path=options['recording'] if options['record'] else None,
+        )
+
+        server = ThreadingHTTPServer((options['host'], options['port']), _make_handler(stub, options['quiet']))
+        server.daemon_threads = True
+        self.stdout.write(
+            f"Lexicon stub on http://{options['host']}:{options['port']} "
+            f"(set LEXICON_PROVIDER_URL to this); stats at /_stats"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            stub.save()
+            self.stdout.write(f'Stub stats: {stub.stats}')
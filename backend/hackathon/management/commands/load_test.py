@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from hackathon.benchmarking import (
+    LatencyRecorder,
+    format_report,
+    load_report,
+    save_report,
+    stubbed_provider,
+)
+
+ROUNDS_PER_PLAYER = 5
+
+
+class _HttpTransport:
+    """Talks to a running server (runserver, gunicorn, uvicorn...)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method: str, path: str, body: dict = None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header('Accept', 'application/json')
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                return resp.status, json.loads(resp.read().decode('utf-8') or '{}')
+        except urllib.error.HTTPError as exc:
+            try:
+                payload = json.loads(exc.read().decode('utf-8') or '{}')
+            except ValueError:
+                payload = {}
+            return exc.code, payload
+
+
+class _InProcessTransport:
+    """Drives the Django app in-process through the test client."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: dict = None):
+        from django.test import Client
+
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client(raise_request_exception=False)
+        if method == 'GET':
+            resp = client.get(path)
+        else:
+            resp = client.post(path, json.dumps(body or {}), content_type='application/json')
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {}
+        return resp.status_code, payload
+
+
+class Command(BaseCommand):
+    help = 'Simulate N lobbies x M players polling status and submitting 5 rounds each'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lobbies', type=int, default=5)
+        parser.add_argument('--players', type=int, default=6, help='Players per lobby (including host)')
+        parser.add_argument('--polls-per-round', type=int, default=3, help='Status polls between start and submit')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent player sessions')
+        parser.add_argument('--level', default='easy')
+        parser.add_argument(
+            '--base-url',
+            help='Target a running server (e.g. http://127.0.0.1:8000). Default runs in-process against the configured DB.',
+        )
+        parser.add_argument(
+            '--live-provider',
+            action='store_true',
+            help='In-process mode only: call the configured LEXICON_PROVIDER_URL (e.g. lexicon_stub) instead of the canned stub',
+        )
+        parser.add_argument('--json', dest='json_path', help='Write the report to this JSON file')
+        parser.add_argument('--compare', dest='compare_path', help='Compare against a previously saved JSON report')
+
+    def handle(self, *args, **options):
+        if options['players'] < 2:
+            raise CommandError('--players must be at least 2 (a lobby needs two teams).')
+
+        self.options = options
+        self.recorder = LatencyRecorder()
+        self.transport = _HttpTransport(options['base_url']) if options['base_url'] else _InProcessTransport()
+
+        if options['base_url'] or options['live_provider']:
+            self._run()
+        else:
+            with stubbed_provider():
+                self._run()
+
+        report = self.recorder.summary()
+        baseline = load_report(options['compare_path']) if options['compare_path'] else None
+        wall = self.recorder.finished_at - self.recorder.started_at
+        total = sum(row['count'] for row in report.values())
+        self.stdout.write(format_report(report, baseline))
+        self.stdout.write(f'\n{total} requests in {wall:.2f}s ({total / wall:.1f} req/s overall)')
+
+        if options['json_path']:
+            save_report(options['json_path'], report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
+
+    def _call(self, name: str, method: str, path: str, body: dict = None):
+        start = time.perf_counter()
+        status, payload = self.transport.request(method, path, body)
+        self.recorder.record(name, time.perf_counter() - start, ok=200 <= status < 300)
+        return status, payload
+
+    def _run(self):
+        lobbies = []
+        with ThreadPoolExecutor(max_workers=self.options['concurrency']) as pool:
+            for lobby in pool.map(self._setup_lobby, range(self.options['lobbies'])):
+                if lobby:
+                    lobbies.append(lobby)
+
+            sessions = [(code, player) for code, players in lobbies for player in players]
+            list(pool.map(lambda args: self._play(*args), sessions))
+
+        self.recorder.finish()
+        connections.close_all()
+
+    def _player(self, lobby_idx: int, player_idx: int) -> dict:
+        return {
+            'email': f'bench{lobby_idx}-{player_idx}@example.com',
+            'name': f'Bench {lobby_idx}-{player_idx}',
+        }
+
+    def _setup_lobby(self, lobby_idx: int):
+        host = self._player(lobby_idx, 0)
+        status, data = self._call('lobby_create', 'POST', '/api/lobby/create', {**host, 'teamName': f'Bench {lobby_idx}'})
+        if status != 200:
+            self.stderr.write(f'Lobby {lobby_idx}: create failed ({status})')
+            return None
+        code = data['code']
+
+        players = [host]
+        for player_idx in range(1, self.options['players']):
+            player = self._player(lobby_idx, player_idx)
+            status, _ = self._call('lobby_join', 'POST', '/api/lobby/join', {**player, 'code': code, 'displayName': player['name']})
+            if status == 200:
+                players.append(player)
+
+        for idx, player in enumerate(players):
+            self._call('lobby_update', 'POST', '/api/lobby/update', {**player, 'code': code, 'action': 'join_team', 'team': 'AB'[idx % 2]})
+
+        self._call('lobby_update', 'POST', '/api/lobby/update', {**host, 'code': code, 'action': 'start_game'})
+        return code, players
+
+    def _play(self, code: str, player: dict):
+        level = self.options['level']
+        for _ in range(ROUNDS_PER_PLAYER):
+            status, game = self._call('game_start', 'POST', '/api/game/start', {**player, 'level': level})
+            if status != 200:
+                continue
+
+            for _ in range(self.options['polls_per_round']):
+                self._call('lobby_status', 'GET', f'/api/lobby/status?code={code}')
+
+            words = game.get('words', [])
+            self._call('game_submit', 'POST', '/api/game/submit', {
+                **player,
+                'roundId': game.get('round_id'),
+                'roundToken': game.get('round_token'),
+                'synonyms': [w['word'] for w in words if w['id'].startswith('syn_')],
+                'antonyms': [w['word'] for w in words if w['id'].startswith('ant_')],
+                'timeTaken': 15,
+                'level': level,
+                'gameCode': code,
+            })
+
+        self._call('get_results', 'GET', f'/api/get/results/{code}')
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from hackathon.lobby_actions import all_players_finished
+from hackathon.models import Lobby, LobbyArchive
+
+
+class Command(BaseCommand):
+    help = 'Finish/expire stale lobbies and move old ones into LobbyArchive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--waiting-ttl', type=float, default=2.0, help='Hours before an idle WAITING lobby expires')
+        parser.add_argument('--started-ttl', type=float, default=6.0, help='Hours before an idle STARTED lobby expires')
+        parser.add_argument('--archive-after', type=float, default=7.0, help='Days after which FINISHED/EXPIRED lobbies are archived')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        dry_run = options['dry_run']
+
+        finished = expired = 0
+        started = Lobby.objects.filter(status='STARTED').only('id', 'players_data', 'results_data', 'updated_at')
+        started_cutoff = now - timedelta(hours=options['started_ttl'])
+        for lobby in started.iterator(chunk_size=options['chunk_size']):
+            if all_players_finished(lobby):
+                status = 'FINISHED'
+                finished += 1
+            elif lobby.updated_at < started_cutoff:
+                status = 'EXPIRED'
+                expired += 1
+            else:
+                continue
+            if not dry_run:
+                # Conditional update so a lobby that moved on meanwhile is left alone
+                Lobby.objects.filter(id=lobby.id, status='STARTED').update(
+                    status=status, version=F('version') + 1, updated_at=now
+                )
+
+        waiting = Lobby.objects.filter(status='WAITING', updated_at__lt=now - timedelta(hours=options['waiting_ttl']))
+        idle_waiting = waiting.count()
+        if not dry_run:
+            waiting.update(status='EXPIRED', version=F('version') + 1, updated_at=now)
+        expired += idle_waiting
+
+        self.stdout.write(f'Marked {finished} lobbies FINISHED and {expired} EXPIRED')
+
+        archived = self._archive(now - timedelta(days=options['archive_after']), options['chunk_size'], dry_run)
+        verb = 'Would archive' if dry_run else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {archived} lobbies; {Lobby.objects.count()} remain'))
+
+    def _archive(self, cutoff, chunk_size, dry_run):
+        old = Lobby.objects.filter(status__in=['FINISHED', 'EXPIRED'], updated_at__lt=cutoff)
+        if dry_run:
+            return old.count()
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                chunk = list(old.order_by('id')[:chunk_size].select_for_update())
+                if not chunk:
+                    break
+                LobbyArchive.objects.bulk_create([
+                    LobbyArchive(
+                        code=lobby.code,
+                        host_email=lobby.host_email,
+                        host_name=lobby.host_name,
+                        status=lobby.status,
+                        settings=lobby.settings,
+                        players_data=lobby.players_data,
+                        results_data=lobby.results_data,
+                        created_at=lobby.created_at,
+                    )
+                    for lobby in chunk
+                ])
+                Lobby.objects.filter(id__in=[lobby.id for lobby in chunk]).delete()
+            total += len(chunk)
+            self.stdout.write(f'  archived {total}...')
+        return total
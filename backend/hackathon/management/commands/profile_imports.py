@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BOOT_SNIPPET = 'import {module}'
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse ``python -X importtime`` output into ``[(module, self_us, cumulative_us)]``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Profile module import time of a fresh worker (python -X importtime)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='backend.wsgi', help='Module a worker imports at boot')
+        parser.add_argument('--top', type=int, default=20, help='Show the N slowest modules by cumulative time')
+        parser.add_argument('--json', dest='json_path', help='Write all parsed rows to this JSON file')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings')}
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET.format(module=options['module'])],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        rows = parse_importtime(proc.stderr)
+        if proc.returncode != 0 or not rows:
+            raise CommandError(f"Importing {options['module']} failed:\n{proc.stderr[-2000:]}")
+
+        total_us = sum(self_us for _, self_us, _ in rows)
+        self.stdout.write(f"{options['module']}: {len(rows)} modules, {total_us / 1000:.1f} ms total import time")
+        self.stdout.write(f"{'module':<50} {'self ms':>9} {'cumul ms':>9}")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:options['top']]:
+            self.stdout.write(f'{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}')
+
+        heavy = [name for name in ('wordfreq', 'reportlab', 'requests') if any(r[0] == name for r in rows)]
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"Loaded at boot (expected lazy): {', '.join(heavy)}"))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump([{'module': n, 'self_us': s, 'cumulative_us': c} for n, s, c in rows], f, indent=1)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['json_path']}"))
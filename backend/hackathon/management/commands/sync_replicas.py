@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary into every SQLite replica (local stand-in for replication)'
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('sync_replicas only works with DB_ENGINE=sqlite; real replicas use DB replication')
+
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas:
+            self.stdout.write('No replicas configured (set SQLITE_REPLICA_PATHS)')
+            return
+
+        source = sqlite3.connect(str(primary['NAME']))
+        try:
+            for alias in replicas:
+                target = sqlite3.connect(str(settings.DATABASES[alias]['NAME']))
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"Synced {alias} ({settings.DATABASES[alias]['NAME']})")
+        finally:
+            source.close()
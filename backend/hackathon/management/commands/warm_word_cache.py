@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from hackathon.word_cache import word_cache
+from hackathon.word_store import word_store
 
 
 class Command(BaseCommand):
@@ -8,6 +9,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Starting word cache warm-up...')
         try:
+            purged = word_store.purge_expired()
+            self.stdout.write(f'Purged {purged} expired word store entries')
             word_cache.warm_up_cache()
             self.stdout.write(self.style.SUCCESS('Word cache warm-up completed successfully!'))
         except Exception as e:
@@ -0,0 +1,223 @@
+"""
+Lightweight in-process metrics registry rendered in the Prometheus text format.
+
+Every worker process keeps its own counters, so when running several gunicorn
+workers scrape each one or aggregate at the collector.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, '')) for n in self.label_names)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}' for k, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if idx < len(self.buckets):
+                state[idx] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            le = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{le} {state[-1]}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(state[-2])}')
+            lines.append(f'{self.name}_count{labels} {state[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'sortonym_http_request_duration_seconds',
+    'Request latency by route.',
+    labels=('route', 'method', 'status'),
+)
+DB_QUERIES = registry.histogram(
+    'sortonym_db_queries_per_request',
+    'Number of SQL queries executed per request.',
+    labels=('route',),
+    buckets=COUNT_BUCKETS,
+)
+DB_QUERY_SECONDS = registry.histogram(
+    'sortonym_db_query_duration_seconds',
+    'Total SQL time spent per request.',
+    labels=('route',),
+)
+OUTBOUND_LATENCY = registry.histogram(
+    'sortonym_outbound_request_duration_seconds',
+    'Latency of outbound HTTP calls.',
+    labels=('service', 'outcome'),
+)
+DB_CONNECTIONS_OPENED = registry.counter(
+    'sortonym_db_connections_opened_total',
+    'New database connections (connect + init command).',
+    labels=('alias',),
+)
+DB_CONNECTION_REUSE = registry.counter(
+    'sortonym_db_connection_requests_total',
+    'Requests that found an open connection (reused) or had to open one.',
+    labels=('alias', 'result'),
+)
+WORD_CACHE_REQUESTS = registry.counter(
+    'sortonym_word_cache_requests_total',
+    'WordCache lookups by difficulty and result.',
+    labels=('difficulty', 'result'),
+)
+
+
+@contextmanager
+def track_outbound(service: str):
+    """Time an outbound call and record it with an ok/error outcome."""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        OUTBOUND_LATENCY.observe(time.perf_counter() - start, service=service, outcome=outcome)
+
+
+def record_connection_created(sender, connection, **kwargs):
+    """``connection_created`` signal receiver (connected in HackathonConfig.ready)."""
+    DB_CONNECTIONS_OPENED.inc(alias=connection.alias)
+
+
+def instrument_outbound(service: str, func):
+    """Wrap a callable (e.g. ``requests.get``) so every call is timed."""
+    def wrapper(*args, **kwargs):
+        with track_outbound(service):
+            return func(*args, **kwargs)
+    return wrapper
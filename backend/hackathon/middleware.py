@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
 from django.http import HttpRequest, HttpResponse
 
+from . import metrics
+from .db_router import routing_state
+from .logging_utils import request_id_var
+
 
 class CorsMiddleware:
     def __init__(self, get_response):
@@ -18,8 +28,122 @@ class CorsMiddleware:
             response['Access-Control-Allow-Origin'] = origin
             response['Vary'] = 'Origin'
             response['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response['Access-Control-Allow-Headers'] = 'Authorization, Content-Type, X-CSRFToken'
+            response['Access-Control-Allow-Headers'] = 'Authorization, Content-Type, X-CSRFToken, X-Sortonym-DB-Pin, X-Sortonym-Player'
             response['Access-Control-Allow-Credentials'] = 'true'
             response['Access-Control-Max-Age'] = '86400'
+            # Read by lobby polling when a poll is shed with 429, and by the
+            # client's replica pinning
+            response['Access-Control-Expose-Headers'] = 'Retry-After, X-Sortonym-DB-Pin'
+
+        return response
+
+
+class MetricsMiddleware:
+    """Records per-route latency plus SQL query count/time for every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        db_stats = {'count': 0, 'seconds': 0.0}
+
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_stats['count'] += 1
+                db_stats['seconds'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        status = 500
+        # Connections already open when the request starts are reused ones
+        open_before = {conn.alias for conn in connections.all() if conn.connection is not None}
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(record_query))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            for conn in connections.all(initialized_only=True):
+                if conn.alias in open_before:
+                    metrics.DB_CONNECTION_REUSE.inc(alias=conn.alias, result='reused')
+                elif conn.connection is not None:
+                    metrics.DB_CONNECTION_REUSE.inc(alias=conn.alias, result='opened')
+            route = _route_label(request)
+            metrics.REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                route=route,
+                method=request.method,
+                status=status,
+            )
+            metrics.DB_QUERIES.observe(db_stats['count'], route=route)
+            metrics.DB_QUERY_SECONDS.observe(db_stats['seconds'], route=route)
+
+
+def _route_label(request: HttpRequest) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or '/'
+
+
+class RequestIdMiddleware:
+    """Tags every log record emitted during a request with a request id."""
 
+    HEADER = 'X-Request-ID'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        request_id = (request.headers.get(self.HEADER) or '')[:64] or uuid.uuid4().hex
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[self.HEADER] = request_id
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for replica routing (see hackathon/db_router.py).
+
+    A response to a request that wrote carries the ``X-Sortonym-DB-Pin``
+    header (seconds to stay pinned) and a short-lived cookie. Requests that
+    echo the header, or send the cookie, read from the primary, so a client
+    never reads data older than its own last write. The SPA calls the API
+    cross-origin without credentials, so cookies don't come back and it
+    echoes the header instead (frontend/src/api/dbPin.js). The cookie covers
+    same-origin clients.
+    """
+
+    COOKIE = 'sortonym_db_pin'
+    HEADER = 'X-Sortonym-DB-Pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        pinned = self.COOKIE in request.COOKIES or self.HEADER in request.headers
+        state = {'pinned': pinned, 'wrote': False}
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        if state['wrote'] and getattr(settings, 'DATABASE_REPLICAS', None):
+            sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+            response[self.HEADER] = str(sticky_seconds)
+            response.set_cookie(
+                self.COOKIE, '1',
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
         return response
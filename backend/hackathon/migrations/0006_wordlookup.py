@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0005_merge_20260211_1143'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordLookup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, unique=True)),
+                ('synonyms', models.TextField(blank=True, default='', help_text='Comma-separated synonyms')),
+                ('antonyms', models.TextField(blank=True, default='', help_text='Comma-separated antonyms')),
+                ('playable', models.BooleanField(default=False)),
+                ('fetched_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wordlookup',
+            index=models.Index(fields=['expires_at'], name='wordlookup_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0006_wordlookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LobbyArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(db_index=True, max_length=10)),
+                ('host_email', models.EmailField(max_length=254)),
+                ('host_name', models.CharField(max_length=255)),
+                ('status', models.CharField(max_length=20)),
+                ('settings', models.JSONField(default=dict)),
+                ('players_data', models.JSONField(default=list)),
+                ('results_data', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lobby',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
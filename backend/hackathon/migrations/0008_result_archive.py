@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0007_lobby_lifecycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameResultArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_email', models.EmailField(db_index=True, max_length=254)),
+                ('player_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('round_id', models.IntegerField(null=True)),
+                ('score', models.FloatField(default=0.0)),
+                ('total_correct', models.IntegerField(default=0)),
+                ('time_taken', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlayerScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_email', models.EmailField(max_length=254, unique=True)),
+                ('player_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('games_played', models.IntegerField(default=0)),
+                ('total_score', models.FloatField(default=0.0)),
+                ('best_score', models.FloatField(default=0.0)),
+                ('best_total_correct', models.IntegerField(default=0)),
+                ('best_time_taken', models.FloatField(default=0.0)),
+                ('best_at', models.DateTimeField(null=True)),
+                ('last_played_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='playerscoresummary',
+            index=models.Index(fields=['-best_score'], name='summary_best_score_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0008_result_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerLastResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_email', models.EmailField(max_length=254, unique=True)),
+                ('score', models.FloatField(default=0.0)),
+                ('total_correct', models.IntegerField(default=0)),
+                ('time_taken', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+    ]
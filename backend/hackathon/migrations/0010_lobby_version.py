@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0009_playerlastresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lobby',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0010_lobby_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LobbyAction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lobby_code', models.CharField(max_length=10)),
+                ('seq', models.PositiveIntegerField()),
+                ('action', models.CharField(max_length=30)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='lobbyaction',
+            constraint=models.UniqueConstraint(fields=('lobby_code', 'seq'), name='lobby_action_seq_uniq'),
+        ),
+    ]
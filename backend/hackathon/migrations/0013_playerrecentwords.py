@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0012_usedroundtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerRecentWords',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.CharField(max_length=255, unique=True)),
+                ('words', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
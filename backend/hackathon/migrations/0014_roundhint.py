@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0013_playerrecentwords'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundHint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nonce', models.CharField(max_length=32)),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('word_index', models.PositiveSmallIntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='roundhint',
+            constraint=models.UniqueConstraint(fields=('nonce', 'slot'), name='round_hint_slot_uniq'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-19 05:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0014_roundhint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_no', models.PositiveIntegerField(unique=True)),
+                ('username', models.CharField(max_length=150)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('password_salt_b64', models.CharField(max_length=64)),
+                ('password_hash_b64', models.CharField(max_length=128)),
+                ('password_iterations', models.PositiveIntegerField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AppUserMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(max_length=64, unique=True)),
+                ('phone', models.CharField(max_length=20)),
+                ('name', models.CharField(max_length=255)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='appusermember',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='hackathon.appuser'),
+        ),
+    ]
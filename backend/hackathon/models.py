@@ -35,11 +35,14 @@ class Lobby(models.Model):
     code = models.CharField(max_length=10, unique=True, db_index=True)
     host_email = models.EmailField()
     host_name = models.CharField(max_length=255)
-    status = models.CharField(max_length=20, default='WAITING', db_index=True) # WAITING, STARTED, FINISHED
+    status = models.CharField(max_length=20, default='WAITING', db_index=True) # WAITING, STARTED, FINISHED, EXPIRED
     settings = models.JSONField(default=dict)
     players_data = models.JSONField(default=list) # List of {'email': ..., 'name': ..., 'team': ...}
     results_data = models.JSONField(default=list) # List of game results
+    # Bumped by every write; compare-and-swap updates in hackathon/lobby_updates.py
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
@@ -49,3 +52,163 @@ class Lobby(models.Model):
 
     def __str__(self):
         return f"Lobby {self.code} - {self.status}"
+
+class AppUser(models.Model):
+    """A team account; ``manage.py import_teams`` creates it with a default password."""
+    team_no = models.PositiveIntegerField(unique=True)
+    username = models.CharField(max_length=150)
+    email = models.EmailField(null=True, blank=True)
+    phone = models.CharField(max_length=20, null=True, blank=True)
+    password_salt_b64 = models.CharField(max_length=64)
+    password_hash_b64 = models.CharField(max_length=128)
+    password_iterations = models.PositiveIntegerField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.username
+
+class AppUserMember(models.Model):
+    """One registered member of a team account (at most 5 per team)."""
+    member_id = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(AppUser, on_delete=models.CASCADE, related_name='members')
+    phone = models.CharField(max_length=20)
+    name = models.CharField(max_length=255)
+    email = models.EmailField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.member_id})"
+
+class WordLookup(models.Model):
+    """Every provider answer we've seen, playable or not, so candidates aren't re-fetched."""
+    word = models.CharField(max_length=100, unique=True)
+    synonyms = models.TextField(blank=True, default='', help_text="Comma-separated synonyms")
+    antonyms = models.TextField(blank=True, default='', help_text="Comma-separated antonyms")
+    playable = models.BooleanField(default=False)
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='wordlookup_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.word} ({'playable' if self.playable else 'not playable'})"
+
+class LobbyArchive(models.Model):
+    """Finished/expired lobbies moved out of the hot Lobby table by `manage_lobbies`."""
+    code = models.CharField(max_length=10, db_index=True)
+    host_email = models.EmailField()
+    host_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20)
+    settings = models.JSONField(default=dict)
+    players_data = models.JSONField(default=list)
+    results_data = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived lobby {self.code} - {self.status}"
+
+class CodeSequence(models.Model):
+    """Monotonic counters handed out in blocks (see hackathon/lobby_codes.py)."""
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+class GameResultArchive(models.Model):
+    """GameResult rows older than the retention window (see `archive_results`)."""
+    player_email = models.EmailField(db_index=True)
+    player_name = models.CharField(max_length=255, null=True, blank=True)
+    round_id = models.IntegerField(null=True)
+    score = models.FloatField(default=0.0)
+    total_correct = models.IntegerField(default=0)
+    time_taken = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.player_email} - {self.score} (archived)"
+
+class PlayerScoreSummary(models.Model):
+    """Per-player aggregates of archived results, so the leaderboard never scans history."""
+    player_email = models.EmailField(unique=True)
+    player_name = models.CharField(max_length=255, null=True, blank=True)
+    games_played = models.IntegerField(default=0)
+    total_score = models.FloatField(default=0.0)
+    best_score = models.FloatField(default=0.0)
+    best_total_correct = models.IntegerField(default=0)
+    best_time_taken = models.FloatField(default=0.0)
+    best_at = models.DateTimeField(null=True)
+    last_played_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-best_score'], name='summary_best_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_email} - best {self.best_score}"
+
+class PlayerLastResult(models.Model):
+    """Each player's most recent result, upserted on submit for `/api/game/score`."""
+    player_email = models.EmailField(unique=True)
+    score = models.FloatField(default=0.0)
+    total_correct = models.IntegerField(default=0)
+    time_taken = models.FloatField(default=0.0)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.player_email} - {self.score} (last)"
+
+class PlayerRecentWords(models.Model):
+    """Anchor words each player saw recently, oldest first, so /api/game/start can avoid them."""
+    player_id = models.CharField(max_length=255, unique=True)
+    words = models.JSONField(default=list)
+    # Bumped by every write; compare-and-swap updates in hackathon/recent_words.py
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.player_id} ({len(self.words)} recent words)"
+
+class LobbyAction(models.Model):
+    """Actions applied by the in-memory lobby engine since its last `Lobby` snapshot, for replay."""
+    lobby_code = models.CharField(max_length=10)
+    seq = models.PositiveIntegerField()
+    action = models.CharField(max_length=30)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['lobby_code', 'seq'], name='lobby_action_seq_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.lobby_code} #{self.seq} {self.action}"
+
+class UsedRoundToken(models.Model):
+    """Nonces of submitted round tokens, so a token is accepted once across all workers."""
+    nonce = models.CharField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.nonce
+
+class RoundHint(models.Model):
+    """Hints taken in a round (one row per hint slot), so the per-level limit holds across workers."""
+    nonce = models.CharField(max_length=32)
+    slot = models.PositiveSmallIntegerField()
+    word_index = models.PositiveSmallIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['nonce', 'slot'], name='round_hint_slot_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.nonce} hint {self.slot}"
@@ -0,0 +1,31 @@
+"""
+Process pools for CPU-bound work in management commands.
+
+Workers are started with the ``spawn`` method on every platform: forking a
+process that already holds database connections and threads is unsafe, and
+``spawn`` is the default on macOS and Windows anyway. A spawned worker starts
+from a fresh interpreter, so ``_setup_worker`` configures Django before any
+task is unpickled. Tasks may then live in modules that import models.
+
+This module must itself stay importable without Django set up, since the
+worker imports it to find the initializer.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _setup_worker(settings_module: str):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+
+    django.setup()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_setup_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings'),),
+    )
@@ -0,0 +1,301 @@
+"""
+Client for the external lexicon provider (Datamuse-compatible API).
+
+The base URL comes from ``settings.LEXICON_PROVIDER_URL`` so the game can be
+pointed at the bundled stub (``manage.py lexicon_stub``) for offline and
+deterministic performance testing.
+
+Every call goes through a process-wide circuit breaker. After
+``LEXICON_BREAKER_THRESHOLD`` consecutive failures the breaker opens and calls
+fail immediately with ``ProviderUnavailable`` so callers can fall back to local
+words without waiting on timeouts. While open, a background thread probes the
+provider every ``LEXICON_BREAKER_RESET_SECONDS`` and closes the breaker once a
+probe succeeds. Request timeouts follow the observed p95 latency.
+
+Answers are cached per (relation, word) and concurrent lookups of the same
+pair are coalesced, so a burst of identical candidates costs one outbound call.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import executors, metrics
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_URL = 'https://api.datamuse.com'
+
+SYNONYMS = 'rel_syn'
+ANTONYMS = 'rel_ant'
+
+PROBE_WORD = 'happy'
+
+RESULT_CACHE_TIMEOUT = 3600
+RESULT_CACHE_PREFIX = 'lexicon:'
+
+
+def _http_get(url: str, params=None, timeout=None):
+    # requests is imported on the first outbound call, not at worker boot
+    import requests
+
+    with metrics.track_outbound('lexicon'):
+        return requests.get(url, params=params, timeout=timeout)
+
+
+BREAKER_STATE = metrics.registry.gauge(
+    'sortonym_lexicon_breaker_state',
+    'Lexicon provider circuit breaker state (0=closed, 1=half-open, 2=open).',
+)
+BREAKER_REJECTED = metrics.registry.counter(
+    'sortonym_lexicon_breaker_rejected_total',
+    'Provider calls short-circuited because the breaker was open.',
+)
+PROVIDER_TIMEOUT = metrics.registry.gauge(
+    'sortonym_lexicon_timeout_seconds',
+    'Current adaptive timeout for provider calls.',
+)
+RESULT_CACHE_REQUESTS = metrics.registry.counter(
+    'sortonym_lexicon_cache_requests_total',
+    'Provider answers served from / missing in the result cache.',
+    labels=('result',),
+)
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling the provider while the circuit is open."""
+
+
+def _setting(name: str, default):
+    return type(default)(getattr(settings, name, default))
+
+
+class AdaptiveTimeout:
+    """
+    Timeout derived from a rolling window of call latencies.
+
+    Calls that time out are recorded at the timeout they hit: their real
+    latency is at least that long. Leaving them out would bias the window
+    toward fast calls and shrink the timeout just as the provider slows down.
+    """
+
+    def __init__(self, minimum: float, maximum: float, percentile: float = 95.0,
+                 multiplier: float = 1.5, window: int = 200, min_samples: int = 20):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def observe_timeout(self, timeout: float):
+        self.observe(timeout)
+
+    def current(self) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.maximum
+        idx = min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))
+        return max(self.minimum, min(self.maximum, samples[idx] * self.multiplier))
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    HALF_OPEN = 'half_open'
+    OPEN = 'open'
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15.0, probe=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+        self._probe_future = None
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning('Lexicon circuit breaker %s -> %s', self.state, state)
+        self.state = state
+        BREAKER_STATE.set(self._STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        """Whether a regular (non-probe) call may go out right now."""
+        if self.state == self.CLOSED:
+            return True
+        self._maybe_probe()
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def _maybe_probe(self):
+        with self._lock:
+            if self.state != self.OPEN or self.probe is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return
+            if self._probe_future is not None and not self._probe_future.done():
+                return
+            try:
+                self._probe_future = executors.get_executor('background').submit(self._run_probe)
+            except executors.PoolSaturated:
+                return
+            self._set_state(self.HALF_OPEN)
+
+    def _run_probe(self):
+        try:
+            self.probe()
+        except Exception as e:
+            logger.info('Lexicon probe failed: %s', e)
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def provider_url() -> str:
+    return (getattr(settings, 'LEXICON_PROVIDER_URL', '') or DEFAULT_PROVIDER_URL).rstrip('/')
+
+
+def _get(relation: str, word: str, timeout: float) -> list:
+    response = _http_get(f'{provider_url()}/words', params={relation: word}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _probe():
+    _get(SYNONYMS, PROBE_WORD, adaptive_timeout.maximum)
+
+
+adaptive_timeout = AdaptiveTimeout(
+    minimum=_setting('LEXICON_TIMEOUT_MIN', 0.2),
+    maximum=_setting('LEXICON_TIMEOUT_MAX', 1.0),
+)
+breaker = CircuitBreaker(
+    failure_threshold=_setting('LEXICON_BREAKER_THRESHOLD', 5),
+    reset_timeout=_setting('LEXICON_BREAKER_RESET_SECONDS', 15.0),
+    probe=_probe,
+)
+
+
+def is_available() -> bool:
+    return breaker.allow()
+
+
+def request_timeout() -> float:
+    timeout = adaptive_timeout.current()
+    PROVIDER_TIMEOUT.set(timeout)
+    return timeout
+
+
+_inflight = SingleFlight('lexicon')
+
+
+def _cache_key(relation: str, word: str) -> str:
+    return f'{RESULT_CACHE_PREFIX}{relation}:{word.lower()}'
+
+
+def _fetch_and_cache(relation: str, word: str, timeout: float) -> list:
+    start = time.perf_counter()
+    try:
+        result = _get(relation, word, timeout)
+    except Exception:
+        if time.perf_counter() - start >= timeout:
+            # Timed out: a censored sample, at least this slow
+            adaptive_timeout.observe_timeout(timeout)
+        breaker.record_failure()
+        raise
+    adaptive_timeout.observe(time.perf_counter() - start)
+    breaker.record_success()
+    cache.set(_cache_key(relation, word), result, RESULT_CACHE_TIMEOUT)
+    return result
+
+
+def fetch_related(relation: str, word: str, timeout: float = None) -> list:
+    """
+    Return the raw ``[{'word': ..., 'score': ...}]`` list for one relation.
+
+    ``timeout`` caps the adaptive timeout; raises ``ProviderUnavailable`` while
+    the breaker is open and the answer isn't cached.
+    """
+    cached = cache.get(_cache_key(relation, word))
+    if cached is not None:
+        RESULT_CACHE_REQUESTS.inc(result='hit')
+        return cached
+    RESULT_CACHE_REQUESTS.inc(result='miss')
+
+    if not breaker.allow():
+        BREAKER_REJECTED.inc()
+        raise ProviderUnavailable('Lexicon provider circuit is open')
+
+    effective = request_timeout()
+    if timeout is not None:
+        effective = min(effective, timeout)
+
+    return _inflight.do(
+        (relation, word.lower()),
+        _fetch_and_cache, relation, word, effective,
+        wait_timeout=effective,
+    )
+
+
+def iter_word_pairs(words, timeout: float = None, overall_timeout: float = None):
+    """
+    Look up synonyms and antonyms for many words on the shared provider pool.
+
+    Yields ``(word, synonyms_raw, antonyms_raw)`` as soon as both lookups for a
+    word have succeeded; words with a failed lookup are skipped. Stops
+    submitting when the pool is saturated, and raises ``TimeoutError`` once
+    ``overall_timeout`` elapses. Lookups still running when the caller stops
+    iterating finish in the background and land in the result cache.
+    """
+    pool = executors.get_executor('provider')
+    pending = {}
+    for word in words:
+        try:
+            pending[pool.submit(fetch_related, SYNONYMS, word, timeout)] = (word, SYNONYMS)
+            pending[pool.submit(fetch_related, ANTONYMS, word, timeout)] = (word, ANTONYMS)
+        except executors.PoolSaturated:
+            logger.warning('Provider pool saturated; looking up %d of %d words', len(pending) // 2, len(words))
+            break
+
+    answers = {}
+    for future in as_completed(pending, timeout=overall_timeout):
+        word, relation = pending[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.debug('Lexicon lookup failed for %s: %s', word, e)
+            answers[word] = None
+            continue
+        entry = answers.get(word, {})
+        if entry is None:
+            continue
+        entry[relation] = result
+        answers[word] = entry
+        if len(entry) == 2:
+            yield word, entry[SYNONYMS], entry[ANTONYMS]
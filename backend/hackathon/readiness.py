@@ -0,0 +1,91 @@
+"""
+Readiness for load-balancer rollouts (``/ready``), separate from liveness (``/``).
+
+A worker is ready when:
+- the default database answers,
+- every difficulty's word pool is at or above ``WordCache.LOW_WATERMARK``,
+- the lexicon word lists are loaded (mapped file or wordfreq in memory).
+
+Until then the probe returns 503 and, once per process, starts the warm-up on
+the background pool, so the probes themselves bring a new worker up. The warm
+checks latch: once passed, an expiring pool or an open provider circuit does
+not pull the worker out of rotation. Only the database check keeps gating.
+"""
+import logging
+import threading
+from typing import Dict, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import executors, lexicon, metrics
+from .word_cache import word_cache
+
+logger = logging.getLogger(__name__)
+
+READY = metrics.registry.gauge(
+    'sortonym_ready',
+    'Whether this worker currently reports ready (1) or not (0).',
+)
+
+_lock = threading.Lock()
+_warm = False
+_warmup_started = False
+
+
+def _check_db() -> Tuple[bool, str]:
+    try:
+        conn = connections[DEFAULT_DB_ALIAS]
+        conn.ensure_connection()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True, 'ok'
+    except Exception as e:
+        return False, f'unreachable: {e.__class__.__name__}'
+
+
+def _warm_up():
+    global _warmup_started
+    try:
+        lexicon.warm()
+        word_cache.warm_up_cache()
+    except Exception as e:
+        logger.error('Readiness warm-up failed: %s', e)
+    finally:
+        # Let a later probe retry if the pools are still short
+        _warmup_started = False
+
+
+def _start_warm_up():
+    global _warmup_started
+    with _lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    try:
+        executors.get_executor('background').submit(_warm_up)
+    except executors.PoolSaturated:
+        _warmup_started = False
+
+
+def check() -> Tuple[bool, Dict]:
+    """Return ``(ready, details)``; details are safe to expose to the probe."""
+    global _warm
+    db_ok, db_state = _check_db()
+    details = {'database': db_state}
+
+    if _warm:
+        details['warm'] = 'ok'
+    else:
+        sizes = word_cache.pool_sizes()
+        pools_ok = all(size >= word_cache.LOW_WATERMARK for size in sizes.values())
+        lexicon_ok = lexicon.is_loaded()
+        details['word_pools'] = {'sizes': sizes, 'low_watermark': word_cache.LOW_WATERMARK}
+        details['lexicon'] = 'loaded' if lexicon_ok else 'not loaded'
+        if pools_ok and lexicon_ok:
+            _warm = True
+        else:
+            _start_warm_up()
+
+    ready = db_ok and _warm
+    READY.set(1 if ready else 0)
+    return ready, details
@@ -0,0 +1,132 @@
+"""
+Anchor words each player has seen recently, kept server-side.
+
+Per player, ``PlayerRecentWords`` holds the last ``RECENT_WORDS_SIZE``
+anchors, oldest first, so the history follows the player across workers and
+devices. ``/api/game/start`` reads it once (``get``), picks a word the player
+has not seen and appends it (``record``). The append is compare-and-swap on
+``version`` against the copy that was read, as lobby writes are
+(``lobby_updates.mutate``), so concurrent starts by one player never lose a
+word: on a conflict the row is re-read and the append retried.
+
+Players are identified by their uid (e.g. the JWT email) or, for guests, by
+the anonymous id the client sends in ``X-Sortonym-Player``.
+"""
+import logging
+import random
+import re
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics
+from .db_router import pin_to_primary
+from .models import PlayerRecentWords
+
+logger = logging.getLogger(__name__)
+
+PLAYER_HEADER = 'X-Sortonym-Player'
+_ANONYMOUS_ID_RE = re.compile(r'^[A-Za-z0-9-]{16,64}$')
+MAX_ATTEMPTS = 3
+# Share of writes that also delete histories idle for longer than RECENT_WORDS_SECONDS
+PURGE_PROBABILITY = 0.01
+
+RECENT_WORD_CHECKS = metrics.registry.counter(
+    'sortonym_recent_word_checks_total',
+    'Candidate anchor words checked against player history, by result.',
+    labels=('result',),
+)
+
+
+def player_key(request, player_info: dict) -> Optional[str]:
+    """Whose history a request reads and extends; None for an unidentifiable guest."""
+    uid = player_info.get('uid') or player_info['email']
+    if uid != 'guest@sortonym.com' and not uid.startswith('guest_'):
+        return uid
+    # Guests share an email and may share a name; the client's random id tells them apart
+    anonymous_id = request.headers.get(PLAYER_HEADER, '')
+    if _ANONYMOUS_ID_RE.match(anonymous_id):
+        return f'anon:{anonymous_id}'
+    return uid if uid != 'guest@sortonym.com' else None
+
+
+class RecentSet:
+    """One player's history as read, with the row version to append against."""
+
+    def __init__(self, words: List[str], version: Optional[int] = None):
+        self.words = words
+        self.version = version  # None: no row yet
+        self._seen = set(words)
+
+    def __contains__(self, word) -> bool:
+        seen = word in self._seen
+        RECENT_WORD_CHECKS.inc(result='seen' if seen else 'new')
+        return seen
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class RecentWords:
+    @property
+    def size(self) -> int:
+        return int(getattr(settings, 'RECENT_WORDS_SIZE', 50))
+
+    @property
+    def max_age(self) -> timedelta:
+        return timedelta(seconds=int(getattr(settings, 'RECENT_WORDS_SECONDS', 86400)))
+
+    def get(self, player_id: Optional[str]) -> RecentSet:
+        if not player_id:
+            return RecentSet([])
+        # The version must come from the primary, or a lagging replica makes every append conflict
+        pin_to_primary()
+        row = PlayerRecentWords.objects.filter(player_id=player_id.lower()).first()
+        if row is None:
+            return RecentSet([])
+        if row.updated_at < timezone.now() - self.max_age:
+            # Idle too long: start over, but append against the existing row
+            return RecentSet([], row.version)
+        return RecentSet(list(row.words[-self.size:]), row.version)
+
+    def record(self, player_id: Optional[str], word: str, recent: Optional[RecentSet] = None):
+        """Append ``word`` to the history; ``recent`` is the copy from ``get``, saving a read."""
+        if not player_id:
+            return
+        key = player_id.lower()
+        try:
+            for _ in range(MAX_ATTEMPTS):
+                if recent is None:
+                    recent = self.get(player_id)
+                if word in recent.words:
+                    return
+                words = [*recent.words, word][-self.size:]
+                now = timezone.now()
+                if recent.version is None:
+                    try:
+                        with transaction.atomic():
+                            PlayerRecentWords.objects.create(player_id=key, words=words, version=1, updated_at=now)
+                        break
+                    except IntegrityError:
+                        pass  # A concurrent start created the row first
+                elif PlayerRecentWords.objects.filter(player_id=key, version=recent.version).update(
+                    words=words, version=F('version') + 1, updated_at=now
+                ):
+                    break
+                recent = None
+            else:
+                logger.warning('Gave up recording recent word for %s after %d conflicts', player_id, MAX_ATTEMPTS)
+                return
+            if random.random() < PURGE_PROBABILITY:
+                PlayerRecentWords.objects.filter(updated_at__lt=now - self.max_age).delete()
+        except DatabaseError:
+            # The round is already picked; the player may just see this word again soon
+            logger.exception('Could not record recent word for %s', player_id)
+
+
+# Global instance
+recent_words = RecentWords()
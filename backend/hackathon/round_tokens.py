@@ -0,0 +1,172 @@
+"""
+Signed round tokens for ``/api/game/start`` -> ``/api/game/submit``.
+
+A token carries everything needed to score a round:
+- the round id and level,
+- the issue time in ms,
+- a random nonce,
+- the round's words in display order,
+- for every word, a short keyed hash of its correct category.
+
+The token is signed with ``django.core.signing``, as sessions are. The hashes
+are HMACs over (nonce, position, word, category) keyed by SECRET_KEY, so the
+client can read the words but not the answers. Submit verifies and scores
+from the token alone, with no word lookup.
+
+Tokens are single use. The nonce is inserted into ``UsedRoundToken`` (unique)
+on submit, so a replay is refused by whichever worker receives it. Expired
+nonces are purged now and then on the way.
+
+Word ids are opaque (``w<i>``), so hints come from the server too:
+``take_hint`` reveals one word's category and takes one of the round's hint
+slots in ``RoundHint``, unique per (nonce, slot), so the per-level limit holds
+across workers.
+"""
+import base64
+import hashlib
+import hmac
+import random
+import secrets
+import time
+from datetime import timedelta
+from typing import Iterable, List, Set, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RoundHint, UsedRoundToken
+
+SALT = 'hackathon.round_token'
+SYNONYM = 'syn'
+ANTONYM = 'ant'
+# Share of submits that also delete expired nonces
+PURGE_PROBABILITY = 0.01
+
+
+class InvalidRoundToken(Exception):
+    pass
+
+
+def max_age() -> int:
+    # Generous: rounds are prefetched in the background before they're shown
+    return int(getattr(settings, 'ROUND_TOKEN_MAX_AGE', 900))
+
+
+def _category_hash(nonce: str, index: int, word: str, category: str) -> str:
+    msg = f'{nonce}|{index}|{word.lower()}|{category}'.encode('utf-8')
+    digest = hmac.new(settings.SECRET_KEY.encode('utf-8'), msg, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:6]).decode('ascii')
+
+
+def issue(round_id, level: str, words: List[Tuple[str, str]]) -> str:
+    """``words`` is ``[(word, 'syn' | 'ant'), ...]`` in the order shown to the player."""
+    nonce = secrets.token_urlsafe(6)
+    payload = {
+        'r': round_id,
+        'l': level,
+        't': int(time.time() * 1000),
+        'n': nonce,
+        'w': [word for word, _ in words],
+        'c': [_category_hash(nonce, i, word, category) for i, (word, category) in enumerate(words)],
+    }
+    return signing.dumps(payload, key=settings.SECRET_KEY, salt=SALT, compress=True)
+
+
+class RoundClaims:
+    def __init__(self, payload: dict):
+        self.round_id = payload['r']
+        self.level = payload['l']
+        self.issued_at = payload['t'] / 1000.0
+        self.nonce = payload['n']
+        self.words = payload['w']
+        self.categories: List[str] = []
+        self.synonyms: Set[str] = set()
+        self.antonyms: Set[str] = set()
+        for i, (word, tag) in enumerate(zip(payload['w'], payload['c'])):
+            if hmac.compare_digest(tag, _category_hash(self.nonce, i, word, SYNONYM)):
+                self.categories.append(SYNONYM)
+                self.synonyms.add(word.lower())
+            elif hmac.compare_digest(tag, _category_hash(self.nonce, i, word, ANTONYM)):
+                self.categories.append(ANTONYM)
+                self.antonyms.add(word.lower())
+            else:
+                self.categories.append('')
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the round was issued, by the server clock."""
+        return max(0.0, time.time() - self.issued_at)
+
+    def index_of(self, word_id: str) -> int:
+        """Position of a ``w<i>`` id, or -1."""
+        word_id = str(word_id)
+        if word_id.startswith('w') and word_id[1:].isdigit() and int(word_id[1:]) < len(self.words):
+            return int(word_id[1:])
+        return -1
+
+    def resolve(self, submitted: Iterable[str]) -> List[str]:
+        """Map submitted entries (words, ``w<i>`` ids or legacy ``syn_``/``ant_`` ids) to words."""
+        resolved = []
+        for entry in submitted:
+            entry = str(entry)
+            index = self.index_of(entry)
+            if index >= 0:
+                resolved.append(self.words[index])
+            elif entry.startswith((f'{SYNONYM}_', f'{ANTONYM}_')):
+                resolved.append(entry.split('_', 1)[1])
+            else:
+                resolved.append(entry)
+        return resolved
+
+
+def verify(token: str, single_use: bool = True) -> RoundClaims:
+    try:
+        payload = signing.loads(token, key=settings.SECRET_KEY, salt=SALT, max_age=max_age())
+        claims = RoundClaims(payload)
+    except signing.SignatureExpired:
+        raise InvalidRoundToken('Round expired')
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidRoundToken('Invalid round token')
+
+    if single_use:
+        _mark_used(claims.nonce)
+    return claims
+
+
+def _mark_used(nonce: str):
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            UsedRoundToken.objects.create(nonce=nonce, expires_at=now + timedelta(seconds=max_age()))
+    except IntegrityError:
+        raise InvalidRoundToken('Round already submitted')
+    if random.random() < PURGE_PROBABILITY:
+        UsedRoundToken.objects.filter(expires_at__lte=now).delete()
+        RoundHint.objects.filter(expires_at__lte=now).delete()
+
+
+def take_hint(claims: RoundClaims, index: int, limit: int) -> Tuple[str, int]:
+    """
+    Return ``(category, hints_left)`` for word ``index``. Asking again for an
+    already hinted word is free. Raises ``InvalidRoundToken`` once the round is
+    submitted or its ``limit`` hints are used.
+    """
+    if UsedRoundToken.objects.filter(nonce=claims.nonce).exists():
+        raise InvalidRoundToken('Round already submitted')
+    taken = list(RoundHint.objects.filter(nonce=claims.nonce).values_list('word_index', flat=True))
+    if index not in taken:
+        expires_at = timezone.now() + timedelta(seconds=max_age())
+        for slot in range(len(taken), limit):
+            try:
+                with transaction.atomic():
+                    RoundHint.objects.create(nonce=claims.nonce, slot=slot, word_index=index, expires_at=expires_at)
+            except IntegrityError:
+                # A concurrent hint took this slot
+                continue
+            taken.append(index)
+            break
+        else:
+            raise InvalidRoundToken('No hints left')
+    return claims.categories[index], max(0, limit - len(taken))
@@ -0,0 +1,71 @@
+"""
+Process-wide request coalescing ("single-flight").
+
+Concurrent callers asking for the same key share one in-flight call: the first
+caller runs the function, the rest block until it finishes and receive the same
+result (or exception).
+"""
+import threading
+
+from . import metrics
+
+COALESCED = metrics.registry.counter(
+    'sortonym_singleflight_coalesced_total',
+    'Calls that waited on an identical in-flight call instead of running.',
+    labels=('group',),
+)
+INFLIGHT = metrics.registry.gauge(
+    'sortonym_singleflight_inflight',
+    'Distinct keys currently being fetched.',
+    labels=('group',),
+)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, wait_timeout: float = None, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` once per key at a time.
+
+        Followers give up with ``TimeoutError`` after ``wait_timeout`` seconds;
+        the leader's call keeps running and still completes for everyone else.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                INFLIGHT.inc(group=self.name)
+
+        if not leader:
+            COALESCED.inc(group=self.name)
+            if not call.event.wait(wait_timeout):
+                raise TimeoutError(f'Timed out waiting for in-flight {self.name} call {key!r}')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                INFLIGHT.dec(group=self.name)
+            call.event.set()
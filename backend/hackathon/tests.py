@@ -1,3 +1,975 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import ThreadingHTTPServer
+from unittest import mock
+from urllib.request import urlopen
 
-# Create your tests here.
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections
+from django.db.models import F, QuerySet
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import admission as admission_module, benchmarking, executors, lexicon, lobby_codes, lobby_updates, round_tokens, views
+from .cache_snapshot import cache_snapshot
+from .db_router import routing_state
+from .last_results import LastResultStore
+from .lobby_engine import LobbyEngine
+from .lobby_shards import FORWARDED_HEADER, HashRing, LobbyShardMiddleware, lobby_shards, sign_hop
+from .logging_utils import RequestIdFilter, request_id_var
+from .middleware import ReplicaPinningMiddleware
+from .admission import AdmissionMiddleware, admission
+from .auth import verify_password
+from .management.commands import bench_startup, import_teams, profile_imports
+from .management.commands.lexicon_stub import DEFAULT_RECORDING, LexiconStub, _make_handler
+from .models import (
+    AppUser, AppUserMember, GameResult, GameResultArchive, Lobby, LobbyAction, PlayerLastResult, PlayerRecentWords,
+    PlayerScoreSummary, SortonymWord, UsedRoundToken, WordLookup,
+)
+from .provider import AdaptiveTimeout
+from .recent_words import RecentWords
+from .singleflight import COALESCED, SingleFlight
+from .upsert import bulk_upsert
+from .word_cache import WordCache
+from .word_store import WordStore, word_store
+
+
+class BenchmarkingTests(TestCase):
+    def test_percentile_uses_nearest_rank(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(benchmarking._percentile(samples, 50), 0.05)
+        self.assertEqual(benchmarking._percentile(samples, 99), 0.099)
+        self.assertEqual(benchmarking._percentile(samples, 100), 0.1)
+        self.assertEqual(benchmarking._percentile([0.2], 95), 0.2)
+        self.assertEqual(benchmarking._percentile([], 50), 0.0)
+
+    def test_summarize(self):
+        row = benchmarking.summarize([0.003, 0.001, 0.002, 0.010], errors=1, wall_seconds=2)
+        self.assertEqual(row, {
+            'count': 4, 'errors': 1, 'rps': 2.0, 'mean_ms': 4.0,
+            'p50_ms': 2.0, 'p95_ms': 10.0, 'p99_ms': 10.0, 'max_ms': 10.0,
+        })
+        # Without a wall clock, throughput is measured against the summed latency
+        self.assertEqual(benchmarking.summarize([0.25, 0.25])['rps'], 4.0)
+        self.assertEqual(benchmarking.summarize([])['count'], 0)
+
+    def test_recorder_counts_errors(self):
+        recorder = benchmarking.LatencyRecorder()
+        with recorder.time('ok'):
+            pass
+        with self.assertRaises(ValueError), recorder.time('failing'):
+            raise ValueError
+        report = recorder.summary()
+        self.assertEqual((report['ok']['count'], report['ok']['errors']), (1, 0))
+        self.assertEqual((report['failing']['count'], report['failing']['errors']), (1, 1))
+
+
+class BoundedExecutorTests(TestCase):
+    def test_saturated_pool_rejects_until_work_drains(self):
+        pool = executors.BoundedExecutor('test-bounded', workers=1, queue=1)
+        self.addCleanup(pool.shutdown)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        running = pool.submit(block)
+        self.assertTrue(started.wait(5))
+        queued = pool.submit(lambda: 'queued')
+        self.assertEqual(pool.saturation, 1.0)
+        rejected = executors.POOL_REJECTED.value(pool='test-bounded')
+        with self.assertRaises(executors.PoolSaturated):
+            pool.submit(lambda: 'shed')
+        self.assertEqual(executors.POOL_REJECTED.value(pool='test-bounded'), rejected + 1)
+
+        release.set()
+        running.result(5)
+        self.assertEqual(queued.result(5), 'queued')
+        self.assertEqual(pool.saturation, 0.0)
+        self.assertEqual(pool.submit(lambda: 'accepted').result(5), 'accepted')
+
+    def test_pools_are_shared_by_name(self):
+        self.assertIs(executors.get_executor('background'), executors.get_executor('background'))
+        with self.assertRaises(KeyError):
+            executors.get_executor('no-such-pool')
+
+
+class SingleFlightTests(TestCase):
+    def _start_followers(self, flight, key, fn, count, **kwargs):
+        """Start ``count`` callers of one key; returns once all but the leader are waiting."""
+        results = []
+
+        def call():
+            try:
+                results.append(flight.do(key, fn, **kwargs))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        before = COALESCED.value(group=flight.name)
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while COALESCED.value(group=flight.name) - before < count - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return threads, results
+
+    def test_concurrent_callers_share_one_call(self):
+        flight, entered, release = SingleFlight('test-share'), threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            entered.set()
+            release.wait(5)
+            return ['glad']
+
+        threads, results = self._start_followers(flight, 'happy', fetch, 5)
+        self.assertTrue(entered.wait(5))
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['glad']] * 5)
+        # Once the call finished the key is free again
+        self.assertEqual(flight.do('happy', lambda: ['joyful']), ['joyful'])
+
+    def test_errors_reach_every_waiter(self):
+        flight, release = SingleFlight('test-errors'), threading.Event()
+
+        def fetch():
+            release.wait(5)
+            raise ConnectionError('provider down')
+
+        threads, results = self._start_followers(flight, 'happy', fetch, 3)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(r, ConnectionError) for r in results))
+
+    def test_followers_give_up_after_wait_timeout(self):
+        flight, release = SingleFlight('test-timeout'), threading.Event()
+
+        def fetch():
+            release.wait(5)
+            return 'done'
+
+        threads, results = self._start_followers(flight, 'happy', fetch, 2, wait_timeout=0.05)
+        deadline = time.monotonic() + 5
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.001)
+        # The follower has stopped waiting; the leader still finishes its call
+        self.assertIsInstance(results[0], TimeoutError)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results[1], 'done')
+
+
+class MetricsAccessTests(TestCase):
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'], METRICS_TOKEN='')
+    def test_allowed_address(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'], METRICS_TOKEN='')
+    def test_other_address_is_refused(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='127.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN='s3cret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer nope').status_code, 404)
+
+
+class RequestIdPropagationTests(TestCase):
+    def test_executor_tasks_keep_request_id(self):
+        token = request_id_var.set('req-42')
+        try:
+            future = executors.get_executor('background').submit(request_id_var.get)
+        finally:
+            request_id_var.reset(token)
+        self.assertEqual(future.result(timeout=5), 'req-42')
+
+    def test_filter_falls_back_to_request_attribute(self):
+        record = logging.LogRecord('django.request', logging.ERROR, __file__, 1, 'boom', (), None)
+        record.request = type('Request', (), {'request_id': 'req-7'})()
+        RequestIdFilter().filter(record)
+        self.assertEqual(record.request_id, 'req-7')
+
+
+class AdaptiveTimeoutTests(TestCase):
+    def test_timeouts_keep_the_timeout_from_shrinking(self):
+        timeout = AdaptiveTimeout(minimum=0.2, maximum=1.0, min_samples=20, window=100)
+        for _ in range(90):
+            timeout.observe(0.1)
+        for _ in range(10):
+            timeout.observe_timeout(0.6)
+        # A tenth of the calls hit 0.6s, so the p95 is no longer the fast calls
+        self.assertAlmostEqual(timeout.current(), 0.9)
+
+
+class UpsertTests(TestCase):
+    def test_no_conflict_target_on_mysql(self):
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(QuerySet, 'bulk_create') as bulk_create:
+            bulk_upsert(WordLookup, [], unique_fields=['word'], update_fields=['synonyms'])
+        self.assertNotIn('unique_fields', bulk_create.call_args.kwargs)
+
+    def test_word_store_flush_upserts(self):
+        store = WordStore()
+        store.record('Bright', ['a'], ['b'])
+        self.assertEqual(store.flush(), 1)
+        store.record('bright', ['shiny', 'vivid', 'radiant'], ['dull', 'dim', 'dark'])
+        self.assertEqual(store.flush(), 1)
+        row = WordLookup.objects.get(word='bright')
+        self.assertTrue(row.playable)
+        self.assertEqual(row.synonyms, 'shiny,vivid,radiant')
+
+    def test_word_store_keeps_answers_when_the_write_fails(self):
+        store = WordStore()
+        store.record('bright', ['a'], ['b'])
+        with mock.patch('hackathon.word_store.bulk_upsert', side_effect=DatabaseError('gone away')):
+            self.assertEqual(store.flush(), 0)
+        self.assertEqual(store.flush(), 1)
+        self.assertTrue(WordLookup.objects.filter(word='bright').exists())
+
+
+class WordPoolTests(TestCase):
+    def test_pools_fill_from_stored_answers_while_the_provider_is_down(self):
+        words = [f'word{chr(97 + i)}{chr(97 + j)}' for i in range(10) for j in range(10)]
+        for word in words:
+            word_store.record(word, ['shiny', 'vivid', 'radiant'], ['dull', 'dim', 'dark'])
+        word_store.flush()
+        cache.clear()
+        pools = WordCache()
+        with mock.patch.object(pools, '_get_words_from_wordfreq', return_value=words), \
+                mock.patch('hackathon.word_cache.lexicon.lookup_pairs', return_value=None), \
+                mock.patch('hackathon.word_cache.provider.is_available', return_value=False), \
+                mock.patch('hackathon.word_cache.provider.iter_word_pairs') as iter_word_pairs:
+            pools._populate_difficulty_cache('easy')
+        iter_word_pairs.assert_not_called()
+        self.assertGreaterEqual(pools.pool_sizes()['easy'], pools.LOW_WATERMARK)
+
+
+class LexiconStubTests(TestCase):
+    RECORDING = {'rel_syn': {'happy': [{'word': 'glad', 'score': 3000}]},
+                 'rel_ant': {'happy': [{'word': 'sad', 'score': 3000}]}}
+
+    def test_recorded_words_are_replayed(self):
+        stub = LexiconStub(self.RECORDING)
+        self.assertEqual(stub.lookup('rel_syn', 'Happy'), (200, [{'word': 'glad', 'score': 3000}]))
+        self.assertEqual(stub.stats['replayed'], 1)
+
+    def test_unrecorded_words_are_synthesized_deterministically(self):
+        with open(DEFAULT_RECORDING, encoding='utf-8') as f:
+            recording = json.load(f)
+        words = [f'zzword{i}' for i in range(40)]
+        first = [LexiconStub(recording, seed=1).lookup('rel_syn', w) for w in words]
+        second = [LexiconStub(recording, seed=2).lookup('rel_syn', w) for w in words]
+        self.assertEqual(first, second)
+        playable = [payload for _, payload in first if payload]
+        self.assertTrue(0 < len(playable) < len(words))
+        self.assertTrue(all(status == 200 for status, _ in first))
+        none_playable = LexiconStub(recording, playable_rate=0.0)
+        self.assertEqual(none_playable.lookup('rel_syn', 'zzword0'), (200, []))
+
+    def test_failures_and_timeouts_are_injected(self):
+        self.assertEqual(LexiconStub(self.RECORDING, failure_rate=1.0).lookup('rel_syn', 'happy')[0], 503)
+        stub = LexiconStub(self.RECORDING, timeout_rate=1.0, timeout_ms=0)
+        self.assertEqual(stub.lookup('rel_syn', 'happy')[0], 504)
+        self.assertEqual(stub.stats['timed_out'], 1)
+
+        def statuses(seed):
+            stub = LexiconStub(self.RECORDING, failure_rate=0.3, seed=seed)
+            return [stub.lookup('rel_syn', 'happy')[0] for _ in range(50)]
+
+        self.assertEqual(statuses(7), statuses(7))
+        self.assertIn(503, statuses(7))
+        self.assertIn(200, statuses(7))
+
+    def test_serves_the_provider_api_over_http(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(LexiconStub(self.RECORDING), quiet=True))
+        self.addCleanup(server.server_close)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.shutdown)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        with urlopen(f'{base}/words?rel_ant=happy', timeout=5) as response:
+            self.assertEqual(json.load(response), [{'word': 'sad', 'score': 3000}])
+        with urlopen(f'{base}/_stats', timeout=5) as response:
+            self.assertEqual(json.load(response)['replayed'], 1)
+
+
+class LexiconTests(TestCase):
+    def _lookup(self, word, syns, ants, playable, expires_in):
+        now = timezone.now()
+        WordLookup.objects.create(word=word, synonyms=','.join(syns), antonyms=','.join(ants),
+                                  playable=playable, fetched_at=now, expires_at=now + expires_in)
+
+    def test_built_file_reads_back(self):
+        SortonymWord.objects.create(word='Happy', synonyms='glad, joyful', antonyms='sad,unhappy')
+        self._lookup('bright', ['shiny', 'vivid', 'radiant'], ['dull', 'dim', 'dark'], True, timedelta(days=1))
+        self._lookup('stale', ['old', 'worn', 'dated'], ['new', 'fresh', 'novel'], True, -timedelta(days=1))
+        self._lookup('obscure', ['hidden'], [], False, timedelta(days=1))
+        self.addCleanup(setattr, lexicon, '_mapped', lexicon._mapped)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'lexicon.bin')
+            call_command('build_lexicon', output=path, ranked=100, stdout=io.StringIO())
+            self.assertTrue(lexicon.load_mapped(path))
+
+        self.assertEqual(lexicon.lookup_pairs('HAPPY'), (['glad', 'joyful'], ['sad', 'unhappy']))
+        self.assertEqual(lexicon.lookup_pairs('bright'), (['shiny', 'vivid', 'radiant'], ['dull', 'dim', 'dark']))
+        self.assertIsNone(lexicon.lookup_pairs('stale'))
+        self.assertEqual(lexicon.words_in_range(10, 20), lexicon.top_n_list(100)[10:20])
+        # Negative answers stay in the expiring WordLookup table only
+        self.assertIsNone(lexicon.lookup_pairs('obscure'))
+        WordLookup.objects.filter(word='obscure').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(word_store.split_candidates(['obscure'], 3), ([], ['obscure']))
+
+
+class LobbyCodeTests(TestCase):
+    def test_permutation_is_collision_free(self):
+        key = lobby_codes._derive_key('test-secret')
+        indexes = {lobby_codes.permute(key, counter) for counter in range(20000)}
+        self.assertEqual(len(indexes), 20000)
+        self.assertTrue(all(0 <= index < lobby_codes.SPACE for index in indexes))
+
+    def test_consecutive_codes_have_no_fixed_stride(self):
+        key = lobby_codes._derive_key('test-secret')
+        values = [lobby_codes.permute(key, counter) for counter in range(4)]
+        strides = {(b - a) % lobby_codes.SPACE for a, b in zip(values, values[1:])}
+        self.assertEqual(len(strides), 3)
+
+    def test_codes_depend_on_the_secret(self):
+        one, other = lobby_codes._derive_key('one'), lobby_codes._derive_key('other')
+        self.assertNotEqual(
+            [lobby_codes.permute(one, c) for c in range(5)],
+            [lobby_codes.permute(other, c) for c in range(5)],
+        )
+
+    def test_allocated_codes_are_distinct(self):
+        allocator = lobby_codes.LobbyCodeAllocator(block_size=10)
+        codes = [allocator.allocate() for _ in range(25)]
+        self.assertEqual(len(set(codes)), 25)
+        self.assertTrue(all(len(code) == 6 and code.isalnum() for code in codes))
+
+
+class LobbyUpdateTests(TestCase):
+    def setUp(self):
+        self.lobby = Lobby.objects.create(code='CAS001', host_email='h@example.com', host_name='H')
+
+    def _rename(self, conflicts):
+        calls = []
+
+        def apply(lobby):
+            calls.append(lobby.version)
+            if len(calls) <= conflicts:
+                # Another worker writes between our read and our update
+                Lobby.objects.filter(pk=lobby.pk).update(version=F('version') + 1)
+            lobby.host_name = 'Renamed'
+            return ['host_name']
+
+        return calls, apply
+
+    def test_conflict_is_retried_on_a_fresh_copy(self):
+        calls, apply = self._rename(conflicts=1)
+        lobby = lobby_updates.mutate('CAS001', 'rename', apply)
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual(lobby.version, 2)
+        self.lobby.refresh_from_db()
+        self.assertEqual((self.lobby.host_name, self.lobby.version), ('Renamed', 2))
+
+    def test_gives_up_after_max_attempts(self):
+        _, apply = self._rename(conflicts=lobby_updates.MAX_ATTEMPTS)
+        with self.assertRaises(lobby_updates.LobbyConflict):
+            lobby_updates.mutate('CAS001', 'rename', apply)
+        self.lobby.refresh_from_db()
+        self.assertEqual(self.lobby.host_name, 'H')
+
+
+class LobbyEngineTests(TestCase):
+    def setUp(self):
+        Lobby.objects.create(
+            code='ENG001', host_email='h@example.com', host_name='H', version=3,
+            players_data=[{'id': 'h@example.com', 'name': 'H', 'team': None, 'isHost': True, 'picture': None}],
+        )
+        self.engine = LobbyEngine()
+
+    def test_load_replays_actions_logged_after_the_snapshot(self):
+        # A crash after the log append but before the next snapshot
+        LobbyAction.objects.create(lobby_code='ENG001', seq=3, action='join', payload={'player_id': 'old', 'name': 'Old'})
+        LobbyAction.objects.create(lobby_code='ENG001', seq=4, action='join', payload={'player_id': 'p@example.com', 'name': 'P'})
+        LobbyAction.objects.create(lobby_code='ENG001', seq=5, action='join_team',
+                                   payload={'player_id': 'p@example.com', 'team': 'B'})
+        live = self.engine._get('ENG001')
+        self.assertEqual((live.seq, live.persisted_seq), (5, 3))
+        self.assertEqual([(p['id'], p['team']) for p in live.players_data], [('h@example.com', None), ('p@example.com', 'B')])
+
+        self.engine.flush(force_snapshot=True)
+        row = Lobby.objects.get(code='ENG001')
+        self.assertEqual(row.version, 5)
+        self.assertEqual(row.players_data[1]['team'], 'B')
+        self.assertFalse(LobbyAction.objects.filter(lobby_code='ENG001').exists())
+
+    def test_snapshot_conflict_evicts_the_live_copy(self):
+        render = lambda live: {'players': len(live.players_data)}
+        with mock.patch.object(self.engine, '_ensure_flusher'):
+            self.engine.apply('ENG001', 'join', render, player_id='p@example.com', name='P')
+            live = self.engine._lobbies['ENG001']
+            # Someone else (e.g. manage_lobbies) writes the row meanwhile
+            Lobby.objects.filter(code='ENG001').update(status='EXPIRED', version=F('version') + 1)
+            self.engine.flush(force_snapshot=True)
+            self.assertTrue(live.evicted)
+            self.assertNotIn('ENG001', self.engine._lobbies)
+            self.assertEqual(Lobby.objects.get(code='ENG001').status, 'EXPIRED')
+            # The next use reloads the row; the outside write wins
+            self.assertEqual(self.engine.status('ENG001', render), {'players': 1})
+            self.assertEqual(self.engine._lobbies['ENG001'].status, 'EXPIRED')
+
+
+class HashRingTests(TestCase):
+    NODES = ['http://node-a:8000', 'http://node-b:8000', 'http://node-c:8000', 'http://node-d:8000']
+    CODES = [f'{i:06d}' for i in range(4000)]
+
+    def _owners(self, nodes):
+        ring = HashRing(nodes)
+        return {code: ring.owner(code) for code in self.CODES}
+
+    def test_same_nodes_same_owners_in_any_order(self):
+        self.assertEqual(self._owners(self.NODES), self._owners(reversed(self.NODES)))
+
+    def test_adding_a_node_only_moves_codes_to_it(self):
+        before = self._owners(self.NODES)
+        after = self._owners(self.NODES + ['http://node-e:8000'])
+        moved = [code for code in self.CODES if before[code] != after[code]]
+        self.assertTrue(all(after[code] == 'http://node-e:8000' for code in moved))
+        # About 1/5 of the codes; the vnodes keep it near that
+        self.assertTrue(0.1 < len(moved) / len(self.CODES) < 0.3, len(moved))
+
+    def test_removing_a_node_only_moves_its_codes(self):
+        before = self._owners(self.NODES)
+        after = self._owners(self.NODES[1:])
+        moved = {code for code in self.CODES if before[code] != after[code]}
+        self.assertEqual(moved, {code for code in self.CODES if before[code] == self.NODES[0]})
+        self.assertTrue(0.15 < len(moved) / len(self.CODES) < 0.35, len(moved))
+
+
+@override_settings(LOBBY_NODE_SELF='http://node-a:8000', LOBBY_NODES=['http://node-a:8000', 'http://node-b:8000'],
+                   LOBBY_NODES_FILE='', LOBBY_NODE_FAILURES=3)
+class LobbyShardMiddlewareTests(TestCase):
+    OWNER = 'http://node-b:8000'
+
+    def setUp(self):
+        lobby_shards._down.clear()
+        lobby_shards._failures.clear()
+        self.addCleanup(lobby_shards._down.clear)
+        self.code = next(f'{i:06d}' for i in range(1000) if lobby_shards.owner(f'{i:06d}') == self.OWNER)
+        self.middleware = LobbyShardMiddleware(lambda request: HttpResponse('local'))
+
+    def _status(self, **headers):
+        return RequestFactory().get('/api/lobby/status', {'code': self.code}, **headers)
+
+    def test_unsigned_forward_header_is_not_trusted(self):
+        with mock.patch('hackathon.lobby_shards._forward', return_value=HttpResponse('owner')) as forward:
+            response = self.middleware(self._status(HTTP_X_SORTONYM_FORWARDED_BY='http://node-b:8000'))
+        self.assertEqual(response.content, b'owner')
+        forward.assert_called_once()
+
+    def test_signed_hop_from_a_peer_is_served_locally(self):
+        with override_settings(LOBBY_NODE_SELF=self.OWNER):
+            hop = sign_hop('GET', '/api/lobby/status')
+        with mock.patch('hackathon.lobby_shards._forward') as forward:
+            response = self.middleware(self._status(**{f'HTTP_{FORWARDED_HEADER.upper().replace("-", "_")}': hop}))
+        self.assertEqual(response.content, b'local')
+        forward.assert_not_called()
+
+    def test_isolated_failures_keep_the_owner(self):
+        with mock.patch('hackathon.lobby_shards._forward', side_effect=ConnectionError), \
+                mock.patch.object(lobby_shards, '_probe', return_value=True):
+            for _ in range(5):
+                self.assertEqual(self.middleware(self._status()).status_code, 503)
+        self.assertEqual(lobby_shards.owner(self.code), self.OWNER)
+
+    def test_owner_is_marked_down_after_consecutive_failures_and_a_failed_probe(self):
+        with mock.patch('hackathon.lobby_shards._forward', side_effect=ConnectionError), \
+                mock.patch.object(lobby_shards, '_probe', return_value=False):
+            statuses = [self.middleware(self._status()).status_code for _ in range(3)]
+        self.assertEqual(statuses, [503, 503, 200])
+        self.assertEqual(lobby_shards.owner(self.code), 'http://node-a:8000')
+
+    def test_a_success_resets_the_failure_count(self):
+        with mock.patch.object(lobby_shards, '_probe', return_value=False):
+            with mock.patch('hackathon.lobby_shards._forward', side_effect=ConnectionError):
+                self.middleware(self._status())
+                self.middleware(self._status())
+            with mock.patch('hackathon.lobby_shards._forward', return_value=HttpResponse('owner')):
+                self.middleware(self._status())
+            with mock.patch('hackathon.lobby_shards._forward', side_effect=ConnectionError):
+                self.assertEqual(self.middleware(self._status()).status_code, 503)
+        self.assertEqual(lobby_shards.owner(self.code), self.OWNER)
+
+
+class ArchiveResultsTests(TestCase):
+    def _result(self, email, score, days_ago):
+        result = GameResult.objects.create(player_email=email, player_name='P', round_id=1, score=score,
+                                           total_correct=int(score), time_taken=10)
+        GameResult.objects.filter(id=result.id).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+    def _archive(self, **options):
+        call_command('archive_results', stdout=io.StringIO(), **options)
+
+    def test_summaries_keep_the_best_score_and_add_up_across_runs(self):
+        self._result('p@example.com', 5, days_ago=40)
+        self._result('p@example.com', 9, days_ago=39)
+        self._archive(days=30)
+        self._result('p@example.com', 7, days_ago=35)
+        self._archive(days=30)
+        summary = PlayerScoreSummary.objects.get(player_email='p@example.com')
+        self.assertEqual((summary.games_played, summary.total_score, summary.best_score), (3, 21, 9))
+        self.assertEqual(GameResultArchive.objects.count(), 3)
+
+    def test_days_limits_what_is_archived(self):
+        self._result('p@example.com', 5, days_ago=10)
+        self._result('p@example.com', 6, days_ago=2)
+        self._archive(days=5)
+        self.assertEqual(list(GameResult.objects.values_list('score', flat=True)), [6])
+        self.assertEqual(PlayerScoreSummary.objects.get(player_email='p@example.com').games_played, 1)
+        with self.assertRaises(CommandError):
+            self._archive(days=0)
+
+    def test_csv_is_written_once_and_not_on_rollback(self):
+        self._result('p@example.com', 5, days_ago=40)
+        self._result('q@example.com', 6, days_ago=40)
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch('hackathon.management.commands.archive_results.Command._summarize',
+                            side_effect=DatabaseError('boom')), self.assertRaises(DatabaseError):
+                self._archive(days=30, format='csv', output=tmp, chunk_size=1)
+            self.assertFalse(any(name.endswith('.csv') for name in os.listdir(tmp)))
+
+            self._archive(days=30, format='csv', output=tmp, chunk_size=1)
+            [name] = [name for name in os.listdir(tmp) if name.endswith('.csv')]
+            with open(os.path.join(tmp, name), encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertFalse(GameResult.objects.exists())
+
+
+class LastResultTests(TestCase):
+    def _result(self, score):
+        return GameResult.objects.create(
+            player_email='p@example.com', player_name='P', round_id=1, score=score, total_correct=1, time_taken=10,
+        )
+
+    def test_record_upserts_one_row_per_player(self):
+        store = LastResultStore()
+        store.record('p@example.com', self._result(10))
+        store.record('p@example.com', self._result(20))
+        self.assertEqual(PlayerLastResult.objects.filter(player_email='p@example.com').count(), 1)
+        self.assertEqual(store.get('p@example.com')['score'], 20)
+
+    def test_short_timeout_without_a_shared_cache(self):
+        store = LastResultStore()
+        self.assertFalse(store.shared)
+        with override_settings(LAST_RESULT_LOCAL_CACHE_SECONDS=5, LAST_RESULT_CACHE_SECONDS=300):
+            self.assertEqual(store.timeout, 5)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=5)
+class ReplicaPinningTests(TestCase):
+    def _run(self, request, write=False):
+        seen = {}
+
+        def view(request):
+            state = routing_state.get()
+            seen['pinned'] = state['pinned']
+            state['wrote'] = write
+            return HttpResponse()
+
+        return ReplicaPinningMiddleware(view)(request), seen
+
+    def test_write_sends_the_pin_header(self):
+        response, _ = self._run(RequestFactory().post('/api/lobby/update'), write=True)
+        self.assertEqual(response['X-Sortonym-DB-Pin'], '5')
+
+    def test_echoed_header_pins_reads(self):
+        _, seen = self._run(RequestFactory().get('/api/lobby/status', HTTP_X_SORTONYM_DB_PIN='1'))
+        self.assertTrue(seen['pinned'])
+        _, seen = self._run(RequestFactory().get('/api/lobby/status'))
+        self.assertFalse(seen['pinned'])
+
+
+class RoundTokenTests(TestCase):
+    WORDS = [('glad', round_tokens.SYNONYM), ('sad', round_tokens.ANTONYM)]
+
+    def test_round_trip(self):
+        claims = round_tokens.verify(round_tokens.issue(7, 'easy', self.WORDS))
+        self.assertEqual(claims.round_id, 7)
+        self.assertEqual(claims.synonyms, {'glad'})
+        self.assertEqual(claims.antonyms, {'sad'})
+
+    def test_tampered_token_is_rejected(self):
+        token = round_tokens.issue(7, 'easy', self.WORDS)
+        payload = signing.loads(token, key=settings.SECRET_KEY, salt=round_tokens.SALT)
+        payload['r'] = 8
+        forged = signing.dumps(payload, key='not-the-secret', salt=round_tokens.SALT, compress=True)
+        for bad in (forged, token[:-2] + ('AA' if not token.endswith('AA') else 'BB')):
+            with self.assertRaisesMessage(round_tokens.InvalidRoundToken, 'Invalid round token'):
+                round_tokens.verify(bad)
+
+    def test_expired_token_is_rejected(self):
+        token = round_tokens.issue(7, 'easy', self.WORDS)
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 3600):
+            with self.assertRaisesMessage(round_tokens.InvalidRoundToken, 'Round expired'):
+                round_tokens.verify(token)
+
+    def test_replay_is_rejected(self):
+        token = round_tokens.issue(7, 'easy', self.WORDS)
+        round_tokens.verify(token)
+        # The nonce is in the database, so any worker refuses the second submit
+        self.assertEqual(UsedRoundToken.objects.count(), 1)
+        with self.assertRaisesMessage(round_tokens.InvalidRoundToken, 'Round already submitted'):
+            round_tokens.verify(token)
+
+    def test_client_cannot_report_less_than_the_server_measured(self):
+        token = round_tokens.issue(1, 'easy', self.WORDS)
+        issued_at = round_tokens.verify(token, single_use=False).issued_at
+        body = {'roundToken': token, 'synonyms': ['w0'], 'antonyms': ['w1'], 'timeTaken': 1}
+        with mock.patch('hackathon.round_tokens.time.time', return_value=issued_at + 40), \
+                override_settings(ROUND_TOKEN_CLOCK_GRACE=3):
+            response = self.client.post('/api/game/submit', json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(GameResult.objects.get().time_taken, 37, places=3)
+
+
+class GameSubmitTests(TestCase):
+    WORDS = [('glad', round_tokens.SYNONYM), ('sad', round_tokens.ANTONYM), ('happy', round_tokens.SYNONYM)]
+
+    def _post(self, path, body):
+        return self.client.post(path, json.dumps(body), content_type='application/json')
+
+    def test_submit_without_a_token_is_rejected(self):
+        response = self._post('/api/game/submit', {'roundId': 1, 'synonyms': ['syn_glad'], 'timeTaken': 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(GameResult.objects.exists())
+
+    def test_repeated_ids_count_once(self):
+        token = round_tokens.issue(1, 'easy', self.WORDS)
+        response = self._post('/api/game/submit', {'roundToken': token, 'synonyms': ['w0', 'w0', 'glad'], 'antonyms': []})
+        self.assertEqual(response.json()['total_correct'], 1)
+        self.assertEqual(response.json()['answers'], {'synonyms': ['glad', 'happy'], 'antonyms': ['sad']})
+
+    def test_start_hands_out_opaque_ids(self):
+        with mock.patch('hackathon.views.provider.is_available', return_value=False), \
+                mock.patch('hackathon.views._pick_local_word', return_value=None):
+            words = self._post('/api/game/start', {'level': 'easy'}).json()['words']
+        self.assertEqual([w['id'] for w in words], [f'w{i}' for i in range(len(words))])
+
+    def test_hints_are_limited_per_round(self):
+        token = round_tokens.issue(1, 'hard', self.WORDS)
+        hint = self._post('/api/game/hint', {'roundToken': token, 'id': 'w1'}).json()
+        self.assertEqual((hint['category'], hint['hints_left']), (round_tokens.ANTONYM, 0))
+        # The same word again is free; another one is over the limit
+        self.assertEqual(self._post('/api/game/hint', {'roundToken': token, 'id': 'w1'}).status_code, 200)
+        self.assertEqual(self._post('/api/game/hint', {'roundToken': token, 'id': 'w0'}).status_code, 403)
+
+    def test_no_hints_after_submit(self):
+        token = round_tokens.issue(1, 'easy', self.WORDS)
+        self._post('/api/game/submit', {'roundToken': token, 'synonyms': [], 'antonyms': []})
+        self.assertEqual(self._post('/api/game/hint', {'roundToken': token, 'id': 'w0'}).status_code, 403)
+
+
+class RecentWordsTests(TestCase):
+    def _start(self, **extra):
+        with mock.patch('hackathon.views.provider.is_available', return_value=False), \
+                mock.patch('hackathon.views._pick_local_word', return_value=None):
+            response = self.client.post('/api/game/start', json.dumps({'level': 'easy'}),
+                                        content_type='application/json', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['anchor_word']
+
+    def test_jwt_player_gets_no_repeats(self):
+        claims = base64.urlsafe_b64encode(json.dumps({'email': 'Jwt@example.com', 'name': 'J'}).encode()).decode()
+        auth = {'HTTP_AUTHORIZATION': f'Bearer header.{claims.rstrip("=")}.sig'}
+        anchors = [self._start(**auth) for _ in range(len(views.FALLBACK_WORDS_LIST))]
+        self.assertEqual(len(set(anchors)), len(anchors))
+        self.assertEqual(PlayerRecentWords.objects.get(player_id='jwt@example.com').words, anchors)
+
+    def test_history_is_shared_and_bounded(self):
+        writer, reader = RecentWords(), RecentWords()
+        with override_settings(RECENT_WORDS_SIZE=3):
+            for word in ('one', 'two', 'three', 'four'):
+                writer.record('p@example.com', word)
+            recent = reader.get('P@example.com')
+        self.assertEqual(recent.words, ['two', 'three', 'four'])
+        self.assertIn('four', recent)
+        self.assertNotIn('one', recent.words)
+
+    def test_idle_history_expires(self):
+        RecentWords().record('p@example.com', 'one')
+        PlayerRecentWords.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        with override_settings(RECENT_WORDS_SECONDS=86400):
+            self.assertEqual(RecentWords().get('p@example.com').words, [])
+        RecentWords().record('p@example.com', 'two')
+        self.assertEqual(RecentWords().get('p@example.com').words, ['two'])
+
+    def test_concurrent_starts_keep_both_words(self):
+        store = RecentWords()
+        store.record('p@example.com', 'one')
+        first, second = store.get('p@example.com'), store.get('p@example.com')
+        store.record('p@example.com', 'two', first)
+        # Appends against a stale copy: the version moved, so it re-reads and retries
+        store.record('p@example.com', 'three', second)
+        self.assertEqual(store.get('p@example.com').words, ['one', 'two', 'three'])
+
+    def test_guests_are_told_apart_by_their_anonymous_id(self):
+        one = {'HTTP_X_SORTONYM_PLAYER': 'a' * 32}
+        anchors = [self._start(**one) for _ in range(len(views.FALLBACK_WORDS_LIST))]
+        self.assertEqual(len(set(anchors)), len(anchors))
+        self._start(HTTP_X_SORTONYM_PLAYER='b' * 32)
+        self._start()
+        self.assertEqual(
+            sorted(PlayerRecentWords.objects.values_list('player_id', flat=True)),
+            [f'anon:{"a" * 32}', f'anon:{"b" * 32}'],
+        )
+
+
+class AdmissionTests(TestCase):
+    def setUp(self):
+        admission._latency_ms, admission._inflight = 0.0, 0
+        self.addCleanup(setattr, admission, '_latency_ms', 0.0)
+        self.addCleanup(setattr, admission, '_inflight', 0)
+
+    def _overload(self, factor):
+        admission._latency_ms = admission.latency_threshold_ms * factor
+
+    @override_settings(POLL_BASE_MS=1000, POLL_MAX_MS=10000)
+    def test_next_poll_scales_with_pressure_and_is_capped(self):
+        self.assertEqual(admission.next_poll_ms('STARTED'), 1000)
+        self.assertEqual(admission.next_poll_ms('WAITING', updated_at=timezone.now() - timedelta(seconds=30)), 1500)
+        self.assertEqual(admission.next_poll_ms('STARTED', finished=True), 5000)
+        self._overload(3)
+        self.assertEqual(admission.next_poll_ms('STARTED'), 3000)
+        self.assertEqual(admission.next_poll_ms('EXPIRED'), 10000)
+
+    def test_only_polls_are_timed(self):
+        middleware = AdmissionMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+        with mock.patch.object(admission_module.time, 'perf_counter', side_effect=[0.0, 0.0, 0.2]):
+            middleware(factory.post('/api/game/start'))
+            self.assertEqual(admission._latency_ms, 0.0)
+            middleware(factory.get('/api/lobby/status'))
+        self.assertAlmostEqual(admission._latency_ms, 200 * admission_module.LATENCY_ALPHA)
+        self.assertEqual(admission._inflight, 0)
+
+    @override_settings(ADMISSION_WORKERS=1)
+    def test_sync_worker_is_not_under_pressure_by_serving_a_request(self):
+        admission.started()
+        self.assertEqual(admission.pressure(), 0.0)
+
+    @override_settings(ADMISSION_WORKERS=4)
+    def test_busy_threads_add_pressure(self):
+        for _ in range(4):
+            admission.started()
+        self.assertEqual(admission.pressure(), 1.0)
+
+    @override_settings(ADMISSION_SHEDDING=True, POLL_BASE_MS=1000)
+    def test_polls_are_shed_with_retry_after(self):
+        self._overload(2.5)
+        with mock.patch.object(admission_module.random, 'random', return_value=0.0):
+            response = self.client.get('/api/lobby/status', {'code': 'ABCDEF'})
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.json()['next_poll_ms'], 2500)
+            self.assertEqual(response['Retry-After'], '3')
+            self.assertFalse(admission.should_shed(RequestFactory().post('/api/lobby/status')))
+        self.assertEqual(admission._inflight, 0)
+        with mock.patch.object(admission_module.random, 'random', return_value=0.95):
+            self.assertNotEqual(self.client.get('/api/lobby/status', {'code': 'ABCDEF'}).status_code, 429)
+
+
+class BenchDbConnectionsTests(TransactionTestCase):
+    # Closes and reopens the default connection, so it cannot run inside a test transaction
+
+    def test_reports_both_modes_and_restores_settings(self):
+        settings_dict = connections['default'].settings_dict
+        original = (settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'])
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.json')
+            call_command('bench_db_connections', iterations=5, max_age=30, json_path=path, stdout=out)
+            call_command('bench_db_connections', iterations=5, compare_path=path, stdout=out)
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(set(report), {'connect_per_request', 'persistent[max_age=30]'})
+        self.assertEqual(report['connect_per_request']['count'], 5)
+        # One connection at most for the whole persistent run, never more than reconnecting per request
+        persistent = report['persistent[max_age=30]']['connections_opened']
+        self.assertLessEqual(persistent, 1)
+        self.assertGreaterEqual(report['connect_per_request']['connections_opened'], persistent)
+        self.assertIn('p95 vs base', out.getvalue())
+        self.assertEqual((settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS']), original)
+
+
+class StartupCommandTests(TestCase):
+    IMPORTTIME = (
+        'import time: self [us] | cumulative | imported package\n'
+        'import time:       120 |        120 |   _io\n'
+        'import time:      3000 |      45000 | django\n'
+        'import time:      9000 |      20000 | requests\n'
+        'not an import line\n'
+    )
+
+    def test_certificate_is_a_pdf(self):
+        response = self.client.get('/api/certificate', {'name': 'Ada', 'score': '42', 'level': 'hard'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(base64.b64decode(response.json()['certificate_base64']).startswith(b'%PDF'))
+
+    def test_parse_importtime(self):
+        self.assertEqual(profile_imports.parse_importtime(self.IMPORTTIME),
+                         [('_io', 120, 120), ('django', 3000, 45000), ('requests', 9000, 20000)])
+
+    def test_profile_imports_flags_heavy_modules(self):
+        out = io.StringIO()
+        done = mock.Mock(returncode=0, stderr=self.IMPORTTIME)
+        with mock.patch.object(profile_imports.subprocess, 'run', return_value=done):
+            call_command('profile_imports', top=2, stdout=out)
+        self.assertIn('3 modules, 12.1 ms total import time', out.getvalue())
+        self.assertIn('Loaded at boot (expected lazy): requests', out.getvalue())
+        with mock.patch.object(profile_imports.subprocess, 'run', return_value=mock.Mock(returncode=1, stderr='boom')), \
+                self.assertRaises(CommandError):
+            call_command('profile_imports', stdout=io.StringIO())
+
+    def test_worker_boot_leaves_heavy_imports_lazy(self):
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {'CACHE_SNAPSHOT_PATH': ''}):
+            path = os.path.join(tmp, 'imports.json')
+            call_command('profile_imports', json_path=path, stdout=io.StringIO())
+            with open(path, encoding='utf-8') as f:
+                loaded = {row['module'] for row in json.load(f)}
+        self.assertIn('hackathon.word_cache', loaded)
+        self.assertFalse(loaded & {'wordfreq', 'reportlab', 'requests'})
+
+    def test_bench_startup_reports_each_first_request(self):
+        worker = {'boot': 0.5, 'first:health': 0.01, 'first:health:status': '200 OK',
+                  'first:certificate': 0.2, 'first:certificate:status': '500 Internal Server Error',
+                  'max_rss_mb': 80.0}
+        done = mock.Mock(returncode=0, stdout='log line\n' + json.dumps(worker))
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(bench_startup.subprocess, 'run', return_value=done) as run:
+            path = os.path.join(tmp, 'startup.json')
+            call_command('bench_startup', runs=2, json_path=path, stdout=out)
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+        self.assertEqual(run.call_count, 2)
+        self.assertEqual(set(report), {'boot', 'first:health', 'first:certificate'})
+        self.assertEqual((report['boot']['count'], report['boot']['p50_ms']), (2, 500.0))
+        self.assertIn('first:certificate returned 500', out.getvalue())
+        self.assertIn('Peak RSS per worker: 80.0 MB', out.getvalue())
+
+
+class ImportTeamsTests(TestCase):
+    ROWS = [
+        ('Team 1', 'M1', 'Ann', 'ann@example.com', '+91 98765 43210'),
+        ('Team 1', 'M2', 'Bob', '', '9876543211'),
+        ('Team 2', 'M3', 'Cat', 'cat@example.com', '9876543212'),
+        ('Team 3', 'M4', 'Dan', '', '9876543213'),
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv_path = os.path.join(tmp.name, 'teams.csv')
+
+    def _write_csv(self, rows):
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
+            f.write('Team No.,Member ID,Name,Email,Phone\n')
+            f.writelines(','.join(row) + '\n' for row in rows)
+
+    def _import(self, *args):
+        out = io.StringIO()
+        call_command('import_teams', '--csv', self.csv_path, '--workers', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_creates_accounts_and_members(self):
+        self._write_csv(self.ROWS)
+        self._import()
+        team = AppUser.objects.get(team_no=1)
+        self.assertEqual(team.username, 'Team 1')
+        self.assertTrue(verify_password('Team@001', salt_b64=team.password_salt_b64,
+                                        password_hash_b64=team.password_hash_b64, iterations=team.password_iterations))
+        self.assertEqual(sorted(team.members.values_list('member_id', flat=True)), ['M1', 'M2'])
+        self.assertEqual(AppUserMember.objects.get(member_id='M1').phone, '919876543210')
+        self.assertEqual(AppUser.objects.count(), 3)
+
+    def test_reimport_updates_and_drops_members(self):
+        self._write_csv(self.ROWS)
+        self._import()
+        self._write_csv([self.ROWS[0], ('Team 2', 'M3', 'Cathy', '', '9876543212')])
+        self._import()
+        self.assertFalse(AppUserMember.objects.filter(member_id='M2').exists())
+        self.assertEqual(AppUserMember.objects.get(member_id='M3').name, 'Cathy')
+
+    def test_stream_resumes_from_the_checkpoint(self):
+        self._write_csv(self.ROWS)
+        real_write = import_teams._write_chunk
+        calls = []
+
+        def crash_on_second_chunk(*args, **kwargs):
+            calls.append(args[0])
+            if len(calls) == 2:
+                raise RuntimeError('killed')
+            return real_write(*args, **kwargs)
+
+        with mock.patch.object(import_teams, '_write_chunk', side_effect=crash_on_second_chunk):
+            with self.assertRaisesMessage(RuntimeError, 'killed'):
+                self._import('--stream', '--chunk-size', '1')
+        self.assertEqual(list(AppUser.objects.values_list('team_no', flat=True)), [1])
+        checkpoint = f'{self.csv_path}.checkpoint'
+        with open(checkpoint, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['last_row'], 3)
+
+        out = self._import('--stream', '--chunk-size', '1')
+        self.assertIn('Resuming after row 3', out)
+        self.assertEqual(sorted(AppUser.objects.values_list('team_no', flat=True)), [1, 2, 3])
+        self.assertEqual(AppUserMember.objects.count(), 4)
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_resume_refuses_a_changed_prefix(self):
+        self._write_csv(self.ROWS)
+        with open(f'{self.csv_path}.checkpoint', 'w', encoding='utf-8') as f:
+            json.dump({'csv': self.csv_path, 'last_row': 3, 'rows_sha256': 'not-this-file'}, f)
+        with self.assertRaisesMessage(CommandError, 'have changed since'):
+            self._import('--stream', '--chunk-size', '1')
+
+
+class CacheSnapshotTests(TestCase):
+    def test_sections_outlive_the_snapshot_interval(self):
+        # Otherwise a section is always expired by the time it is restored
+        self.assertTrue(cache_snapshot._sections)
+        for section in cache_snapshot._sections.values():
+            self.assertGreater(section.timeout, settings.CACHE_SNAPSHOT_INTERVAL, section.name)
+
+    def test_the_test_suite_never_writes_the_snapshot(self):
+        self.assertEqual(settings.CACHE_SNAPSHOT_PATH, '')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache_snapshot.json')
+            # Only the WSGI/ASGI modules hook requests up to the snapshot
+            with override_settings(CACHE_SNAPSHOT_PATH=path, CACHE_SNAPSHOT_INTERVAL=0):
+                for _ in range(3):
+                    self.client.get('/')
+            self.assertFalse(os.path.exists(path))
@@ -0,0 +1,23 @@
+"""
+``bulk_create`` upserts that work on every supported database.
+
+PostgreSQL and SQLite need the conflict target (``unique_fields``). MySQL's
+``ON DUPLICATE KEY UPDATE`` has no target, and Django raises
+``NotSupportedError`` if one is passed. ``bulk_upsert`` only passes it where the
+backend supports it. On MySQL any unique key of the table triggers the update,
+so the tables used here must have no unique key besides ``unique_fields`` and
+the auto primary key.
+"""
+from typing import List
+
+from django.db import connections, router
+
+
+def bulk_upsert(model, rows: List, unique_fields: List[str], update_fields: List[str]):
+    alias = router.db_for_write(model)
+    options = {}
+    if connections[alias].features.supports_update_conflicts_with_target:
+        options['unique_fields'] = unique_fields
+    return model.objects.using(alias).bulk_create(
+        rows, update_conflicts=True, update_fields=update_fields, **options
+    )
@@ -1,5 +1,5 @@
 from .views import (
-    HealthView, ApiGameStartView, ApiGameSubmitView, 
+    HealthView, ReadinessView, MetricsView, ApiGameStartView, ApiGameSubmitView, ApiGameHintView,
     ApiLeaderboardView, ApiCertificateView,
     ApiLobbyCreateView, ApiLobbyJoinView, ApiLobbyStatusView, ApiLobbyUpdateView, ApiGetResultsView,
     ApiGameScoreView
@@ -9,8 +9,11 @@ from django.views.decorators.csrf import csrf_exempt
 
 urlpatterns = [
     path('', HealthView.as_view(), name='health'),
+    path('ready', ReadinessView.as_view(), name='ready'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api/game/start', csrf_exempt(ApiGameStartView.as_view()), name='api_game_start'),
     path('api/game/submit', csrf_exempt(ApiGameSubmitView.as_view()), name='api_game_submit'),
+    path('api/game/hint', csrf_exempt(ApiGameHintView.as_view()), name='api_game_hint'),
     path('api/game/score', ApiGameScoreView.as_view(), name='api_game_score'),
     path('api/leaderboard', ApiLeaderboardView.as_view(), name='api_leaderboard'),
     path('api/certificate', ApiCertificateView.as_view(), name='api_certificate'),
@@ -1,24 +1,34 @@
 import json
+import logging
 import re
 import random
-import requests
 import os
-import io
-import wordfreq
 import base64
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+import hmac
 
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.views import View
 from django.utils import timezone
 from django.db.models import Q
 from django.conf import settings
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.db import transaction
-
+from django.db import IntegrityError, transaction
+
+from . import leaderboard, lexicon, lobby_actions, lobby_updates, metrics, provider, readiness, round_tokens
+from .admission import admission
+from .certificate import render_certificate_pdf
+from .db_router import pin_to_primary
+from .last_results import last_results
+from .lobby_engine import lobby_engine
+from .lobby_codes import lobby_codes
+from .lobby_updates import LobbyActionError, LobbyConflict
 from .models import SortonymWord, GameResult, Lobby
+from .recent_words import RecentSet, player_key, recent_words
+from .word_cache import word_cache
+from .word_store import word_store
+
+logger = logging.getLogger(__name__)
 
 SYSTEM_NAME = 'isl'
 REGISTER_ROLE = 'isl_user'
@@ -90,10 +100,9 @@ def _get_player_info(request: HttpRequest) -> dict:
             
             # If we found an email in token, return immediately
             if email != 'guest@sortonym.com':
-                 return {'email': email, 'name': name}
+                 return {'email': email, 'name': name, 'uid': email}
         except Exception as e:
-            print(f"JWT Decode Error: {e}")
-            pass
+            logger.warning('JWT decode error: %s', e)
 
     # 2. Fallback to Request Body
     try:
@@ -144,7 +153,7 @@ def get_words_from_wordfreq(difficulty='easy'):
         random_offset = random.randint(0, max(0, total_available - 200))
         
         slice_start = start + random_offset
-        word_list = wordfreq.top_n_list('en', end)[slice_start:slice_start+150]
+        word_list = lexicon.words_in_range(slice_start, min(end, slice_start + 150))
         
         # Filter for suitable words - very strict for speed
         candidates = [
@@ -152,114 +161,147 @@ def get_words_from_wordfreq(difficulty='easy'):
             if word.isalpha() and 4 <= len(word) <= 8  # Tight length range
         ][:12]  # Increased to 12 candidates
         
-        # Ultra-fast parallel API calls with aggressive timeouts
-        import concurrent.futures
-        
-        def fetch_word_data(word):
-            try:
-                # Extremely fast API calls
-                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                    syn_future = executor.submit(
-                        requests.get, 
-                        f'https://api.datamuse.com/words?rel_syn={word}', 
-                        timeout=0.6
-                    )
-                    ant_future = executor.submit(
-                        requests.get,
-                        f'https://api.datamuse.com/words?rel_ant={word}',
-                        timeout=0.6
-                    )
-                    
-                    syn_res = syn_future.result(timeout=0.8).json()
-                    ant_res = ant_future.result(timeout=0.8).json()
-                
-                syns = [w['word'] for w in syn_res[:15] if w['word'].isalpha() and len(w['word']) > 2]
-                ants = [w['word'] for w in ant_res[:15] if w['word'].isalpha() and len(w['word']) > 2]
-                
-                # Filter out the word itself
-                syns = [w for w in syns if w.lower() != word.lower()]
-                ants = [w for w in ants if w.lower() != word.lower()]
-                
-                if len(syns) >= pairs_needed and len(ants) >= pairs_needed:
-                    return {
-                        'word': word,
-                        'synonyms': ','.join(syns[:12]), # Store up to 12
-                        'antonyms': ','.join(ants[:12])
-                    }
-            except:
-                pass
-            return None
-        
-        # Test all candidates simultaneously for maximum speed
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [executor.submit(fetch_word_data, word) for word in candidates]
+        # Persist answers buffered by earlier requests, then use what we know:
+        # playable words skip the provider, known-bad ones are dropped
+        word_store.flush()
+        ready, candidates = word_store.split_candidates(candidates, pairs_needed)
+        if ready:
+            return random.choice(ready)
+        
+        # Adaptive timeout (p95 of recent provider latency), capped at 0.6s
+        timeout = min(provider.request_timeout(), 0.6)
+        
+        # Look up all candidates at once on the shared provider pool and
+        # return the first one with enough pairs
+        for word, syn_res, ant_res in provider.iter_word_pairs(candidates, timeout, overall_timeout=timeout + 0.4):
+            syns = [w['word'] for w in syn_res[:15] if w['word'].isalpha() and len(w['word']) > 2]
+            ants = [w['word'] for w in ant_res[:15] if w['word'].isalpha() and len(w['word']) > 2]
             
-            # Return first successful result immediately
-            for future in concurrent.futures.as_completed(futures, timeout=1):
-                result = future.result()
-                if result:
-                    return result
+            # Filter out the word itself
+            syns = [w for w in syns if w.lower() != word.lower()]
+            ants = [w for w in ants if w.lower() != word.lower()]
+            word_store.record(word, syns, ants)
+            
+            if len(syns) >= pairs_needed and len(ants) >= pairs_needed:
+                return {
+                    'word': word,
+                    'synonyms': ','.join(syns[:12]), # Store up to 12
+                    'antonyms': ','.join(ants[:12])
+                }
         
         return None
         
     except Exception as e:
-        print(f"Word selection failed: {e}")
+        logger.warning('Word selection failed: %s', e)
         return None
 
 class HealthView(View):
+    """Liveness: the process answers. Kept free of DB and cache work."""
     def get(self, request: HttpRequest) -> JsonResponse:
         return JsonResponse({'status': 'ok'})
 
+class ReadinessView(View):
+    """Readiness: 503 until the worker can serve a game start from memory."""
+    def get(self, request: HttpRequest) -> JsonResponse:
+        ready, details = readiness.check()
+        return JsonResponse({'status': 'ready' if ready else 'starting', **details}, status=200 if ready else 503)
+
+def _metrics_allowed(request: HttpRequest) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    auth_header = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(auth_header.encode(), f'Bearer {token}'.encode()):
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint for this worker's metrics (allow-listed, see settings)."""
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not _metrics_allowed(request):
+            return HttpResponse(status=404)
+        return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class ApiCertificateView(View):
     def get(self, request: HttpRequest) -> JsonResponse:
         player_name = request.GET.get('name', 'Player')
         score = request.GET.get('score', '0')
         level = request.GET.get('level', 'N/A')
         
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        
-        # Simple Certificate Design
-        p.setFont("Helvetica-Bold", 30)
-        p.drawCentredString(300, 700, "CERTIFICATE OF ACHIEVEMENT")
-        
-        p.setFont("Helvetica", 18)
-        p.drawCentredString(300, 650, "This is to certify that")
-        
-        p.setFont("Helvetica-Bold", 24)
-        p.drawCentredString(300, 600, player_name.upper())
-        
-        p.setFont("Helvetica", 18)
-        p.drawCentredString(300, 550, f"has successfully completed the Sortonym Challenge")
-        p.drawCentredString(300, 520, f"Difficulty: {level.capitalize()}")
-        p.drawCentredString(300, 490, f"Final Score: {score}")
-        
-        p.setFont("Helvetica-Oblique", 14)
-        p.drawCentredString(300, 400, f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}")
-        
-        p.showPage()
-        p.save()
-        
-        buffer.seek(0)
-        pdf_base64 = base64.b64encode(buffer.read()).decode('utf-8')
+        pdf_bytes = render_certificate_pdf(player_name, score, level)
+        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
         
         return JsonResponse({'certificate_base64': pdf_base64})
 
 
 LEVEL_CONFIG = {
-    'easy': {'time': 90, 'pairs': 3, 'multiplier': 1.0},
-    'medium': {'time': 60, 'pairs': 4, 'multiplier': 1.2},
-    'hard': {'time': 45, 'pairs': 5, 'multiplier': 1.5},
+    'easy': {'time': 90, 'pairs': 3, 'multiplier': 1.0, 'hints': 3},
+    'medium': {'time': 60, 'pairs': 4, 'multiplier': 1.2, 'hints': 2},
+    'hard': {'time': 45, 'pairs': 5, 'multiplier': 1.5, 'hints': 1},
 }
 
 
+def _score_round(true_syns, true_ants, synonym_ids, antonym_ids, time_taken, config) -> dict:
+    """Score one submitted round against the sets of correct synonyms/antonyms."""
+    def extract_word(wid):
+        if '_' in wid:
+            return wid.split('_', 1)[1]
+        return wid
+
+    # Each word counts once, however often it was submitted
+    submitted_syns = {extract_word(str(wid)).strip().lower() for wid in synonym_ids}
+    submitted_ants = {extract_word(str(wid)).strip().lower() for wid in antonym_ids}
+    correct_count = len(submitted_syns & true_syns) + len(submitted_ants & true_ants)
+    
+    base_scores_val = correct_count * 1.0
+    total_expected = config['pairs'] * 2
+    total_expected = max(total_expected, 1)
+
+    time_limit = config['time']
+    remaining = max(0, time_limit - time_taken)
+    
+    time_bonus = (remaining * 0.1) * (correct_count / float(total_expected))
+    
+    subtotal = base_scores_val + time_bonus
+    total_score = subtotal * config['multiplier']
+
+    return {
+        'score': total_score,
+        'base_score': base_scores_val,
+        'time_bonus': time_bonus,
+        'total_correct': correct_count,
+        'max_score': (total_expected + 30) * config['multiplier']
+    }
+
+
+def _pick_local_word(level, exclude_words: RecentSet):
+    """Pick a playable word without calling the provider: word cache first, then the DB."""
+    cached = [w for w in word_cache.peek_cached_words(level) if w['word'] not in exclude_words]
+    if cached:
+        choice = random.choice(cached)
+        try:
+            word_obj, _ = SortonymWord.objects.get_or_create(
+                word=choice['word'],
+                defaults={'synonyms': choice['synonyms'], 'antonyms': choice['antonyms']}
+            )
+            return word_obj
+        except Exception as e:
+            logger.error('Error saving cached word: %s', e)
+
+    known = SortonymWord.objects.exclude(word__in=exclude_words.words).exclude(synonyms='').exclude(antonyms='')
+    total = known.count()
+    if total:
+        return known.order_by('id')[random.randrange(total)]
+    return None
+
+
 class ApiGameStartView(View):
     def post(self, request: HttpRequest) -> JsonResponse:
         player_info = _get_player_info(request)
         
         payload = _json_body(request)
         level = (payload.get('level') or 'easy').lower()
-        exclude_words = payload.get('excludeWords', [])  # Get excluded words list
+        recent_player = player_key(request, player_info)
+        exclude_words = recent_words.get(recent_player)
         
         # DAILY CHALLENGE VALIDATION
         if level == 'daily':
@@ -282,6 +324,9 @@ class ApiGameStartView(View):
         # Try to get a unique word that's not in the exclude list
         max_attempts = 5
         for attempt in range(max_attempts):
+            # Provider circuit open: skip straight to local sources
+            if not provider.is_available():
+                break
             dynamic_data = get_words_from_wordfreq(level)
             
             if dynamic_data and dynamic_data['word'] not in exclude_words:
@@ -300,16 +345,21 @@ class ApiGameStartView(View):
                          word_obj.save()
                     break  # Success, exit the loop
                 except Exception as e:
-                    print(f"Error saving dynamic word: {e}")
+                    logger.error('Error saving dynamic word: %s', e)
                     word_obj = None
                     continue  # Try next attempt
         
+        # Provider down or no luck: serve a word we already know
+        if not word_obj:
+            word_obj = _pick_local_word(level, exclude_words)
+
         # If wordfreq fails or save fails, use fallback words (also check exclude list)
         if not word_obj:
+            # History outlives a session, so it can cover every fallback: repeat one then
             available_fallbacks = [
                 fallback for fallback in FALLBACK_WORDS_LIST 
                 if fallback['word'] not in exclude_words
-            ]
+            ] or FALLBACK_WORDS_LIST
             
             if available_fallbacks:
                 fallback = random.choice(available_fallbacks)
@@ -322,12 +372,14 @@ class ApiGameStartView(View):
                         }
                     )
                 except Exception as e:
-                    print(f"Error saving fallback word: {e}")
+                    logger.error('Error saving fallback word: %s', e)
                     return JsonResponse({'error': 'Database error initializing game'}, status=500)
             else:
-                # All fallback words are excluded, return error
+                # No fallback words configured
                 return JsonResponse({'error': 'No available words for this round'}, status=500)
 
+        recent_words.record(recent_player, word_obj.word, exclude_words)
+
         # Parse synonyms/antonyms
         all_syns = [s.strip() for s in word_obj.synonyms.split(',') if s.strip()]
         all_ants = [a.strip() for a in word_obj.antonyms.split(',') if a.strip()]
@@ -343,16 +395,19 @@ class ApiGameStartView(View):
         start_syns = random.sample(all_syns, safe_pairs)
         start_ants = random.sample(all_ants, safe_pairs)
 
-        game_words = []
-        for w in start_syns:
-            game_words.append({'id': f'syn_{w}', 'word': w})
-        for w in start_ants:
-            game_words.append({'id': f'ant_{w}', 'word': w})
+        round_words = [(w, round_tokens.SYNONYM) for w in start_syns] + [(w, round_tokens.ANTONYM) for w in start_ants]
+        random.shuffle(round_words)
 
-        random.shuffle(game_words)
+        # Prefixed ids would reveal the answer; hints come from /api/game/hint
+        opaque_ids = getattr(settings, 'ROUND_TOKEN_OPAQUE_IDS', True)
+        game_words = [
+            {'id': f'w{i}' if opaque_ids else f'{category}_{w}', 'word': w}
+            for i, (w, category) in enumerate(round_words)
+        ]
 
         return JsonResponse({
             'round_id': word_obj.id,
+            'round_token': round_tokens.issue(word_obj.id, level, round_words),
             'anchor_word': word_obj.word,
             'words': game_words,
             'time_limit': config['time'],
@@ -367,55 +422,41 @@ class ApiGameSubmitView(View):
         player_name = player_info['name']
         
         payload = _json_body(request)
-        round_id = payload.get('roundId')
         synonym_ids = payload.get('synonyms', [])
         antonym_ids = payload.get('antonyms', [])
         time_taken = float(payload.get('timeTaken') or 0)
         level = (payload.get('level') or 'easy').lower()
+        round_token = payload.get('roundToken')
+
+        # Everything needed to score is in the signed token; no word lookup
+        if not round_token:
+            return JsonResponse({'error': 'Missing round token'}, status=400)
+        try:
+            claims = round_tokens.verify(round_token)
+        except round_tokens.InvalidRoundToken as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        round_id = claims.round_id
+        level = claims.level
+        synonym_ids = claims.resolve(synonym_ids)
+        antonym_ids = claims.resolve(antonym_ids)
+        # The client may only report more time than the server measured,
+        # less a grace for the network round trip and rendering
+        grace = float(getattr(settings, 'ROUND_TOKEN_CLOCK_GRACE', 3))
+        time_taken = max(time_taken, claims.elapsed - grace, 0.0)
+        true_syns, true_ants = claims.synonyms, claims.antonyms
 
         if level not in LEVEL_CONFIG:
             level = 'easy'
         config = LEVEL_CONFIG[level]
-        
-        try:
-            word_obj = SortonymWord.objects.get(id=round_id)
-        except SortonymWord.DoesNotExist:
-            return JsonResponse({'error': 'Invalid round ID'}, status=400)
 
-        true_syns = set(s.strip().lower() for s in word_obj.synonyms.split(','))
-        true_ants = set(a.strip().lower() for a in word_obj.antonyms.split(','))
-
-        correct_count = 0
-        
-        def extract_word(wid):
-            if '_' in wid:
-                return wid.split('_', 1)[1]
-            return wid
-
-        for wid in synonym_ids:
-            w = extract_word(wid).strip().lower()
-            if w in true_syns:
-                correct_count += 1
-                
-        for wid in antonym_ids:
-            w = extract_word(wid).strip().lower()
-            if w in true_ants:
-                correct_count += 1
-        
-        base_scores_val = correct_count * 1.0
-        total_expected = config['pairs'] * 2
-        total_expected = max(total_expected, 1)
-
-        time_limit = config['time']
-        remaining = max(0, time_limit - time_taken)
-        
-        time_bonus = (remaining * 0.1) * (correct_count / float(total_expected))
-        
-        subtotal = base_scores_val + time_bonus
-        total_score = subtotal * config['multiplier']
+        scored = _score_round(true_syns, true_ants, synonym_ids, antonym_ids, time_taken, config)
+        # The round is over, so the client may now show which words were right
+        scored['answers'] = {'synonyms': sorted(true_syns), 'antonyms': sorted(true_ants)}
+        correct_count = scored['total_correct']
+        total_score = scored['score']
         
         # Save Result
-        GameResult.objects.create(
+        result = GameResult.objects.create(
             player_email=email,
             player_name=player_name,
             round_id=round_id,
@@ -423,84 +464,61 @@ class ApiGameSubmitView(View):
             total_correct=correct_count,
             time_taken=time_taken
         )
+        last_results.record(email, result)
+        leaderboard.invalidate()
 
         # Multiplayer Sync
         game_code = (payload.get('gameCode') or '').strip().upper()
         if game_code:
-            try:
-                with transaction.atomic():
-                    lobby = Lobby.objects.select_for_update().get(code=game_code)
-                    results = list(lobby.results_data)
-                    
-                    # Identify player's team from players_data using unique uid
-                    user_id = player_info['uid']
-                    player_data = next((p for p in lobby.players_data if p['id'] == user_id), None)
-                    
-                    # If player not found in lobby players_data, they shouldn't be submitting to this lobby
-                    if not player_data:
-                        print(f"Warning: Submission from UID {user_id} not found in lobby {game_code}")
-                        selected_team = payload.get('team', 'A') 
-                    else:
-                        selected_team = player_data.get('team', 'A')
-                    
-                    results.append({
-                        'player': player_name,
-                        'player_email': email,
-                        'player_id': user_id,
-                        'team': selected_team,
-                        'score': total_score,
-                        'total_correct': correct_count,
-                        'time_taken': time_taken,
-                        'timestamp': timezone.now().isoformat()
-                    })
-                    lobby.results_data = results
-                    lobby.save()
-            except Lobby.DoesNotExist:
-                pass
+            lobby_result = {
+                'player': player_name,
+                'player_email': email,
+                'player_id': player_info['uid'],
+                'score': total_score,
+                'total_correct': correct_count,
+                'time_taken': time_taken,
+                'timestamp': timezone.now().isoformat()
+            }
+            fallback_team = payload.get('team', 'A')
+            if lobby_engine.enabled():
+                try:
+                    lobby_engine.apply(game_code, 'submit_result', _get_lobby_response,
+                                       result=lobby_result, fallback_team=fallback_team)
+                except Lobby.DoesNotExist:
+                    pass
+            else:
+                lobby = Lobby.objects.filter(code=game_code).only('code', 'players_data').first()
+                if lobby is not None:
+                    # Appended in place: concurrent submissions don't conflict
+                    lobby_updates.append_result(
+                        game_code, lobby_actions.result_entry(lobby, lobby_result, fallback_team)
+                    )
         
-        return JsonResponse({
-            'score': total_score,
-            'base_score': base_scores_val,
-            'time_bonus': time_bonus,
-            'total_correct': correct_count,
-            'max_score': (total_expected + 30) * config['multiplier']
-        })
+        return JsonResponse(scored)
+
+
+class ApiGameHintView(View):
+    def post(self, request: HttpRequest) -> JsonResponse:
+        payload = _json_body(request)
+        try:
+            claims = round_tokens.verify(payload.get('roundToken') or '', single_use=False)
+        except round_tokens.InvalidRoundToken as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        index = claims.index_of(payload.get('id') or '')
+        if index < 0:
+            return JsonResponse({'error': 'Unknown word id'}, status=400)
+
+        limit = LEVEL_CONFIG.get(claims.level, LEVEL_CONFIG['hard'])['hints']
+        try:
+            category, hints_left = round_tokens.take_hint(claims, index, limit)
+        except round_tokens.InvalidRoundToken as e:
+            return JsonResponse({'error': str(e)}, status=403)
+        return JsonResponse({'id': f'w{index}', 'category': category, 'hints_left': hints_left})
 
 
 class ApiLeaderboardView(View):
     def get(self, request: HttpRequest) -> JsonResponse:
-        # Get top scores ordered by score descending
-        # Fetching a larger limit (100) to ensure we can find 20 unique players
-        
-        period = request.GET.get('period')
-        query = GameResult.objects.all()
-
-        if period == 'today':
-            query = query.filter(created_at__date=timezone.now().date())
-            
-        top_scores = query.order_by('-score')[:100]
-        
-        data = []
-        seen_emails = set()
-        
-        for res in top_scores:
-            if res.player_email in seen_emails:
-                continue
-                
-            seen_emails.add(res.player_email)
-            data.append({
-                'player_email': res.player_email,
-                'player_name': res.player_name or res.player_email.split('@')[0],
-                'score': res.score,
-                'total_correct': res.total_correct,
-                'time_taken': res.time_taken,
-                'date': res.created_at.strftime('%Y-%m-%d %H:%M')
-            })
-            
-            if len(data) >= 20:
-                break
-            
-        return JsonResponse({'leaderboard': data})
+        return JsonResponse({'leaderboard': leaderboard.get(request.GET.get('period'))})
 
 
 class ApiGoogleLoginView(View):
@@ -516,13 +534,7 @@ class ApiGoogleLoginView(View):
 class ApiLobbyCreateView(View):
     def post(self, request: HttpRequest) -> JsonResponse:
         try:
-            print("ApiLobbyCreateView: POST received")
-            try:
-                player_info = _get_player_info(request)
-                print(f"Player info parsed: {player_info}")
-            except Exception as e:
-                print(f"Error in _get_player_info: {e}")
-                raise e
+            player_info = _get_player_info(request)
 
             user_email = player_info['email']
             user_name = player_info['name']
@@ -531,28 +543,32 @@ class ApiLobbyCreateView(View):
             payload = _json_body(request)
             team_name = payload.get('teamName', 'Team A')
             
-            # Generate Code
-            code = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', k=6))
-            print(f"Generated lobby code: {code}")
-            
-            # Init Lobby
-            lobby = Lobby.objects.create(
-                code=code,
-                host_email=user_id, # Store unique ID as host identifier
-                host_name=user_name,
-                settings={'team_name': team_name, 'difficulty': 'MEDIUM'},
-                players_data=[{
-                    'id': user_id,
-                    'name': user_name,
-                    'team': None, # Host must also select team manually
-                    'isHost': True
-                }]
-            )
-            print("Lobby created successfully")
+            # Allocated codes never repeat; the retry only covers a clash
+            # with a lobby created before the allocator existed.
+            for attempt in range(3):
+                code = lobby_codes.allocate()
+                try:
+                    with transaction.atomic():
+                        lobby = Lobby.objects.create(
+                            code=code,
+                            host_email=user_id, # Store unique ID as host identifier
+                            host_name=user_name,
+                            settings={'team_name': team_name, 'difficulty': 'MEDIUM'},
+                            players_data=[{
+                                'id': user_id,
+                                'name': user_name,
+                                'team': None, # Host must also select team manually
+                                'isHost': True
+                            }]
+                        )
+                    break
+                except IntegrityError:
+                    logger.warning('Lobby code %s already in use (attempt %d)', code, attempt + 1)
+            else:
+                return JsonResponse({'error': 'Could not allocate a lobby code, please retry'}, status=503)
+            logger.info('Lobby %s created by %s', code, user_id)
         except Exception as e:
-            print(f"ApiLobbyCreateView ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Lobby creation failed')
             return JsonResponse({'error': f'Internal Server Error: {str(e)}'}, status=500)
         
         return JsonResponse({
@@ -582,18 +598,7 @@ def _get_lobby_response(lobby):
                 teams[team_id] = []
             teams[team_id].append(p)
     
-    # 2. Identify all players who have been assigned to ANY team
-    active_pids = [p.get('id') for p in players if p.get('team') is not None]
-    
-    # 3. Calculate completion map from actual submissions
-    comp_map = {}
-    for r in lobby.results_data:
-        pid = r.get('player_id') or r.get('player_email')
-        if pid:
-            comp_map[pid] = comp_map.get(pid, 0) + 1
-            
-    # 4. Global synchronization: Everyone assigned to a team must finish 5 rounds
-    all_finished = len(active_pids) > 0 and all(comp_map.get(pid, 0) >= 5 for pid in active_pids)
+    all_finished = lobby_actions.all_players_finished(lobby)
     
     return {
         'code': lobby.code,
@@ -609,6 +614,20 @@ def _get_lobby_response(lobby):
         'all_finished': all_finished
     }
 
+def _lobby_json(data: dict, updated_at=None) -> JsonResponse:
+    """A lobby response plus how long the client should wait before polling again."""
+    next_poll_ms = admission.next_poll_ms(data['status'], data['all_finished'], updated_at)
+    return JsonResponse({**data, 'next_poll_ms': next_poll_ms})
+
+
+def _lobby_error(e):
+    if isinstance(e, Lobby.DoesNotExist):
+        return JsonResponse({'error': 'Lobby not found'}, status=404)
+    if isinstance(e, LobbyActionError):
+        return JsonResponse({'error': e.message}, status=e.status)
+    return JsonResponse({'error': str(e)}, status=409)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class ApiLobbyJoinView(View):
     def post(self, request: HttpRequest) -> JsonResponse:
@@ -622,51 +641,28 @@ class ApiLobbyJoinView(View):
         
         if not display_name:
              return JsonResponse({'error': 'Name is required'}, status=400)
-        
+
+        player = {'player_id': user_id, 'name': display_name, 'picture': player_info.get('picture')}
         try:
-            with transaction.atomic():
-                lobby = Lobby.objects.select_for_update().get(code=code)
-                
-                # Check Name Duplication (Case insensitive)
-                players = list(lobby.players_data)
-                for p in players:
-                    # If names match but IDs differ, it's a duplicate
-                    if p['name'].lower() == display_name.lower() and p['id'] != user_id:
-                        return JsonResponse({'error': f'Name "{display_name}" is already taken'}, status=400)
-                
-                # Add player if not exists
-                existing_player = next((p for p in players if p['id'] == user_id), None)
-                if not existing_player:
-                    players.append({
-                        'id': user_id,
-                        'name': display_name,
-                        'team': None, # Default to None (Unassigned) - User MUST select team
-                        'isHost': False,
-                        'picture': player_info.get('picture')
-                    })
-                    lobby.players_data = players
-                    lobby.save()
-                else:
-                    # Update name if changed?
-                    if existing_player['name'] != display_name:
-                        existing_player['name'] = display_name
-                        lobby.players_data = players
-                        lobby.save()
-                
-                return JsonResponse(_get_lobby_response(lobby))
-        except Lobby.DoesNotExist:
-            return JsonResponse({'error': 'Lobby not found'}, status=404)
+            if lobby_engine.enabled():
+                return _lobby_json(lobby_engine.apply(code, 'join', _get_lobby_response, **player), lobby_engine.updated_at(code))
+            lobby = lobby_updates.mutate(code, 'join', lambda lobby: lobby_actions.join(lobby, **player))
+        except (Lobby.DoesNotExist, LobbyActionError, LobbyConflict) as e:
+            return _lobby_error(e)
+        return _lobby_json(_get_lobby_response(lobby), lobby.updated_at)
 
 
 class ApiLobbyStatusView(View):
     def get(self, request: HttpRequest) -> JsonResponse:
         code = request.GET.get('code', '').upper().strip()
         try:
+            if lobby_engine.enabled():
+                return _lobby_json(lobby_engine.status(code, _get_lobby_response), lobby_engine.updated_at(code))
             lobby = Lobby.objects.get(code=code)
         except Lobby.DoesNotExist:
             return JsonResponse({'error': 'Lobby not found'}, status=404)
             
-        return JsonResponse(_get_lobby_response(lobby))
+        return _lobby_json(_get_lobby_response(lobby), lobby.updated_at)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -678,76 +674,58 @@ class ApiLobbyUpdateView(View):
         payload = _json_body(request)
         code = (payload.get('code') or '').upper().strip()
         action = payload.get('action') 
-        
+
+        kwargs = {'player_id': user_id}
+        if action == 'join_team':
+            kwargs['team'] = payload.get('team') # Can be 'A', 'B', '1', '2' ... '22'
+        elif action == 'set_difficulty':
+            kwargs['difficulty'] = payload.get('difficulty')
+        elif action not in lobby_actions.ACTIONS or action in ('join', 'submit_result'):
+            action, kwargs = None, {}
+
         try:
-            with transaction.atomic():
-                lobby = Lobby.objects.select_for_update().get(code=code)
-                
-                if action == 'join_team':
-                    team = payload.get('team') # Can be 'A', 'B', '1', '2' ... '22'
-                    if not team:
-                        return JsonResponse({'error': 'Team name is required'}, status=400)
-                    
-                    players = list(lobby.players_data)
-                    found = False
-                    for p in players:
-                        if p['id'] == user_id:
-                            p['team'] = team
-                            found = True
-                            break
-                    
-                    if not found:
-                         return JsonResponse({'error': 'Player not in lobby'}, status=403)
-                         
-                    lobby.players_data = players
-                    lobby.save()
-                    
-                elif action == 'leave_team':
-                    players = list(lobby.players_data)
-                    for p in players:
-                        if p['id'] == user_id:
-                            p['team'] = None # Reset to unassigned
-                            break
-                    lobby.players_data = players
-                    lobby.save()
-
-                elif action == 'set_difficulty':
-                    if lobby.host_email != user_id:
-                        return JsonResponse({'error': 'Only host can change difficulty'}, status=403)
-                    s = lobby.settings
-                    s['difficulty'] = payload.get('difficulty')
-                    lobby.settings = s
-                    lobby.save()
-
-                elif action == 'start_game':
-                    if lobby.host_email != user_id:
-                        return JsonResponse({'error': 'Only host can start game'}, status=403)
-                    
-                    # Dynamic Team Validation
-                    assigned_teams = set(p.get('team') for p in lobby.players_data if p.get('team'))
-                    unassigned_count = sum(1 for p in lobby.players_data if not p.get('team'))
-                    
-                    if len(assigned_teams) < 2:
-                        return JsonResponse({'error': 'At least two teams are required to start the game'}, status=400)
-                    
-                    if unassigned_count > 0:
-                         return JsonResponse({'error': f'All {unassigned_count} players must select a team'}, status=400)
-
-                    lobby.status = 'STARTED'
-                    lobby.results_data = [] # Critical for synchronization
-                    lobby.save()
-                
-                return JsonResponse(_get_lobby_response(lobby))
+            if lobby_engine.enabled():
+                if action is None:
+                    return _lobby_json(lobby_engine.status(code, _get_lobby_response), lobby_engine.updated_at(code))
+                return _lobby_json(lobby_engine.apply(code, action, _get_lobby_response, **kwargs), lobby_engine.updated_at(code))
+
+            if action == 'start_game':
+                # Validates against every player, so it must see a consistent lobby
+                lobby = lobby_updates.mutate(code, action, lambda lobby: lobby_actions.start_game(lobby, user_id))
+            else:
+                pin_to_primary()
+                lobby = Lobby.objects.get(code=code)
 
-        except Lobby.DoesNotExist:
-            return JsonResponse({'error': 'Lobby not found'}, status=404)
+            if action == 'join_team':
+                if not kwargs['team']:
+                    return JsonResponse({'error': 'Team name is required'}, status=400)
+
+                lobby = lobby_updates.set_player_team(lobby, user_id, kwargs['team'], action)
+                if lobby is None:
+                    return JsonResponse({'error': 'Player not in lobby'}, status=403)
+
+            elif action == 'leave_team':
+                # Reset to unassigned; leaving when not in the lobby is a no-op
+                lobby = lobby_updates.set_player_team(lobby, user_id, None, action) or lobby
+
+            elif action == 'set_difficulty':
+                if lobby.host_email != user_id:
+                    return JsonResponse({'error': 'Only host can change difficulty'}, status=403)
+                lobby = lobby_updates.set_setting(lobby, 'difficulty', kwargs['difficulty'], action)
+
+            return _lobby_json(_get_lobby_response(lobby), lobby.updated_at)
+
+        except (Lobby.DoesNotExist, LobbyActionError, LobbyConflict) as e:
+            return _lobby_error(e)
 
 #get results Api
 class ApiGetResultsView(View):
     def get(self, request: HttpRequest, code) -> JsonResponse:
         try:
+            if lobby_engine.enabled():
+                return _lobby_json(lobby_engine.status(code, _get_lobby_response), lobby_engine.updated_at(code))
             lobby = Lobby.objects.get(code=code)
-            return JsonResponse(_get_lobby_response(lobby))
+            return _lobby_json(_get_lobby_response(lobby), lobby.updated_at)
         except Lobby.DoesNotExist:
             return JsonResponse({'error': 'Lobby not found'}, status=404)
 
@@ -757,13 +735,13 @@ class ApiGameScoreView(View):
         player_info = _get_player_info(request)
         email = player_info['email']
         
-        last_result = GameResult.objects.filter(player_email=email).order_by('-created_at').first()
+        last_result = last_results.get(email)
         if not last_result:
             return JsonResponse({'error': 'No scores found'}, status=404)
             
         return JsonResponse({
-            'score': last_result.score,
-            'total_correct': last_result.total_correct,
-            'time_taken': last_result.time_taken,
-            'created_at': last_result.created_at
+            'score': last_result['score'],
+            'total_correct': last_result['total_correct'],
+            'time_taken': last_result['time_taken'],
+            'created_at': last_result['created_at']
         })
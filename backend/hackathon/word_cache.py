@@ -1,12 +1,18 @@
 import json
+import logging
 import time
 import random
 import threading
 from typing import Dict, List, Optional
 from django.core.cache import cache
 from django.conf import settings
-import requests
-import wordfreq
+
+from . import lexicon, metrics, provider
+from .cache_snapshot import cache_snapshot
+from .singleflight import SingleFlight
+from .word_store import word_store
+
+logger = logging.getLogger(__name__)
 
 class WordCache:
     """
@@ -16,10 +22,12 @@ class WordCache:
     
     CACHE_TIMEOUT = 86400  # 24 hours
     PREPOPULATE_COUNT = 100  # Number of words to pre-populate per difficulty
+    LOW_WATERMARK = PREPOPULATE_COUNT // 2  # Below this a pool is repopulated
     LOCK_TIMEOUT = 30  # Seconds
     
     def __init__(self):
         self._lock = threading.Lock()
+        self._populate_flight = SingleFlight('word_cache_populate')
         self._cache_key_prefix = "word_cache_"
         self._difficulty_keys = {
             'easy': f"{self._cache_key_prefix}easy",
@@ -30,46 +38,25 @@ class WordCache:
     def _get_cache_key(self, difficulty: str) -> str:
         return self._difficulty_keys.get(difficulty, self._difficulty_keys['easy'])
     
-    def _fetch_word_data(self, word: str) -> Optional[Dict]:
-        """Fetch synonyms and antonyms for a single word with optimized API calls."""
-        try:
-            # Make parallel requests to Datamuse API
-            import concurrent.futures
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                syn_future = executor.submit(
-                    requests.get, 
-                    f'https://api.datamuse.com/words?rel_syn={word}', 
-                    timeout=3
-                )
-                ant_future = executor.submit(
-                    requests.get,
-                    f'https://api.datamuse.com/words?rel_ant={word}',
-                    timeout=3
-                )
-                
-                syn_res = syn_future.result().json()
-                ant_res = ant_future.result().json()
-            
-            # Filter and process results
-            syns = [w['word'] for w in syn_res if w['word'].isalpha() and len(w['word']) > 2]
-            ants = [w['word'] for w in ant_res if w['word'].isalpha() and len(w['word']) > 2]
-            
-            # Filter out the anchor word itself
-            syns = [w for w in syns if w.lower() != word.lower()]
-            ants = [w for w in ants if w.lower() != word.lower()]
-            
-            # Ensure minimum quality threshold
-            if len(syns) >= 3 and len(ants) >= 3:
-                return {
-                    'word': word,
-                    'synonyms': ','.join(syns[:12]),
-                    'antonyms': ','.join(ants[:12]),
-                    'cached_at': time.time()
-                }
-        except Exception as e:
-            print(f"Error fetching word data for {word}: {e}")
+    def _build_word_data(self, word: str, syn_res: list, ant_res: list) -> Optional[Dict]:
+        """Turn raw provider answers for a word into cacheable word data."""
+        # Filter and process results
+        syns = [w['word'] for w in syn_res if w['word'].isalpha() and len(w['word']) > 2]
+        ants = [w['word'] for w in ant_res if w['word'].isalpha() and len(w['word']) > 2]
         
+        # Filter out the anchor word itself
+        syns = [w for w in syns if w.lower() != word.lower()]
+        ants = [w for w in ants if w.lower() != word.lower()]
+        word_store.record(word, syns, ants)
+        
+        # Ensure minimum quality threshold
+        if len(syns) >= 3 and len(ants) >= 3:
+            return {
+                'word': word,
+                'synonyms': ','.join(syns[:12]),
+                'antonyms': ','.join(ants[:12]),
+                'cached_at': time.time()
+            }
         return None
     
     def _get_words_from_wordfreq(self, difficulty: str, count: int = 50) -> List[str]:
@@ -85,14 +72,14 @@ class WordCache:
             start, end = 10000, 25000
         
         try:
-            pool = wordfreq.top_n_list('en', end)[start:]
+            pool = lexicon.words_in_range(start, end)
             filtered_pool = [
                 w for w in pool 
                 if w.isalpha() and len(w) > 3
             ]
             return random.sample(filtered_pool, min(count, len(filtered_pool)))
         except Exception as e:
-            print(f"Error getting words from wordfreq: {e}")
+            logger.error('Error getting words from wordfreq: %s', e)
             return []
     
     def _populate_difficulty_cache(self, difficulty: str):
@@ -101,37 +88,35 @@ class WordCache:
         
         # Check if already populated
         cached_data = cache.get(cache_key)
-        if cached_data and len(cached_data) >= self.PREPOPULATE_COUNT // 2:
+        if cached_data and len(cached_data) >= self.LOW_WATERMARK:
             return
         
-        # Get candidate words
+        # Get candidate words; stored answers are reused, known-bad words skipped
         candidate_words = self._get_words_from_wordfreq(difficulty, self.PREPOPULATE_COUNT * 2)
+        valid_words, candidate_words = word_store.split_candidates(candidate_words, word_store.MIN_PAIRS)
+        for word_data in valid_words:
+            word_data['cached_at'] = time.time()
+        valid_words = valid_words[:self.PREPOPULATE_COUNT]
         
-        # Fetch word data in parallel
-        valid_words = []
-        import concurrent.futures
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_word = {
-                executor.submit(self._fetch_word_data, word): word 
-                for word in candidate_words[:self.PREPOPULATE_COUNT]
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_word, timeout=30):
-                try:
-                    word_data = future.result()
+        # Fetch the rest in parallel on the shared provider pool. With the circuit
+        # open those fetches would all fail, so the pool fills from stored answers only
+        to_fetch = candidate_words[:self.PREPOPULATE_COUNT - len(valid_words)]
+        if to_fetch and provider.is_available():
+            try:
+                for word, syn_res, ant_res in provider.iter_word_pairs(to_fetch, overall_timeout=30):
+                    word_data = self._build_word_data(word, syn_res, ant_res)
                     if word_data:
                         valid_words.append(word_data)
                         if len(valid_words) >= self.PREPOPULATE_COUNT:
                             break
-                except Exception as e:
-                    word = future_to_word[future]
-                    print(f"Error processing {word}: {e}")
+            except TimeoutError:
+                logger.warning('Timed out populating %s cache after %d words', difficulty, len(valid_words))
+        word_store.flush()
         
         # Update cache
         if valid_words:
             cache.set(cache_key, valid_words, self.CACHE_TIMEOUT)
-            print(f"Populated {len(valid_words)} words for {difficulty} difficulty")
+            logger.info('Populated %d words for %s difficulty', len(valid_words), difficulty)
     
     def get_cached_word(self, difficulty: str) -> Optional[Dict]:
         """Get a random word from cache, populating cache if necessary."""
@@ -139,15 +124,12 @@ class WordCache:
         
         # Try to get from cache first
         cached_words = cache.get(cache_key)
+        metrics.WORD_CACHE_REQUESTS.inc(difficulty=difficulty, result='hit' if cached_words else 'miss')
         
         if not cached_words:
-            # Cache is empty, populate it
-            with threading.Lock():
-                # Double-check after acquiring lock
-                cached_words = cache.get(cache_key)
-                if not cached_words:
-                    self._populate_difficulty_cache(difficulty)
-                    cached_words = cache.get(cache_key)
+            # Cache is empty, populate it once; concurrent callers wait on that run
+            self._populate_flight.do(difficulty, self._populate_difficulty_cache, difficulty)
+            cached_words = cache.get(cache_key)
         
         if cached_words and len(cached_words) > 0:
             # Return a random word from cache
@@ -155,6 +137,12 @@ class WordCache:
         
         return None
     
+    def peek_cached_words(self, difficulty: str) -> List[Dict]:
+        """Return cached words for a difficulty without triggering a populate."""
+        if difficulty not in self._difficulty_keys:
+            difficulty = 'hard' if difficulty == 'daily' else 'easy'
+        return cache.get(self._get_cache_key(difficulty)) or []
+    
     def add_word_to_cache(self, word_data: Dict, difficulty: str):
         """Add a new word to the cache."""
         cache_key = self._get_cache_key(difficulty)
@@ -167,13 +155,36 @@ class WordCache:
     
     def warm_up_cache(self):
         """Warm up cache for all difficulty levels. Call this on server startup."""
-        print("Warming up word cache...")
+        logger.info('Warming up word cache...')
         for difficulty in ['easy', 'medium', 'hard']:
             try:
                 self._populate_difficulty_cache(difficulty)
             except Exception as e:
-                print(f"Error warming up {difficulty} cache: {e}")
-        print("Word cache warm-up complete")
+                logger.error('Error warming up %s cache: %s', difficulty, e)
+        logger.info('Word cache warm-up complete')
+
+    def pool_sizes(self) -> Dict[str, int]:
+        """Cached words per difficulty (no populate)."""
+        return {difficulty: len(cache.get(key) or []) for difficulty, key in self._difficulty_keys.items()}
+
+    def snapshot_keys(self) -> List[str]:
+        return list(self._difficulty_keys.values())
+
+    def revalidate(self):
+        """Drop expired words (e.g. from a restored snapshot) and top up thin pools."""
+        now = time.time()
+        for difficulty, cache_key in self._difficulty_keys.items():
+            cached_words = cache.get(cache_key) or []
+            fresh = [w for w in cached_words if now - w.get('cached_at', 0) < self.CACHE_TIMEOUT]
+            if len(fresh) != len(cached_words):
+                if fresh:
+                    cache.set(cache_key, fresh, self.CACHE_TIMEOUT)
+                else:
+                    cache.delete(cache_key)
+            self._populate_flight.do(difficulty, self._populate_difficulty_cache, difficulty)
 
 # Global instance
 word_cache = WordCache()
+cache_snapshot.register(
+    'word_pools', keys=word_cache.snapshot_keys, timeout=WordCache.CACHE_TIMEOUT, revalidate=word_cache.revalidate
+)
@@ -0,0 +1,149 @@
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.db import DatabaseError, NotSupportedError
+from django.utils import timezone
+
+from . import lexicon, metrics
+from .models import WordLookup
+from .upsert import bulk_upsert
+
+logger = logging.getLogger(__name__)
+
+STORE_LOOKUPS = metrics.registry.counter(
+    'sortonym_word_store_lookups_total',
+    'Candidate words resolved from the persistent word store.',
+    labels=('result',),
+)
+
+STORE_FLUSHES = metrics.registry.counter(
+    'sortonym_word_store_flushes_total',
+    'Word store flushes by result: ok, retry (kept for the next flush) or error.',
+    labels=('result',),
+)
+
+
+class WordStore:
+    """
+    Persistent record of every provider answer, including the unusable ones.
+
+    Provider calls run on worker threads, so answers are buffered with
+    ``record()`` and written in bulk by ``flush()`` from the request thread.
+    Words with too few synonyms/antonyms are kept as "not playable" for
+    ``NEGATIVE_TTL`` so they are skipped as candidates instead of re-fetched.
+    """
+
+    MIN_PAIRS = 3  # Easy needs 3 of each; anything less is never playable
+    MAX_STORED = 15
+    POSITIVE_TTL = timedelta(days=30)
+    NEGATIVE_TTL = timedelta(days=7)
+    MAX_PENDING = 5000
+
+    def __init__(self):
+        self._pending = deque(maxlen=self.MAX_PENDING)
+        self._flush_lock = threading.Lock()
+
+    def record(self, word: str, synonyms: List[str], antonyms: List[str]):
+        """Buffer one provider answer; safe to call from any thread."""
+        self._pending.append((word.lower(), synonyms[:self.MAX_STORED], antonyms[:self.MAX_STORED], timezone.now()))
+
+    def flush(self) -> int:
+        """Upsert buffered answers. Returns the number of rows written."""
+        if not self._pending or not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            latest = {}
+            while self._pending:
+                word, syns, ants, fetched_at = self._pending.popleft()
+                latest[word] = (syns, ants, fetched_at)
+
+            rows = []
+            for word, (syns, ants, fetched_at) in latest.items():
+                playable = len(syns) >= self.MIN_PAIRS and len(ants) >= self.MIN_PAIRS
+                ttl = self.POSITIVE_TTL if playable else self.NEGATIVE_TTL
+                rows.append(WordLookup(
+                    word=word,
+                    synonyms=','.join(syns),
+                    antonyms=','.join(ants),
+                    playable=playable,
+                    fetched_at=fetched_at,
+                    expires_at=fetched_at + ttl,
+                ))
+
+            try:
+                bulk_upsert(
+                    WordLookup, rows,
+                    unique_fields=['word'],
+                    update_fields=['synonyms', 'antonyms', 'playable', 'fetched_at', 'expires_at'],
+                )
+            except NotSupportedError:
+                # A backend/configuration bug, not a transient failure: surface it
+                STORE_FLUSHES.inc(result='error')
+                raise
+            except DatabaseError:
+                # Keep the answers for the next flush rather than dropping them
+                for word, (syns, ants, fetched_at) in latest.items():
+                    self._pending.appendleft((word, syns, ants, fetched_at))
+                STORE_FLUSHES.inc(result='retry')
+                logger.exception('Word store flush failed; %d answers kept for retry', len(rows))
+                return 0
+            STORE_FLUSHES.inc(result='ok')
+            return len(rows)
+        finally:
+            self._flush_lock.release()
+
+    def lookup_many(self, words: Iterable[str]) -> Dict[str, WordLookup]:
+        """Unexpired entries for the given words, keyed by lower-cased word."""
+        words = {w.lower() for w in words}
+        if not words:
+            return {}
+        rows = WordLookup.objects.filter(word__in=words, expires_at__gt=timezone.now())
+        return {row.word: row for row in rows}
+
+    def split_candidates(self, candidates: List[str], pairs_needed: int):
+        """
+        Partition candidates using stored answers.
+
+        Returns ``(ready, unknown)``: ``ready`` holds word-data dicts that can be
+        played at ``pairs_needed`` without a provider call, ``unknown`` the
+        words that still need fetching. Known-bad words are dropped.
+        """
+        # The shared memory-mapped lexicon answers first, without a query
+        mapped, remaining = {}, []
+        for word in candidates:
+            pairs = lexicon.lookup_pairs(word)
+            if pairs is None:
+                remaining.append(word)
+            else:
+                mapped[word.lower()] = pairs
+
+        known = self.lookup_many(remaining)
+        ready, unknown = [], []
+        for word in candidates:
+            if word.lower() in mapped:
+                syns, ants = mapped[word.lower()]
+            else:
+                row = known.get(word.lower())
+                if row is None:
+                    unknown.append(word)
+                    continue
+                syns = [s for s in row.synonyms.split(',') if s]
+                ants = [a for a in row.antonyms.split(',') if a]
+            if len(syns) >= pairs_needed and len(ants) >= pairs_needed:
+                ready.append({'word': word, 'synonyms': ','.join(syns[:12]), 'antonyms': ','.join(ants[:12])})
+        STORE_LOOKUPS.inc(len(mapped), result='lexicon')
+        STORE_LOOKUPS.inc(len(ready), result='playable')
+        STORE_LOOKUPS.inc(len(known) + len(mapped) - len(ready), result='skipped')
+        STORE_LOOKUPS.inc(len(unknown), result='unknown')
+        return ready, unknown
+
+    def purge_expired(self) -> int:
+        deleted, _ = WordLookup.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+# Global instance
+word_store = WordStore()
@@ -0,0 +1,15 @@
+// Read-your-writes with database replicas. After a write the server answers with
+// X-Sortonym-DB-Pin (seconds to stay on the primary); echoing it back on later
+// requests keeps them off lagging replicas. Cookies can't do this cross-origin.
+const PIN_HEADER = 'X-Sortonym-DB-Pin'
+
+let pinnedUntil = 0
+
+export function pinHeaders() {
+  return Date.now() < pinnedUntil ? { [PIN_HEADER]: '1' } : {}
+}
+
+export function rememberPin(response) {
+  const seconds = Number(response.headers.get(PIN_HEADER))
+  if (seconds > 0) pinnedUntil = Date.now() + seconds * 1000
+}
@@ -1,22 +1,19 @@
 import { httpJson } from './http.js'
 
-export async function startGame({ level, excludeWords }) {
-  const body = { level }
-  if (excludeWords && excludeWords.length > 0) {
-    body.excludeWords = excludeWords
-  }
-
+export async function startGame({ level }) {
+  // Recently played words are tracked server-side per player (see playerId.js)
   return await httpJson('/api/game/start', {
     method: 'POST',
-    body
+    body: { level }
   })
 }
 
-export async function submitGame({ roundId, synonyms, antonyms, timeTaken, reason, level, gameCode, roundNumber, displayName }) {
+export async function submitGame({ roundId, roundToken, synonyms, antonyms, timeTaken, reason, level, gameCode, roundNumber, displayName }) {
   return await httpJson('/api/game/submit', {
     method: 'POST',
     body: {
       roundId,
+      roundToken, // Signed by /api/game/start; lets the server score without a word lookup
       synonyms,
       antonyms,
       timeTaken,
@@ -29,6 +26,14 @@ export async function submitGame({ roundId, synonyms, antonyms, timeTaken, reaso
   })
 }
 
+export async function getHint({ roundToken, id }) {
+  // Word ids don't reveal their category; the server answers one hint at a time
+  return await httpJson('/api/game/hint', {
+    method: 'POST',
+    body: { roundToken, id }
+  })
+}
+
 export async function getGameScore() {
   return await httpJson('/api/game/score', {
     method: 'GET',
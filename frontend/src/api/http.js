@@ -1,3 +1,6 @@
+import { pinHeaders, rememberPin } from './dbPin.js'
+import { playerHeaders } from './playerId.js'
+
 function resolveUrl(path) {
   if (typeof path !== 'string' || !path) return path
   if (/^https?:\/\//i.test(path)) return path
@@ -14,12 +17,14 @@ export async function httpJson(path, { method = 'GET', token, body } = {}) {
   const headers = { Accept: 'application/json' }
   if (body !== undefined) headers['Content-Type'] = 'application/json'
   if (token) headers.Authorization = `Bearer ${token}`
+  Object.assign(headers, pinHeaders(), playerHeaders())
 
   const res = await fetch(resolveUrl(path), {
     method,
     headers,
     body: body === undefined ? undefined : JSON.stringify(body),
   })
+  rememberPin(res)
 
   const isJson = (res.headers.get('content-type') || '').includes('application/json')
   const payload = isJson ? await res.json() : null
@@ -0,0 +1,28 @@
+// Guests all share one email, so the server can't tell them apart. A random id
+// kept in this browser lets it remember which words this player saw recently,
+// instead of the client sending the whole list with every round.
+const PLAYER_HEADER = 'X-Sortonym-Player'
+const STORAGE_KEY = 'sortonymPlayerId'
+
+let playerId = null
+
+function newId() {
+  if (globalThis.crypto?.randomUUID) return globalThis.crypto.randomUUID()
+  return Array.from({ length: 32 }, () => Math.floor(Math.random() * 16).toString(16)).join('')
+}
+
+export function playerHeaders() {
+  if (!playerId) {
+    try {
+      playerId = localStorage.getItem(STORAGE_KEY)
+      if (!playerId) {
+        playerId = newId()
+        localStorage.setItem(STORAGE_KEY, playerId)
+      }
+    } catch {
+      // Storage disabled: the id lasts for this page load
+      playerId = playerId || newId()
+    }
+  }
+  return { [PLAYER_HEADER]: playerId }
+}
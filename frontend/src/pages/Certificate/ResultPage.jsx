@@ -272,20 +272,20 @@ const ResultPage = () => {
                             <h3 className="text-white">Synonyms</h3>
                             <span className="text-white">Similar meanings</span>
                         </div>
-                        <span className="count-badge">{synonymBox.filter(w => w.id.startsWith('syn_')).length}/{synonymBox.length}</span>
+                        <span className="count-badge">{synonymBox.filter(w => w.isCorrect).length}/{synonymBox.length}</span>
                     </div>
 
                     <div className="review-list">
                         {synonymBox.map((w, i) => (
-                            <div key={i} className={`review-item ${w.id.startsWith('syn_') ? 'item-correct' : 'item-wrong'}`}>
-                                <div className={`status-icon ${w.id.startsWith('syn_') ? 'icon-success' : 'icon-error'}`}>
-                                    <i className={`bi ${w.id.startsWith('syn_') ? 'bi-check-lg' : 'bi-x-lg'}`}></i>
+                            <div key={i} className={`review-item ${w.isCorrect ? 'item-correct' : 'item-wrong'}`}>
+                                <div className={`status-icon ${w.isCorrect ? 'icon-success' : 'icon-error'}`}>
+                                    <i className={`bi ${w.isCorrect ? 'bi-check-lg' : 'bi-x-lg'}`}></i>
                                 </div>
                                 <div className="item-text">
                                     <span className="word">{w.word}</span>
-                                    <span className="status-label">{w.id.startsWith('syn_') ? 'Correct answer' : 'Incorrect selection'}</span>
+                                    <span className="status-label">{w.isCorrect ? 'Correct answer' : 'Incorrect selection'}</span>
                                 </div>
-                                {w.id.startsWith('syn_') && <span className="xp-badge">+10 XP</span>}
+                                {w.isCorrect && <span className="xp-badge">+10 XP</span>}
                             </div>
                         ))}
                         {synonymBox.length === 0 && <div className="empty-msg">No words here</div>}
@@ -300,20 +300,20 @@ const ResultPage = () => {
                             <h3 className="text-white">Antonyms</h3>
                             <span className="text-white">Opposite meanings</span>
                         </div>
-                        <span className="count-badge">{antonymBox.filter(w => w.id.startsWith('ant_')).length}/{antonymBox.length}</span>
+                        <span className="count-badge">{antonymBox.filter(w => w.isCorrect).length}/{antonymBox.length}</span>
                     </div>
 
                     <div className="review-list">
                         {antonymBox.map((w, i) => (
-                            <div key={i} className={`review-item ${w.id.startsWith('ant_') ? 'item-correct' : 'item-wrong'}`}>
-                                <div className={`status-icon ${w.id.startsWith('ant_') ? 'icon-success' : 'icon-error'}`}>
-                                    <i className={`bi ${w.id.startsWith('ant_') ? 'bi-check-lg' : 'bi-x-lg'}`}></i>
+                            <div key={i} className={`review-item ${w.isCorrect ? 'item-correct' : 'item-wrong'}`}>
+                                <div className={`status-icon ${w.isCorrect ? 'icon-success' : 'icon-error'}`}>
+                                    <i className={`bi ${w.isCorrect ? 'bi-check-lg' : 'bi-x-lg'}`}></i>
                                 </div>
                                 <div className="item-text">
                                     <span className="word">{w.word}</span>
-                                    <span className="status-label">{w.id.startsWith('ant_') ? 'Correct answer' : 'Incorrect selection'}</span>
+                                    <span className="status-label">{w.isCorrect ? 'Correct answer' : 'Incorrect selection'}</span>
                                 </div>
-                                {w.id.startsWith('ant_') && <span className="xp-badge">+10 XP</span>}
+                                {w.isCorrect && <span className="xp-badge">+10 XP</span>}
                             </div>
                         ))}
                         {antonymBox.length === 0 && <div className="empty-msg">No words here</div>}
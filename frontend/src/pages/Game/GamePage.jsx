@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../../auth/AuthContext.jsx";
-import { startGame, submitGame } from "../../api/gameApi.js";
+import { startGame, submitGame, getHint } from "../../api/gameApi.js";
 import { getPrefetchedData, prefetchLevelData } from "../../utils/gamePrefetch.js";
 import { toPng } from 'html-to-image';
 import SoftPopup from "../../components/SoftPopup/SoftPopup.jsx";
@@ -106,11 +106,8 @@ function GamePage() {
         try {
             let data = getPrefetchedData(currentLevel);
             if (!data) {
-                // Request a new word, avoiding previously used words
-                data = await startGame({ 
-                    level: currentLevel,
-                    excludeWords: Array.from(usedTargetWords) // Send used words to backend
-                });
+                // The server remembers this player's recent words and avoids them
+                data = await startGame({ level: currentLevel });
             }
 
             // Check if we got a duplicate word (fallback check)
@@ -118,10 +115,7 @@ function GamePage() {
                 // If duplicate, try again up to 3 times
                 for (let attempt = 0; attempt < 3; attempt++) {
                     try {
-                        const newData = await startGame({ 
-                            level: currentLevel,
-                            excludeWords: Array.from(usedTargetWords)
-                        });
+                        const newData = await startGame({ level: currentLevel });
                         if (!usedTargetWords.has(newData.anchor_word)) {
                             data = newData;
                             break;
@@ -166,6 +160,7 @@ function GamePage() {
 
         const submissionData = {
             roundId: gameData?.score_id || gameData?.round_id,
+            roundToken: gameData?.round_token,
             synonyms: synonymBox.map(w => w.word),
             antonyms: antonymBox.map(w => w.word),
             timeTaken,
@@ -175,6 +170,12 @@ function GamePage() {
         try {
             const res = await submitGame(submissionData);
 
+            // Word ids are opaque; the submit response says which words were right
+            const correctSyns = new Set(res.answers?.synonyms || []);
+            const correctAnts = new Set(res.answers?.antonyms || []);
+            const markedSynonyms = synonymBox.map(w => ({ ...w, isCorrect: correctSyns.has(w.word.toLowerCase()) }));
+            const markedAntonyms = antonymBox.map(w => ({ ...w, isCorrect: correctAnts.has(w.word.toLowerCase()) }));
+
             if (isDaily) {
                 setShowSubmissionModal(true);
                 setGameState('completed');
@@ -186,8 +187,8 @@ function GamePage() {
                     time_bonus: res.time_bonus || 0,
                     accuracy: res.accuracy || 0,
                     timeTaken,
-                    synonyms: synonymBox,
-                    antonyms: antonymBox,
+                    synonyms: markedSynonyms,
+                    antonyms: markedAntonyms,
                     gameData,
                     timestamp: Date.now()
                 };
@@ -207,13 +208,13 @@ function GamePage() {
                 // Prepare results for scorecard
                 const scorecardResults = {
                     roundNumber: newRoundCount,
-                    synonyms: synonymBox.map(w => ({
+                    synonyms: markedSynonyms.map(w => ({
                         word: w.word,
-                        isCorrect: w.id.startsWith('syn_')
+                        isCorrect: w.isCorrect
                     })),
-                    antonyms: antonymBox.map(w => ({
+                    antonyms: markedAntonyms.map(w => ({
                         word: w.word,
-                        isCorrect: w.id.startsWith('ant_')
+                        isCorrect: w.isCorrect
                     })),
                     totalXP: Math.round(res.score || 0),
                     isLastRound: newRoundCount >= MAX_ROUNDS,
@@ -432,16 +433,23 @@ function GamePage() {
 
     /* ================= HINT HANDLER ================= */
 
-    const handleHint = () => {
+    const handleHint = async () => {
         if (hintsRemaining <= 0 || availableWords.length === 0 || timeExpired) return;
 
         // Pick a random word from available pool
         const randomIndex = Math.floor(Math.random() * availableWords.length);
         const wordToMove = availableWords[randomIndex];
 
-        // Determine correct box based on ID prefix
-        const isSynonym = wordToMove.id.startsWith('syn_');
-        const targetBox = isSynonym ? 'synonyms' : 'antonyms';
+        // Ask the server which box it belongs in
+        let isSynonym;
+        try {
+            const hint = await getHint({ roundToken: gameData?.round_token, id: wordToMove.id });
+            isSynonym = hint.category === 'syn';
+        } catch (err) {
+            console.warn("Hint failed:", err);
+            setHintsRemaining(0);
+            return;
+        }
 
         // Move the word
         setAvailableWords(prev => prev.filter(w => w.id !== wordToMove.id));
@@ -25,12 +25,12 @@ const ScorePageStandalone = () => {
             synonymBox: synonymBox.map(w => ({
                 id: w.id,
                 word: w.word,
-                isCorrect: w.id.startsWith('syn_')
+                isCorrect: Boolean(w.isCorrect)
             })),
             antonymBox: antonymBox.map(w => ({
                 id: w.id,
                 word: w.word,
-                isCorrect: w.id.startsWith('ant_')
+                isCorrect: Boolean(w.isCorrect)
             }))
         };
 
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../auth/AuthContext';
+import { pinHeaders, rememberPin } from '../../api/dbPin';
 import './TeamGameLobby.css'; // Reusing existing styles
 
 const CreateTeamPage = () => {
@@ -92,11 +93,13 @@ const CreateTeamPage = () => {
         const headers = {
             'Content-Type': 'application/json',
             ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+            ...pinHeaders(),
             ...options.headers
         };
 
         try {
             const response = await fetch(url, { ...options, headers });
+            rememberPin(response);
 
             // Check content type or size before parsing JSON
             const contentType = response.headers.get("content-type");
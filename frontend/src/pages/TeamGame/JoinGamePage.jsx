@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../auth/AuthContext';
+import { pinHeaders, rememberPin } from '../../api/dbPin';
 import './JoinGamePage.css';
 
 const JoinGamePage = () => {
@@ -39,11 +40,13 @@ const JoinGamePage = () => {
         const headers = {
             'Content-Type': 'application/json',
             ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+            ...pinHeaders(),
             ...options.headers
         };
 
         try {
             const response = await fetch(url, { ...options, headers });
+            rememberPin(response);
 
             const contentType = response.headers.get("content-type");
             let data = null;
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import { useAuth } from '../../auth/AuthContext';
+import { pinHeaders, rememberPin } from '../../api/dbPin';
 import './TeamGameLobby.css';
 
 const TeamGameLobby = () => {
@@ -49,11 +50,13 @@ const TeamGameLobby = () => {
         const headers = {
             'Content-Type': 'application/json',
             ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+            ...pinHeaders(),
             ...options.headers
         };
 
         try {
             const response = await fetch(url, { ...options, headers });
+            rememberPin(response);
 
             // Check content type or size before parsing JSON
             const contentType = response.headers.get("content-type");
@@ -73,7 +76,9 @@ const TeamGameLobby = () => {
 
             if (!response.ok) {
                 const errorMessage = data.error || data.message || `API Error: ${response.status}`;
-                throw new Error(errorMessage);
+                const error = new Error(errorMessage);
+                error.nextPollMs = data.next_poll_ms; // Sent when a busy server sheds a poll (429)
+                throw error;
             }
 
             return data;
@@ -92,9 +97,12 @@ const TeamGameLobby = () => {
     useEffect(() => {
         if (!gameCode) return;
 
+        let nextPollMs = 800;
+
         const fetchStatus = async () => {
             try {
                 const data = await authenticatedFetch(`/api/lobby/status?code=${gameCode}`);
+                nextPollMs = data.next_poll_ms || 800;
 
                 // Update State from API
                 const players = data.players || [];
@@ -142,13 +150,24 @@ const TeamGameLobby = () => {
                 }
 
             } catch (err) {
+                nextPollMs = err.nextPollMs || nextPollMs;
                 console.error("Polling error:", err);
             }
         };
 
-        fetchStatus();
-        const interval = setInterval(fetchStatus, 800); // Poll every 800ms for real-time feel
-        return () => clearInterval(interval);
+        // The server hints how soon to poll again: faster while the lobby is busy,
+        // slower when it is idle or the server is under load
+        let timer;
+        let cancelled = false;
+        const poll = async () => {
+            await fetchStatus();
+            if (!cancelled) timer = setTimeout(poll, nextPollMs);
+        };
+        poll();
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
 
     }, [gameCode, member, token, navigate]);
 
@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import { useAuth } from '../../auth/AuthContext';
 import { startGame, submitGame } from '../../api/gameApi';
+import { pinHeaders, rememberPin } from '../../api/dbPin';
 import '../Game/GamePage.css'; // Reuse the exact same CSS
 
 // Reuse components from regular game
@@ -119,6 +120,7 @@ const TeamGamePage = () => {
         const submissionData = {
             token,
             roundId: gameData?.score_id || gameData?.round_id,
+            roundToken: gameData?.round_token,
             synonyms: synonymBox.map(w => w.word),
             antonyms: antonymBox.map(w => w.word),
             timeTaken,
@@ -167,22 +169,31 @@ const TeamGamePage = () => {
 
     // Polling for multiplayer completion
     useEffect(() => {
-    let interval;
+    let timer;
+    let cancelled = false;
+    let nextPollMs = 1000;
 
     if (gameState === 'waiting_for_others') {
 
         const checkSync = async () => {
             try {
                 const res = await fetch(`/api/get/results/${gameCode}`, {
-                    headers: { 'Authorization': `Bearer ${token}` }
+                    headers: { 'Authorization': `Bearer ${token}`, ...pinHeaders() }
                 });
+                rememberPin(res);
 
-                if (!res.ok) return;
+                if (!res.ok) {
+                    // A busy server sheds polls with 429 and says when to retry
+                    const body = await res.json().catch(() => ({}));
+                    nextPollMs = body.next_poll_ms || nextPollMs;
+                    return;
+                }
 
                 const data = await res.json();
+                nextPollMs = data.next_poll_ms || 1000;
 
                 if (data) { alert(1)
-                    clearInterval(interval);
+                    cancelled = true;
 
                     // ✅ Get latest score per player
                     const latestMap = {};
@@ -224,11 +235,18 @@ const TeamGamePage = () => {
             }
         };
 
-        checkSync();
-        interval = setInterval(checkSync, 1000);
+        // Poll again after the server's hint rather than a fixed interval
+        const poll = async () => {
+            await checkSync();
+            if (!cancelled) timer = setTimeout(poll, nextPollMs);
+        };
+        poll();
     }
 
-    return () => clearInterval(interval);
+    return () => {
+        cancelled = true;
+        clearTimeout(timer);
+    };
 
 }, [gameState]);
 
@@ -1,5 +1,6 @@
 import { useLocation, useNavigate, useParams } from "react-router-dom";
 import { useAuth } from "../../auth/AuthContext";
+import { pinHeaders } from "../../api/dbPin";
 import { useEffect, useState } from "react";
 import "./TeamResultsPage.css";
 
@@ -21,7 +22,8 @@ const TeamResultsPage = () => {
                 try {
                     const res = await fetch(`/api/get/results/${gameCode}`, {
                         headers: {
-                            Authorization: `Bearer ${token}`
+                            Authorization: `Bearer ${token}`,
+                            ...pinHeaders()
                         }
                     });
 
@@ -8,6 +8,9 @@ const PREFETCH_CACHE = {
 };
 
 const MAX_CACHE_SIZE = 3;
+// The server times a round from when it was issued (less a few seconds of
+// grace), so older prefetched rounds would lose their time bonus
+const MAX_AGE_MS = 3000;
 
 /**
  * Prefetches words for a specific level and stores them in memory.
@@ -18,7 +21,7 @@ export const prefetchLevelData = async (level) => {
 
     try {
         const data = await startGame({ level: upperLevel });
-        PREFETCH_CACHE[upperLevel].push(data);
+        PREFETCH_CACHE[upperLevel].push({ data, fetchedAt: Date.now() });
         console.log(`[Prefetch] Cached word set for ${upperLevel}`);
     } catch (err) {
         console.warn(`[Prefetch] Failed for ${upperLevel}`, err);
@@ -26,12 +29,14 @@ export const prefetchLevelData = async (level) => {
 };
 
 /**
- * Gets prefetched data for a level if available, otherwise returns null.
+ * Gets fresh prefetched data for a level if available, otherwise returns null.
  */
 export const getPrefetchedData = (level) => {
     const upperLevel = level.toUpperCase();
-    if (PREFETCH_CACHE[upperLevel].length > 0) {
-        return PREFETCH_CACHE[upperLevel].shift();
+    const cached = PREFETCH_CACHE[upperLevel];
+    while (cached.length > 0) {
+        const { data, fetchedAt } = cached.shift();
+        if (Date.now() - fetchedAt <= MAX_AGE_MS) return data;
     }
     return null;
 };